@@ -0,0 +1,109 @@
+"""JSON request body parsing.
+
+FastAPI parses a body parameter with ``json.loads`` into Python dicts and
+validates those dicts against the model. The endpoints instead read the raw
+body, reject it early when it is too large, and validate it in one pass
+with pydantic's native JSON validator, which builds the model straight from
+the bytes. The model's validator is compiled once, when the class is
+defined.
+"""
+from typing import Any, Dict, Type, TypeVar
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from app.core.exceptions import PayloadTooLargeException
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """Read a request body of at most ``max_bytes``
+
+    The Content-Length header is checked before anything is read, and a
+    chunked body is read only until it exceeds the limit.
+
+    Args:
+        request: Incoming request.
+        max_bytes: Maximum body size in bytes.
+
+    Returns:
+        The body.
+
+    Raises:
+        PayloadTooLargeException: If the body is larger than ``max_bytes``.
+    """
+    too_large = PayloadTooLargeException(
+        f"Request body exceeds the maximum of {max_bytes} bytes"
+    )
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise too_large
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def parse_body(model: Type[Model], body: bytes) -> Model:
+    """Validate a JSON body into ``model``
+
+    Args:
+        model: Pydantic model of the body.
+        body: Raw JSON body.
+
+    Returns:
+        The validated model.
+
+    Raises:
+        RequestValidationError: If the body is not valid JSON or does not
+            match the model, answered with the usual 422 response.
+    """
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in exc.errors(include_url=False)
+            ],
+            body=body,
+        ) from exc
+
+
+def _inline_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        ref = schema.get("$ref", "")
+        if ref.startswith("#/$defs/"):
+            return _inline_refs(defs[ref.removeprefix("#/$defs/")], defs)
+        return {
+            key: _inline_refs(value, defs) for key, value in schema.items()
+        }
+    if isinstance(schema, list):
+        return [_inline_refs(item, defs) for item in schema]
+    return schema
+
+
+def json_body(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Return the ``openapi_extra`` documenting a JSON body of ``model``
+
+    The body is read by the endpoint rather than declared as a parameter,
+    so its schema is added to the OpenAPI document here, with the nested
+    model definitions inlined.
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": _inline_refs(schema, defs)}
+            },
+        }
+    }
@@ -1,60 +1,362 @@
 """Resume generator endpoints."""
 import logging
-import tempfile
+from time import perf_counter
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
-from app.models.resume import ResumeData
-from app.services.generator import ResumeGenerator
-from app.services.style import Style
-from app.services.utils import remove_file
+from app.api.v1.body import json_body, parse_body, read_body
+from app.core.exceptions import (
+    LoadSheddingException, PayloadTooLargeException, RateLimitException,
+    RenderQueueFullException, RequestRejectedException,
+    UnknownFormatException, UnknownProfileException, UnknownStyleException,
+)
+from app.core.config import config as c
+from app.core.metrics import ServerTiming
+from app.models.resume import ResumeBatch, ResumeData
+from app.services.admission import admission, rate_limiter
+from app.services.batch import stream_batch_zip
+from app.services.cache import render_cache, render_key
+from app.services.document import build_document
+from app.services.executor import render_executor
+from app.services.memory import check_render_memory
+from app.services.preview import get_preview_format
+from app.services.profiles import get_profile
+from app.services.rendering import CachedRender, render_cached
+from app.services.streaming import RenderStream
+from app.services.style import get_style
+from app.services.utils import content_disposition, to_file_name
 
 _LOGGER = logging.getLogger(__name__)
 router = APIRouter(prefix="/v1")
 
 
-@router.post("/resume/generate", tags=["resume"])
-async def generate_resume(data: ResumeData):
+def _client_id(request: Request) -> str:
+    """Identify the client of a request for rate limiting."""
+    if c.RATE_LIMIT_HEADER:
+        value = request.headers.get(c.RATE_LIMIT_HEADER)
+        if value:
+            # the first X-Forwarded-For address is the original client
+            return value.split(",")[0].strip()
+    return request.client.host if request.client else ""
+
+
+def _rejected(
+    status_code: int, exc: RequestRejectedException
+) -> HTTPException:
+    """Build the error response of a request rejected before rendering."""
+    return HTTPException(
+        status_code=status_code,
+        detail=str(exc),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an entity tag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def _stream_resume(
+    data: ResumeData,
+    theme: str,
+    profile: str,
+    fit: bool,
+    etag: str,
+    file_name: str,
+    timing: ServerTiming,
+) -> StreamingResponse:
+    """Start rendering a resume and send each page as it is rendered."""
+    document = build_document(data, get_style(theme))
+    check_render_memory(document)
+    pages = RenderStream(
+        render_executor, document, theme=theme, profile=profile, fit=fit,
+        slot=admission.slot(),
+    )
+    await pages.start()
+    timing.add("queue", pages.queue_seconds, "admission wait")
+    timing.add("first_byte", pages.first_byte_seconds, "first page rendered")
+    _LOGGER.info("Streaming resume")
+    return StreamingResponse(
+        pages,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": content_disposition(file_name),
+            "ETag": f"W/{etag}",
+            "Server-Timing": timing.header(),
+        },
+    )
+
+
+@router.post(
+    "/resume/generate", tags=["resume"], openapi_extra=json_body(ResumeData)
+)
+async def generate_resume(
+    request: Request,
+    theme: str = Query(default="default", description="Style theme"),
+    profile: str = Query(
+        default=c.PDF_PROFILE,
+        description="PDF output profile: fast, balanced or smallest",
+    ),
+    fit: bool = Query(
+        default=False, description="Shrink fonts and spacing to fit one page"
+    ),
+    stream: bool = Query(
+        default=False, description="Send each page as soon as it is rendered"
+    ),
+    if_none_match: Optional[str] = Header(default=None),
+):
     """
     Generate a resume PDF from the provided resume data.
 
     This endpoint accepts resume data in JSON format, processes it,
-    and generates a PDF file.
+    and generates a PDF file. The body is size-checked before it is read
+    and validated straight from JSON into ``ResumeData``, and the worker
+    renders the compact resume document built from it.
+    Rendering runs in the render executor so the event loop stays free
+    while the PDF is built, and the PDF is rendered in memory and sent
+    without touching the filesystem.
+
+    Rendered PDFs are content-addressed: the ETag is derived from the
+    resume data, style and output profile, so a matching If-None-Match is
+    answered with 304 without rendering, and repeated payloads are served
+    from the render cache. With ``RENDER_CACHE=disk`` the cache is shared
+    by all workers and hits are sent from a memory map of the cached file.
+
+    Renders go through admission control: a request that would wait too
+    long for a render slot is shed with 503 and Retry-After instead of
+    queueing, and clients over their rate limit get 429. Cache hits and
+    304 responses do not take a slot. A resume whose estimated render
+    memory exceeds MAX_RENDER_MEMORY_BYTES is rejected with 413 before it
+    is rendered.
+
+    With ``fit``, spacing and then fonts are scaled down until the resume
+    fits on one page. The scales are searched with a height estimate from
+    font metrics, so the PDF is still built only once.
+
+    With ``stream``, a resume that is not cached is sent page by page while
+    it is rendered, which lowers the time to the first byte of long
+    resumes. The streamed PDF is not cached, and its objects are ordered
+    differently, so its ETag is weak. Errors before the first page still
+    get their status code, a later failure aborts the response.
+
+    The duration of each stage (validate, queue, fit, build_content,
+    doc_build and the executor round trip) is reported in the Server-Timing header
+    and the stage histogram on /metrics. Streamed responses report the
+    stages before their first byte only.
 
     Args:
-        data: ResumeData object containing resume details.
-        background_tasks: FastAPI BackgroundTasks object to manage background processing.
+        request: Incoming request with the ResumeData JSON body.
+        theme: Name of the style theme to render with.
+        profile: Name of the PDF output profile.
+        fit: Whether to shrink the resume to fit on one page.
+        stream: Whether to send the PDF while it is rendered.
+        if_none_match: Entity tags the client already holds.
 
     Returns:
-        FileResponse: A response containing the generated PDF file.
+        Response: A response containing the generated PDF file, a streamed
+            response sending it while it is rendered, or an empty 304
+            response if the client copy is current.
 
     Raises:
-        HTTPException: If an error occurs during resume generation.
+        HTTPException: 413 if the body exceeds MAX_PAYLOAD_BYTES or the
+            estimated render memory exceeds MAX_RENDER_MEMORY_BYTES, 422 if
+            the body is invalid or the theme or profile is unknown, 429 if
+            the client exceeded its rate limit, 503 if the server is at
+            capacity, 500 if an error occurs during resume generation.
     """
+    timing = ServerTiming()
+    received_at = getattr(request.state, "received_at", perf_counter())
+    try:
+        rate_limiter.check(_client_id(request))
+        body = await read_body(request, c.MAX_PAYLOAD_BYTES)
+    except RateLimitException as exc:
+        raise _rejected(429, exc) from exc
+    except PayloadTooLargeException as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    data = parse_body(ResumeData, body)
+    timing.add("validate", perf_counter() - received_at)
     try:
         _LOGGER.info("Start generate resume endpoint")
-        file_name = f"{data.name.lower().replace(' ', '_')}"
-        file_name = file_name.replace(".", "_").replace(",", "_")
-        generator = ResumeGenerator(style=Style())
+        file_name = to_file_name(data.name)
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as f:
-            pdf_path = f.name
+        get_profile(profile)
+        style = get_style(theme)
+        key = render_key(data, style, profile, fit)
+        etag = f'"{key}"'
+        if _etag_matches(if_none_match, etag):
+            _LOGGER.info("Resume not modified")
+            return Response(
+                status_code=304,
+                headers={"ETag": etag, "Server-Timing": timing.header()},
+            )
 
-        generator.generate_pdf(data.model_dump(), output_path=pdf_path)
+        if stream:
+            # a cached PDF is sent whole, only a render is streamed
+            pdf = await render_cache.view_async(key)
+            if pdf is None:
+                return await _stream_resume(
+                    data, theme, profile, fit, etag, file_name, timing
+                )
+            rendered = CachedRender(key, pdf)
+        else:
+            # a view of a cached PDF is sent without copying it
+            rendered = await render_cached(
+                render_executor, data, theme, profile, fit,
+                key=key, view=True, slot=admission.slot(),
+            )
+        if rendered.cached:
+            timing.add("cache", 0.0, "hit")
+        else:
+            timing.add("queue", rendered.queue_seconds, "admission wait")
+            if fit:
+                timing.add("fit", rendered.result.timings["fit"])
+            timing.add(
+                "build_content", rendered.result.timings["build_content"]
+            )
+            timing.add("doc_build", rendered.result.timings["doc_build"])
+            timing.add(
+                "render", rendered.render_seconds, "executor round trip"
+            )
 
         _LOGGER.info("Generate resume service done")
-        return FileResponse(
-            path=pdf_path,
+        return Response(
+            content=rendered.pdf,
             media_type="application/pdf",
-            filename=file_name,
             headers={
-                "Content-Disposition": f"attachment; filename={file_name}"
+                "Content-Disposition": content_disposition(file_name),
+                "ETag": etag,
+                "Server-Timing": timing.header(),
             },
-            background=BackgroundTasks([lambda: remove_file(pdf_path)])
         )
+    except (UnknownStyleException, UnknownProfileException) as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except PayloadTooLargeException as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except LoadSheddingException as exc:
+        _LOGGER.warning("Shedding resume generation: %s", exc)
+        raise _rejected(503, exc) from exc
+    except RenderQueueFullException as exc:
+        _LOGGER.warning("Rejecting resume generation: %s", exc)
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry later",
+            headers={"Retry-After": "1"},
+        ) from exc
     except Exception as exc:
         raise HTTPException(
             status_code=500,
             detail=f"Error generating resume: {exc}"
         ) from exc
+
+
+@router.post(
+    "/resume/generate/batch", tags=["resume"],
+    openapi_extra=json_body(ResumeBatch),
+)
+async def generate_resume_batch(
+    request: Request,
+    theme: str = Query(default="default", description="Style theme"),
+    profile: str = Query(
+        default=c.BATCH_PDF_PROFILE,
+        description="PDF output profile: fast, balanced or smallest",
+    ),
+):
+    """
+    Generate resume PDFs for a batch of resumes as a ZIP archive.
+
+    Resumes are rendered in parallel across the render executor workers and
+    each PDF is streamed into the archive as soon as it finishes. The
+    archive ends with a ``manifest.json`` listing the status, error and
+    render time of every item, so invalid or failing entries do not fail
+    the batch.
+
+    Args:
+        request: Incoming request with the ResumeBatch JSON body.
+        theme: Name of the style theme to render with.
+        profile: Name of the PDF output profile, fast by default.
+
+    Returns:
+        StreamingResponse: A streamed ZIP archive of the generated PDFs.
+
+    Raises:
+        HTTPException: 413 if the body exceeds BATCH_MAX_PAYLOAD_BYTES or
+            the batch is larger than BATCH_MAX_SIZE, 422 if the body is
+            invalid or the theme or profile is unknown.
+    """
+    try:
+        body = await read_body(request, c.BATCH_MAX_PAYLOAD_BYTES)
+    except PayloadTooLargeException as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    batch = parse_body(ResumeBatch, body)
+    _LOGGER.info("Start generate resume batch of %d", len(batch.resumes))
+    if len(batch.resumes) > c.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the maximum of {c.BATCH_MAX_SIZE} resumes",
+        )
+    try:
+        get_style(theme)
+        get_profile(profile)
+    except (UnknownStyleException, UnknownProfileException) as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    return StreamingResponse(
+        stream_batch_zip(batch.resumes, theme, render_executor, profile),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=resumes.zip"},
+    )
+
+
+@router.post(
+    "/resume/preview", tags=["resume"], openapi_extra=json_body(ResumeData)
+)
+async def preview_resume(
+    request: Request,
+    format: str = Query(  # pylint: disable=redefined-builtin
+        default="html", description="Preview format: html, markdown or text"
+    ),
+    theme: str = Query(default="default", description="Style theme"),
+):
+    """
+    Preview a resume as HTML, Markdown or plain text.
+
+    Previews have the sections of the PDF in the same order but skip the
+    PDF layout, so they render in well under a millisecond on the event
+    loop. Editors can call this endpoint on every change and use
+    ``/resume/generate`` for the final download.
+
+    Args:
+        request: Incoming request with the ResumeData JSON body.
+        format: Name of the preview format.
+        theme: Name of the style theme, for colors and bullets.
+
+    Returns:
+        Response: The preview document.
+
+    Raises:
+        HTTPException: 413 if the body exceeds MAX_PAYLOAD_BYTES, 422 if
+            the body is invalid or the format or theme is unknown.
+    """
+    try:
+        body = await read_body(request, c.MAX_PAYLOAD_BYTES)
+    except PayloadTooLargeException as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    data = parse_body(ResumeData, body)
+    try:
+        preview = get_preview_format(format)
+        style = get_style(theme)
+    except (UnknownFormatException, UnknownStyleException) as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    return Response(
+        content=preview.render(build_document(data, style), style),
+        media_type=f"{preview.media_type}; charset=utf-8",
+    )
@@ -0,0 +1,145 @@
+"""Resume render job endpoints."""
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.api.v1.body import json_body, parse_body, read_body
+from app.core.config import config as c
+from app.core.exceptions import (
+    JobNotFoundException, PayloadTooLargeException, RenderQueueFullException,
+    UnknownProfileException, UnknownStyleException,
+)
+from app.models.resume import ResumeData
+from app.services.jobs import job_manager
+from app.services.profiles import get_profile
+from app.services.style import get_style
+from app.services.utils import content_disposition
+
+_LOGGER = logging.getLogger(__name__)
+router = APIRouter(prefix="/v1")
+
+
+@router.post(
+    "/resume/jobs", tags=["jobs"], status_code=202,
+    openapi_extra=json_body(ResumeData),
+)
+async def submit_job(
+    request: Request,
+    theme: str = Query(default="default", description="Style theme"),
+    profile: str = Query(
+        default=c.PDF_PROFILE,
+        description="PDF output profile: fast, balanced or smallest",
+    ),
+):
+    """
+    Submit a resume render job.
+
+    The resume is rendered in the background, so the request returns
+    immediately regardless of how long the render takes. Poll the status
+    URL and fetch the PDF from the download URL once the job is done.
+    At most JOB_MAX_RUNNING jobs render at once, the others stay queued.
+
+    Args:
+        request: Incoming request with the ResumeData JSON body, also
+            used to build the job URLs.
+        theme: Name of the style theme to render with.
+        profile: Name of the PDF output profile.
+
+    Returns:
+        JSONResponse: 202 with the job state and its status and download
+            URLs.
+
+    Raises:
+        HTTPException: 413 if the body exceeds MAX_PAYLOAD_BYTES, 422 if
+            the body is invalid or the theme or profile is unknown, 503
+            if JOB_MAX_PENDING jobs are unfinished.
+    """
+    try:
+        body = await read_body(request, c.MAX_PAYLOAD_BYTES)
+    except PayloadTooLargeException as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    data = parse_body(ResumeData, body)
+    try:
+        get_style(theme)
+        get_profile(profile)
+    except (UnknownStyleException, UnknownProfileException) as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    try:
+        job = await job_manager.submit(data, theme, profile)
+    except RenderQueueFullException as exc:
+        _LOGGER.warning("Rejecting render job: %s", exc)
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry later",
+            headers={"Retry-After": "1"},
+        ) from exc
+    _LOGGER.info("Submitted job %s", job.id)
+    status_url = str(request.url_for("get_job", job_id=job.id))
+    return JSONResponse(
+        status_code=202,
+        content={
+            **job.to_dict(),
+            "status_url": status_url,
+            "download_url": str(
+                request.url_for("download_job", job_id=job.id)
+            ),
+        },
+        headers={"Location": status_url},
+    )
+
+
+@router.get("/resume/jobs/{job_id}", tags=["jobs"])
+async def get_job(job_id: str):
+    """
+    Get the status of a render job.
+
+    Args:
+        job_id: Id returned when the job was submitted.
+
+    Returns:
+        dict: The job state.
+
+    Raises:
+        HTTPException: 404 if the job does not exist or expired.
+    """
+    try:
+        return (await job_manager.get(job_id)).to_dict()
+    except JobNotFoundException as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@router.get("/resume/jobs/{job_id}/download", tags=["jobs"])
+async def download_job(job_id: str):
+    """
+    Download the PDF of a finished render job.
+
+    Args:
+        job_id: Id returned when the job was submitted.
+
+    Returns:
+        Response: The generated PDF file.
+
+    Raises:
+        HTTPException: 404 if the job does not exist or expired, 409 if the
+            job is not done yet or failed.
+    """
+    try:
+        job = await job_manager.get(job_id)
+        pdf = await job_manager.result(job_id)
+    except JobNotFoundException as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    if pdf is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job {job_id} is {job.status.value}",
+        )
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": content_disposition(job.file_name)
+        },
+    )
@@ -0,0 +1,230 @@
+"""Command line interface.
+
+Render resumes offline, without going through the HTTP API:
+
+    python -m app.cli render resumes.jsonl -o out/
+    cat resumes.jsonl | python -m app.cli render - -o out/ --workers 8
+
+Input is JSON Lines, one ``ResumeData`` payload per line. Lines are read
+lazily and handed to a process pool in chunks. A few chunks per worker are in
+flight at a time and the next one is submitted as soon as one finishes, so
+the input is never loaded whole, memory stays flat on very large archives
+and a slow resume does not leave the other workers idle.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+)
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import config as c
+from app.core.exceptions import UnknownStyleException
+from app.core.loggers import setup_logging
+from app.models.resume import ResumeData
+from app.services.fonts import preload_fonts
+from app.services.generator import ResumeGenerator
+from app.services.profiles import PROFILES, get_profile
+from app.services.style import get_style
+from app.services.utils import percentile, to_file_name
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of chunks in flight per worker at a time
+_CHUNKS_PER_WORKER = 4
+
+_Task = Tuple[int, str, str, str, str]
+
+
+def _init_worker(log_level: str) -> None:
+    """Configure logging and preload fonts in pool workers."""
+    setup_logging(log_level=log_level, use_basic_format=True)
+    preload_fonts()
+
+
+def _render_line(task: _Task) -> Dict[str, Any]:
+    """Validate one JSON line and render it to a PDF file."""
+    index, line, output_dir, theme, profile = task
+    result: Dict[str, Any] = {"index": index, "status": "ok", "error": None}
+    t0 = perf_counter()
+    try:
+        data = ResumeData.model_validate_json(line)
+        path = os.path.join(
+            output_dir, f"{index:06d}_{to_file_name(data.name)}.pdf"
+        )
+        generator = ResumeGenerator(
+            style=get_style(theme), profile=get_profile(profile)
+        )
+        generator.generate_pdf(data, path)
+        result["file"] = path
+    except ValidationError as exc:
+        result.update(status="invalid", error=str(exc))
+    except Exception as exc:  # pylint: disable=broad-except
+        result.update(status="error", error=str(exc))
+    result["seconds"] = perf_counter() - t0
+    return result
+
+
+def _render_chunk(tasks: List[_Task]) -> List[Dict[str, Any]]:
+    """Render a chunk of lines in one round trip to a worker."""
+    return [_render_line(task) for task in tasks]
+
+
+def _read_tasks(
+    stream: TextIO, output_dir: str, theme: str, profile: str
+) -> Iterator[_Task]:
+    """Lazily turn non-empty input lines into render tasks."""
+    for index, line in enumerate(stream):
+        line = line.strip()
+        if line:
+            yield index, line, output_dir, theme, profile
+
+
+def render(
+    stream: TextIO,
+    output_dir: str,
+    theme: str = "default",
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    log_level: str = "WARNING",
+    profile: str = "fast",
+) -> Dict[str, Any]:
+    """Render every resume in a JSON Lines stream into ``output_dir``
+
+    Args:
+        stream: Text stream of JSON lines.
+        output_dir: Directory the PDFs are written to.
+        theme: Style theme used for every resume.
+        workers: Number of worker processes, defaults to the CPU count.
+        chunksize: Number of lines sent to a worker at once.
+        log_level: Log level of the worker processes.
+        profile: PDF output profile used for every resume.
+
+    Returns:
+        Throughput report with counts, resumes per second and per-item
+        render time percentiles.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, chunksize)
+    tasks = _read_tasks(stream, output_dir, theme, profile)
+    timings: List[float] = []
+    counts = {"ok": 0, "invalid": 0, "error": 0}
+
+    t0 = perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(log_level,)
+    ) as pool:
+        pending: Set[Future] = set()
+        while True:
+            # top up the chunks in flight, reading the input lazily
+            while len(pending) < workers * _CHUNKS_PER_WORKER:
+                chunk = list(itertools.islice(tasks, chunksize))
+                if not chunk:
+                    break
+                pending.add(pool.submit(_render_chunk, chunk))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    counts[result["status"]] += 1
+                    timings.append(result["seconds"])
+                    if result["status"] != "ok":
+                        _LOGGER.warning(
+                            "Line %d %s: %s",
+                            result["index"] + 1, result["status"],
+                            result["error"],
+                        )
+    elapsed = perf_counter() - t0
+
+    total = sum(counts.values())
+    return {
+        "total": total,
+        **counts,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 3),
+        "resumes_per_s": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "p95_ms": round(percentile(timings, 95) * 1000, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of ``python -m app.cli``."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli", description="Resume generator tools"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render_parser = commands.add_parser(
+        "render", help="Render a JSON Lines file of resumes to PDFs"
+    )
+    render_parser.add_argument(
+        "input", help="JSON Lines file of resumes, or - for stdin"
+    )
+    render_parser.add_argument(
+        "-o", "--output-dir", required=True, help="Output directory"
+    )
+    render_parser.add_argument("--theme", default="default")
+    render_parser.add_argument(
+        "--profile", default=c.BATCH_PDF_PROFILE, choices=list(PROFILES),
+        help="PDF output profile",
+    )
+    render_parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    render_parser.add_argument(
+        "--chunksize", type=int, default=8,
+        help="Lines sent to a worker at once",
+    )
+    render_parser.add_argument("--log-level", default="WARNING")
+    render_parser.add_argument(
+        "--json", action="store_true", help="Print the report as JSON"
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging(log_level=args.log_level, use_basic_format=True)
+    try:
+        get_style(args.theme)
+    except UnknownStyleException as exc:
+        parser.error(str(exc))
+
+    if args.input == "-":
+        report = render(
+            sys.stdin, args.output_dir, args.theme, args.workers,
+            args.chunksize, args.log_level, args.profile,
+        )
+    else:
+        with open(args.input, encoding="utf-8") as stream:
+            report = render(
+                stream, args.output_dir, args.theme, args.workers,
+                args.chunksize, args.log_level, args.profile,
+            )
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(
+            f"Rendered {report['ok']}/{report['total']} resumes "
+            f"({report['invalid']} invalid, {report['error']} failed) "
+            f"in {report['elapsed_s']:.2f}s with {report['workers']} workers"
+        )
+        print(
+            f"Throughput: {report['resumes_per_s']:.2f} resumes/s, "
+            f"p50 {report['p50_ms']:.1f}ms, p95 {report['p95_ms']:.1f}ms "
+            "per resume"
+        )
+    return 0 if report["ok"] == report["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,8 +10,12 @@ Functions:
 
     Returns:
       A boolean value of the string value.
+
+  cpus_per_web_worker() -> int:
+    Returns the share of the CPUs of each web worker process.
 """
 import os
+import tempfile
 
 from pydantic_settings import BaseSettings
 
@@ -31,14 +35,154 @@ def to_bool(value: str) -> bool:
     return False
 
 
+def cpus_per_web_worker() -> int:
+    """Returns the share of the CPUs of each web worker process.
+
+    Every web worker starts its own render workers and admits its own
+    renders, so the CPUs are divided by the WEB_CONCURRENCY workers.
+
+    Returns:
+        The number of CPUs divided by WEB_CONCURRENCY, at least 1
+    """
+    web_workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    return max(1, (os.cpu_count() or 1) // web_workers)
+
+
 class AppSettings(BaseSettings):
     """Application-level settings."""
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_USE_BASIC_FORMAT: bool = to_bool(
         os.getenv("LOG_USE_BASIC_FORMAT", "False")
     )
+    # Log records buffered for the background log writer, 0 writes them
+    # from the request path. Records past a full buffer are dropped
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Fraction of the per-request INFO records of LOG_SAMPLED_LOGGERS kept
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+    LOG_SAMPLED_LOGGERS: str = os.getenv(
+        "LOG_SAMPLED_LOGGERS",
+        "app.api.v1.endpoints.generator,app.services.generator",
+    )
     API_PREFIX: str = os.getenv("API_PREFIX", "/sylab/api")
 
+    # Render executor: "process" (default) or "thread". Render workers
+    # and admitted renders default to this web worker's share of the CPUs
+    RENDER_EXECUTOR: str = os.getenv("RENDER_EXECUTOR", "process")
+    RENDER_WORKERS: int = int(
+        os.getenv("RENDER_WORKERS", str(cpus_per_web_worker()))
+    )
+    RENDER_QUEUE_SIZE: int = int(os.getenv("RENDER_QUEUE_SIZE", "32"))
+    RENDER_START_METHOD: str = os.getenv("RENDER_START_METHOD", "spawn")
+    # Render workers are replaced after this many renders, and the render
+    # pool is replaced once a worker reports more resident memory than
+    # this, 0 disables either limit
+    RENDER_WORKER_MAX_TASKS: int = int(
+        os.getenv("RENDER_WORKER_MAX_TASKS", "0")
+    )
+    RENDER_WORKER_MAX_RSS_BYTES: int = int(
+        os.getenv("RENDER_WORKER_MAX_RSS_BYTES", "0")
+    )
+    # Bytes of a streamed PDF collected before they are sent from the
+    # render worker to the response
+    STREAM_CHUNK_SIZE: int = int(os.getenv("STREAM_CHUNK_SIZE", "16384"))
+
+    # Admission control of single renders: renders running at once, renders
+    # waiting for a slot and the longest wait in seconds before a request
+    # is shed with 503
+    ADMISSION_MAX_CONCURRENCY: int = int(
+        os.getenv("ADMISSION_MAX_CONCURRENCY", str(cpus_per_web_worker()))
+    )
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+    ADMISSION_MAX_WAIT_SECONDS: float = float(
+        os.getenv("ADMISSION_MAX_WAIT_SECONDS", "5")
+    )
+
+    # Per-client token bucket of the generate endpoint in requests per
+    # second, 0 disables it. Clients are identified by RATE_LIMIT_HEADER,
+    # e.g. X-Forwarded-For behind a proxy, or by their address
+    RATE_LIMIT_PER_SECOND: float = float(
+        os.getenv("RATE_LIMIT_PER_SECOND", "0")
+    )
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "10"))
+    RATE_LIMIT_HEADER: str = os.getenv("RATE_LIMIT_HEADER", "")
+
+    # Rendered PDF cache: "memory" in each process or "disk" shared by all
+    # workers in RENDER_CACHE_PATH. Byte budget, 0 disables it
+    RENDER_CACHE: str = os.getenv("RENDER_CACHE", "memory")
+    RENDER_CACHE_PATH: str = os.getenv(
+        "RENDER_CACHE_PATH",
+        os.path.join(tempfile.gettempdir(), "resume-renders"),
+    )
+    RENDER_CACHE_MAX_BYTES: int = int(
+        os.getenv("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+
+    # Number of parsed paragraph markups cached per process, 0 disables it
+    PARAGRAPH_CACHE_SIZE: int = int(
+        os.getenv("PARAGRAPH_CACHE_SIZE", "4096")
+    )
+
+    # Fit-to-page: smallest font and spacing scales tried, and number of
+    # paragraph line counts cached per process by the height estimate
+    FIT_MIN_FONT_SCALE: float = float(os.getenv("FIT_MIN_FONT_SCALE", "0.8"))
+    FIT_MIN_SPACING_SCALE: float = float(
+        os.getenv("FIT_MIN_SPACING_SCALE", "0.4")
+    )
+    FIT_CACHE_SIZE: int = int(os.getenv("FIT_CACHE_SIZE", "8192"))
+
+    # Memory accounting of renders: "rss", "tracemalloc" (slower, adds the
+    # peak allocation of each render) or "off"
+    MEMORY_ACCOUNTING: str = os.getenv("MEMORY_ACCOUNTING", "rss")
+    # Resumes whose estimated render memory exceeds this are rejected with
+    # 413, 0 disables the check
+    MAX_RENDER_MEMORY_BYTES: int = int(
+        os.getenv("MAX_RENDER_MEMORY_BYTES", str(32 * 1024 * 1024))
+    )
+    # Web workers stop gracefully, to be replaced by the gunicorn master,
+    # past this resident memory or number of requests, 0 disables either
+    WORKER_MAX_RSS_BYTES: int = int(os.getenv("WORKER_MAX_RSS_BYTES", "0"))
+    WORKER_MAX_REQUESTS: int = int(os.getenv("WORKER_MAX_REQUESTS", "0"))
+
+    # TrueType fonts: directory searched for font families next to the
+    # bundled Vera, comma-separated families preloaded by every render
+    # worker and the family of the "unicode" theme
+    FONT_DIR: str = os.getenv("FONT_DIR", "")
+    FONT_FAMILIES: str = os.getenv("FONT_FAMILIES", "Vera")
+    UNICODE_FONT_FAMILY: str = os.getenv("UNICODE_FONT_FAMILY", "Vera")
+
+    # Default PDF output profile ("fast", "balanced" or "smallest") of
+    # single renders and jobs, and of batch archives
+    PDF_PROFILE: str = os.getenv("PDF_PROFILE", "balanced")
+    BATCH_PDF_PROFILE: str = os.getenv("BATCH_PDF_PROFILE", "fast")
+
+    # Maximum number of resumes accepted by the batch endpoint
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "500"))
+
+    # Maximum request body size in bytes of a single resume and of a batch,
+    # larger bodies are rejected before they are parsed
+    MAX_PAYLOAD_BYTES: int = int(
+        os.getenv("MAX_PAYLOAD_BYTES", str(1024 * 1024))
+    )
+    BATCH_MAX_PAYLOAD_BYTES: int = int(
+        os.getenv("BATCH_MAX_PAYLOAD_BYTES", str(64 * 1024 * 1024))
+    )
+
+    # Render jobs: "memory" store or "sqlite" store shared by all workers
+    JOB_STORE: str = os.getenv("JOB_STORE", "memory")
+    JOB_STORE_PATH: str = os.getenv(
+        "JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "resume-jobs")
+    )
+    JOB_TTL_SECONDS: int = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+    JOB_CLEANUP_INTERVAL_SECONDS: int = int(
+        os.getenv("JOB_CLEANUP_INTERVAL_SECONDS", "60")
+    )
+    # Jobs rendering at once per web worker, and unfinished jobs per web
+    # worker before new jobs are rejected with 503
+    JOB_MAX_RUNNING: int = int(
+        os.getenv("JOB_MAX_RUNNING", str(cpus_per_web_worker()))
+    )
+    JOB_MAX_PENDING: int = int(os.getenv("JOB_MAX_PENDING", "100"))
+
 
 class Settings(AppSettings):
     """All configuration settings"""
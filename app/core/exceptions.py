@@ -11,3 +11,42 @@ class ResumeParsingException(ResumeException):
 
 class ResumeProcessingException(ResumeException):
     """Resume processing exception"""
+
+
+class RenderQueueFullException(ResumeException):
+    """Render queue is full and cannot accept more work"""
+
+
+class UnknownStyleException(ResumeException):
+    """Requested style or theme does not exist"""
+
+
+class JobNotFoundException(ResumeException):
+    """Render job does not exist or expired"""
+
+
+class UnknownProfileException(ResumeException):
+    """Requested PDF output profile does not exist"""
+
+
+class UnknownFormatException(ResumeException):
+    """Requested preview format does not exist"""
+
+
+class PayloadTooLargeException(ResumeException):
+    """Request body exceeds the maximum payload size"""
+
+
+class RequestRejectedException(ResumeException):
+    """Request rejected before any work, to be retried later"""
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LoadSheddingException(RequestRejectedException):
+    """Request shed because the server is at capacity"""
+
+
+class RateLimitException(RequestRejectedException):
+    """Client exceeded its request rate"""
@@ -1,15 +1,149 @@
-"""Logging module."""
+"""Logging module.
+
+By default log records are formatted and written to stdout by the thread
+that logs them, so under load the JSON formatting and any stdout
+back-pressure land on the request path. With a queue size, records are put
+on a bounded queue unformatted instead and a background listener thread
+formats and writes them. A full queue drops records and counts them rather than
+blocking the request.
+
+Per-request INFO records, of the loggers in ``sampled_loggers``, can also be
+sampled, so logging cost does not grow with traffic. Records above INFO are
+always kept.
+"""
+import atexit
 import logging
 import logging.config
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable, Optional
+
+from app.core.metrics import metrics
+
+# Records not logged, by "overflow" of the queue or "sampled" out
+DROPPED_RECORDS = metrics.counter(
+    "resume_log_records_dropped_total",
+    "Log records dropped by the log queue or by sampling",
+    labels=("reason",),
+)
+
+_QUEUE_HANDLER: Optional["BoundedQueueHandler"] = None
+_LISTENER: Optional[QueueListener] = None
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that drops records when its queue is full."""
+    def __init__(self, maxsize: int):
+        super().__init__(queue.Queue(maxsize))
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Queue records as they are, the listener's handlers format them.
+
+        The base class merges the arguments and the traceback into the
+        message before queueing, which is the cost the queue moves off the
+        logging thread. Records only cross threads, so they need not be
+        made picklable.
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED_RECORDS.inc("overflow")
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the INFO and DEBUG records of some loggers."""
+    def __init__(self, rate: float, loggers: Iterable[str]):
+        """Initialize the filter
+
+        Args:
+            rate: Fraction of records kept, between 0 and 1.
+            loggers: Names of the sampled loggers, their children included.
+        """
+        super().__init__()
+        self.rate = min(max(rate, 0.0), 1.0)
+        self.prefixes = tuple(loggers)
+        self._children = tuple(name + "." for name in self.prefixes)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        name = record.name
+        if name not in self.prefixes and not name.startswith(self._children):
+            return True
+        if random.random() < self.rate:
+            return True
+        DROPPED_RECORDS.inc("sampled")
+        return False
 
 
-def setup_logging(log_level="INFO", use_basic_format=False):
+def _queue_depth() -> int:
+    return _QUEUE_HANDLER.queue.qsize() if _QUEUE_HANDLER else 0
+
+
+metrics.callback(
+    "resume_log_queue_records", "Log records waiting to be written",
+    _queue_depth,
+)
+
+
+def _start_listener(handlers) -> None:
+    global _LISTENER  # pylint: disable=global-statement
+    _LISTENER = QueueListener(
+        _QUEUE_HANDLER.queue, *handlers, respect_handler_level=True
+    )
+    _LISTENER.start()
+
+
+def _restart_listener_in_child() -> None:
+    """Restart the listener in a forked child, where its thread is gone."""
+    if _LISTENER is None:
+        return
+    # the parent's queue may be held locked by a thread that did not fork
+    _QUEUE_HANDLER.queue = queue.Queue(_QUEUE_HANDLER.queue.maxsize)
+    _start_listener(_LISTENER.handlers)
+
+
+def stop_logging() -> None:
+    """Stop the listener after writing the queued records."""
+    global _LISTENER, _QUEUE_HANDLER  # pylint: disable=global-statement
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        root = logging.getLogger()
+        root.removeHandler(_QUEUE_HANDLER)
+        for handler in _LISTENER.handlers:
+            root.addHandler(handler)
+    _LISTENER = _QUEUE_HANDLER = None
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def setup_logging(
+    log_level="INFO",
+    use_basic_format=False,
+    queue_size=0,
+    sample_rate=1.0,
+    sampled_loggers=(),
+):
     """
     Setup logging.
     Args:
         log_level (str): Log level name.
         use_basic_format (str): Use basic format.
+        queue_size (int): Records buffered for the background listener,
+            0 writes records from the logging thread.
+        sample_rate (float): Fraction of the INFO records of
+            ``sampled_loggers`` kept.
+        sampled_loggers (Iterable[str]): Names of the sampled loggers.
     """
+    global _QUEUE_HANDLER  # pylint: disable=global-statement
+    stop_logging()
     configured_log_config = {
         "version": 1,
         "disable_existing_loggers": False,
@@ -65,3 +199,23 @@ def setup_logging(log_level="INFO", use_basic_format=False):
     }
 
     logging.config.dictConfig(configured_log_config)
+
+    root = logging.getLogger()
+    sampling = None
+    if sampled_loggers and sample_rate < 1:
+        sampling = SamplingFilter(sample_rate, sampled_loggers)
+    if queue_size <= 0:
+        if sampling:
+            for handler in root.handlers:
+                handler.addFilter(sampling)
+        return
+
+    handlers = list(root.handlers)
+    _QUEUE_HANDLER = BoundedQueueHandler(queue_size)
+    if sampling:
+        # drop sampled records before they are queued
+        _QUEUE_HANDLER.addFilter(sampling)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(_QUEUE_HANDLER)
+    _start_listener(handlers)
@@ -0,0 +1,311 @@
+"""Metrics module.
+
+A small in-process metrics registry rendered in the Prometheus text format,
+plus helpers to time request stages and report them in a ``Server-Timing``
+header. Metrics are kept per process; with several gunicorn workers each
+worker exposes its own values.
+"""
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond stages to long renders
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increase the counter for the given label values."""
+        key = tuple(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Return the current value for the given label values."""
+        return self._values.get(tuple(label_values), 0)
+
+    def samples(self) -> List[str]:
+        """Return the Prometheus text lines of the counter values."""
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} "
+            f"{_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class CallbackMetric:
+    """Gauge or counter whose value is read from a callback at scrape time.
+
+    Used to expose state owned by other components, e.g. queue depth or
+    cache hit counters, without duplicating it.
+    """
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], float],
+        kind: str = "gauge",
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> List[str]:
+        """Return the Prometheus text line of the current value."""
+        return [f"{self.name} {_format_value(self.callback())}"]
+
+
+class Histogram:
+    """Cumulative histogram, optionally split by label values."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels=(),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one observation for the given label values."""
+        key = tuple(label_values)
+        with self._lock:
+            # bucket counts, then +Inf count, then sum
+            series = self._series.setdefault(
+                key, [0] * (len(self.buckets) + 1) + [0.0]
+            )
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        """Return the number of observations for the given label values."""
+        series = self._series.get(tuple(label_values))
+        return sum(series[:-1]) if series else 0
+
+    def samples(self) -> List[str]:
+        """Return the Prometheus text lines of buckets, sum and count."""
+        with self._lock:
+            items = sorted(
+                (key, list(series)) for key, series in self._series.items()
+            )
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(
+                self.buckets + (float("inf"),), series[:-1]
+            ):
+                cumulative += count
+                labels = _format_labels(
+                    self.labels + ("le",), key + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            total = _format_value(series[-1])
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on the metrics endpoint."""
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels=()) -> Counter:
+        """Register and return a counter."""
+        return self._register(Counter(name, documentation, labels))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], float],
+        kind: str = "gauge",
+    ) -> CallbackMetric:
+        """Register and return a metric read from ``callback``."""
+        return self._register(
+            CallbackMetric(name, documentation, callback, kind)
+        )
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels=(),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Register and return a histogram."""
+        return self._register(
+            Histogram(name, documentation, labels, buckets)
+        )
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+REQUESTS = metrics.counter(
+    "resume_http_requests_total", "HTTP requests handled",
+    labels=("method", "path", "status"),
+)
+ERRORS = metrics.counter(
+    "resume_http_errors_total", "HTTP requests answered with a 5xx status",
+    labels=("method", "path"),
+)
+OUTPUT_BYTES = metrics.counter(
+    "resume_http_output_bytes_total", "Response body bytes sent",
+    labels=("method", "path"),
+)
+STAGE_SECONDS = metrics.histogram(
+    "resume_stage_seconds", "Duration of resume generation stages",
+    labels=("stage",),
+)
+
+
+class ServerTiming:
+    """Collect stage durations for a ``Server-Timing`` header."""
+    def __init__(self):
+        self._stages: List[Tuple[str, float, Optional[str]]] = []
+
+    def add(
+        self, stage: str, seconds: float, description: Optional[str] = None
+    ) -> None:
+        """Record a stage duration and observe it in the stage histogram."""
+        self._stages.append((stage, seconds, description))
+        STAGE_SECONDS.observe(seconds, stage)
+
+    def time(self, stage: str) -> "_StageTimer":
+        """Return a context manager timing a stage."""
+        return _StageTimer(self, stage)
+
+    @property
+    def stages(self) -> Dict[str, float]:
+        """Recorded stage durations in seconds."""
+        return {stage: seconds for stage, seconds, _ in self._stages}
+
+    def header(self) -> str:
+        """Format the recorded stages as a Server-Timing header value."""
+        entries = []
+        for stage, seconds, description in self._stages:
+            entry = f"{stage};dur={seconds * 1000:.2f}"
+            if description:
+                entry += f';desc="{description}"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+class _StageTimer:
+    """Context manager adding its duration to a ServerTiming."""
+    def __init__(self, timing: ServerTiming, stage: str):
+        self.timing = timing
+        self.stage = stage
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timing.add(self.stage, perf_counter() - self._start)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests, errors and response bytes.
+
+    It also stores the time the request was received in the request state
+    (``received_at``) and records the time spent sending the response body
+    as the ``transfer`` stage.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["received_at"] = perf_counter()
+        status = 500
+        sent = 0
+        started = 0.0
+
+        async def send_wrapper(message):
+            nonlocal status, sent, started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                started = perf_counter()
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    STAGE_SECONDS.observe(perf_counter() - started, "transfer")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUESTS.inc(method, path, str(status))
+            OUTPUT_BYTES.inc(method, path, amount=sent)
+            if status >= 500:
+                ERRORS.inc(method, path)
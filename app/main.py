@@ -1,20 +1,56 @@
 """Main module."""
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from time import perf_counter
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app import api
-from app.api.v1.endpoints import generator
+from app.api.v1.endpoints import generator, jobs
 from app.core.config import config as c
 from app.core.loggers import setup_logging
+from app.core.metrics import MetricsMiddleware, metrics
+from app.services.admission import admission
+from app.services.cache import render_cache
+from app.services.executor import render_executor
+from app.services.jobs import job_manager
+from app.services.memory import WatchdogMiddleware, rss_bytes, web_watchdog
+from app.services.warmup import readiness, warm_up
 
 setup_logging(
-    log_level=c.LOG_LEVEL, use_basic_format=c.LOG_USE_BASIC_FORMAT
+    log_level=c.LOG_LEVEL,
+    use_basic_format=c.LOG_USE_BASIC_FORMAT,
+    queue_size=c.LOG_QUEUE_SIZE,
+    sample_rate=c.LOG_SAMPLE_RATE,
+    sampled_loggers=[
+        name.strip() for name in c.LOG_SAMPLED_LOGGERS.split(",") if name
+    ],
 )
 _LOGGER = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Start and stop the render executor and job manager with the app.
+
+    Startup waits until every render worker is warmed up, so the server
+    only accepts requests once the first render is as fast as the next.
+    """
+    t0 = perf_counter()
+    render_executor.start()
+    await warm_up(render_executor)
+    job_manager.start()
+    _LOGGER.info("App started in %.2fs", perf_counter() - t0)
+    yield
+    await job_manager.stop()
+    render_executor.shutdown()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     docs_url=f"{c.API_PREFIX}/{api.__version__}/docs",
     openapi_url=f"{c.API_PREFIX}/{api.__version__}/openapi.json",
 )
@@ -24,15 +60,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(WatchdogMiddleware, watchdog=web_watchdog)
 
 app.include_router(generator.router, prefix=c.API_PREFIX)
+app.include_router(jobs.router, prefix=c.API_PREFIX)
 
 
 @app.get(f"{c.API_PREFIX}/{api.__version__}/health")
 async def health_check():
     """Health check endpoint for the service"""
-    return {"status": "healthy"}
+    # the disk cache stats query its index, which may be slow
+    cache_stats = await asyncio.to_thread(render_cache.stats)
+    return {
+        "status": "healthy",
+        "render": render_executor.stats(),
+        "admission": admission.stats(),
+        "cache": cache_stats,
+        "memory": {
+            "rss_bytes": rss_bytes(),
+            "requests": web_watchdog.requests,
+        },
+    }
+
+
+@app.get(f"{c.API_PREFIX}/{api.__version__}/ready")
+async def ready_check():
+    """Readiness endpoint, 503 until the render workers are warmed up"""
+    return JSONResponse(
+        readiness.to_dict(), status_code=200 if readiness.ready else 503
+    )
+
+
+@app.get(
+    f"{c.API_PREFIX}/{api.__version__}/metrics",
+    response_class=PlainTextResponse,
+)
+async def metrics_endpoint():
+    """Metrics endpoint in the Prometheus text format"""
+    # rendered in a thread, as callbacks like the disk cache size query
+    # an index
+    return PlainTextResponse(
+        await asyncio.to_thread(metrics.render),
+        media_type="text/plain; version=0.0.4",
+    )
 
 
 @app.get(f"{c.API_PREFIX}/{api.__version__}/")
@@ -43,6 +116,13 @@ async def root():
         "endpoints": {
             "/": "API information",
             "/health": "Health check endpoint",
-            "/resume/generate": "Generate a PDF resume (POST)"
+            "/ready": "Readiness endpoint",
+            "/metrics": "Prometheus metrics",
+            "/resume/generate": "Generate a PDF resume (POST)",
+            "/resume/generate/batch": "Generate a ZIP of PDF resumes (POST)",
+            "/resume/preview": "Preview a resume as HTML or text (POST)",
+            "/resume/jobs": "Submit a resume render job (POST)",
+            "/resume/jobs/{job_id}": "Render job status",
+            "/resume/jobs/{job_id}/download": "Download a rendered job",
         }
     }
@@ -1,4 +1,6 @@
 """Resume data models"""
+from typing import Any
+
 from pydantic import BaseModel, Field
 
 
@@ -159,3 +161,15 @@ class ResumeData(BaseModel):
             ]
         }
     }
+
+
+class ResumeBatch(BaseModel):
+    """Batch of resumes to generate.
+
+    Items are validated one by one while the batch is rendered, so an
+    invalid entry is reported in the batch manifest instead of rejecting
+    the whole request.
+    """
+    resumes: list[dict[str, Any]] = Field(
+        min_length=1, description="Resume data, one ResumeData per item"
+    )
@@ -0,0 +1,214 @@
+"""Admission control service.
+
+Renders are CPU-bound, so accepting every request of a burst only makes
+them wait behind each other until clients time out, and the renders of
+those requests are wasted. ``AdmissionController`` bounds the renders
+running at once and the requests waiting for one. A request is shed right
+away when the queue is full or when its expected wait exceeds the queue-wait
+deadline, and a queued request is shed when it reaches the deadline.
+``RateLimiter`` applies a token bucket per client on top.
+
+Both are per process and per event loop, like the render executor.
+"""
+import asyncio
+import math
+import threading
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from time import monotonic, perf_counter
+from typing import Any, AsyncIterator, Deque, Dict, Tuple
+
+from app.core.config import config as c
+from app.core.exceptions import LoadSheddingException, RateLimitException
+from app.core.metrics import metrics
+
+# Requests by outcome: "admitted" right away, "queued" then admitted, or
+# "shed" with the reason ("queue_full", "deadline" or "rate_limit")
+ADMISSIONS = metrics.counter(
+    "resume_admission_requests_total",
+    "Render requests by admission outcome",
+    labels=("result", "reason"),
+)
+ADMISSION_WAIT_SECONDS = metrics.histogram(
+    "resume_admission_wait_seconds",
+    "Time admitted requests waited for a render slot",
+)
+
+# Weight of the latest render in the average render time
+_EWMA_WEIGHT = 0.2
+
+
+class AdmissionController:
+    """Bounds concurrent renders and the requests waiting for one."""
+    def __init__(
+        self, max_concurrency: int, max_queue: int, max_wait: float
+    ):
+        """Initialize the controller
+
+        Args:
+            max_concurrency: Requests allowed to render at once.
+            max_queue: Requests allowed to wait for a render slot.
+            max_wait: Seconds a request may wait for a slot before it is
+                shed.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # moving average of the time a slot is held, in seconds
+        self._hold_seconds = 0.0
+
+    @property
+    def active(self) -> int:
+        """Number of admitted requests holding a slot."""
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    def expected_wait(self) -> float:
+        """Estimate the wait of a request queued now, in seconds."""
+        ahead = len(self._waiters) + 1
+        return self._hold_seconds * ahead / self.max_concurrency
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the controller state."""
+        return {
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+            "expected_wait": round(self.expected_wait(), 3),
+        }
+
+    def _shed(self, reason: str) -> LoadSheddingException:
+        ADMISSIONS.inc("shed", reason)
+        retry_after = max(1, math.ceil(self.expected_wait()))
+        return LoadSheddingException(
+            f"Server is at capacity ({reason})", retry_after=retry_after
+        )
+
+    async def acquire(self) -> None:
+        """Wait for a render slot
+
+        Raises:
+            LoadSheddingException: If the queue is full, the expected wait
+                exceeds the deadline or the deadline passed while waiting.
+        """
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            ADMISSIONS.inc("admitted", "")
+            ADMISSION_WAIT_SECONDS.observe(0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("queue_full")
+        if self.expected_wait() > self.max_wait:
+            raise self._shed("deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        t0 = perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the wait ended
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            raise self._shed("deadline") from exc
+        ADMISSIONS.inc("queued", "")
+        ADMISSION_WAIT_SECONDS.observe(perf_counter() - t0)
+
+    def release(self, held: float = 0.0) -> None:
+        """Free a slot, handing it to the first waiting request
+
+        Args:
+            held: Seconds the slot was held, used to estimate waits.
+        """
+        if held:
+            self._hold_seconds += _EWMA_WEIGHT * (held - self._hold_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a render slot for the duration of the block."""
+        await self.acquire()
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.release(perf_counter() - t0)
+
+
+class RateLimiter:
+    """Token bucket rate limit per client."""
+    def __init__(self, rate: float, burst: int, max_clients: int = 10000):
+        """Initialize the rate limiter
+
+        Args:
+            rate: Tokens added per second, 0 disables the limit.
+            burst: Bucket size, the requests a client can make at once.
+            max_clients: Number of client buckets kept, least recently
+                seen clients are forgotten first.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        # tokens and last update time by client
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str) -> None:
+        """Take a token from the bucket of a client
+
+        Raises:
+            RateLimitException: If the bucket of the client is empty.
+        """
+        if self.rate <= 0:
+            return
+        now = monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        if not allowed:
+            ADMISSIONS.inc("shed", "rate_limit")
+            raise RateLimitException(
+                f"Rate limit of {self.rate:g} requests per second exceeded",
+                retry_after=max(1, math.ceil((1 - tokens) / self.rate)),
+            )
+
+
+admission = AdmissionController(
+    max_concurrency=c.ADMISSION_MAX_CONCURRENCY,
+    max_queue=c.ADMISSION_MAX_QUEUE,
+    max_wait=c.ADMISSION_MAX_WAIT_SECONDS,
+)
+rate_limiter = RateLimiter(
+    rate=c.RATE_LIMIT_PER_SECOND, burst=c.RATE_LIMIT_BURST
+)
+metrics.callback(
+    "resume_admission_active", "Render requests holding a slot",
+    lambda: admission.active,
+)
+metrics.callback(
+    "resume_admission_waiting", "Render requests waiting for a slot",
+    lambda: admission.waiting,
+)
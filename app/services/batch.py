@@ -0,0 +1,154 @@
+"""Batch resume generation service.
+
+Renders many resumes in parallel through the render executor and streams a
+ZIP archive back as each PDF finishes. The archive is written to an
+unseekable buffer that is drained after every entry, so it is never held in
+memory as a whole. A ``manifest.json`` entry at the end records the status
+and timing of every item.
+"""
+import asyncio
+import json
+import logging
+import zipfile
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List
+
+from pydantic import ValidationError
+
+from app.models.resume import ResumeData
+from app.services.executor import RenderExecutor
+from app.services.rendering import render_cached
+from app.services.utils import to_file_name
+
+_LOGGER = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Pause before retrying an item rejected by a full render queue
+_QUEUE_RETRY_DELAY = 0.05
+
+
+class _ZipStream:
+    """Write-only, unseekable sink that hands written bytes back in chunks."""
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing to flush, bytes are drained explicitly."""
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _render_item(
+    executor: RenderExecutor,
+    index: int,
+    item: Dict[str, Any],
+    theme: str,
+    profile: str,
+) -> Dict[str, Any]:
+    """Validate and render one batch item, never raising."""
+    result: Dict[str, Any] = {"index": index, "status": "ok", "error": None}
+    t0 = perf_counter()
+    try:
+        data = ResumeData.model_validate(item)
+    except ValidationError as exc:
+        result.update(
+            status="invalid", error=str(exc), name=item.get("name")
+        )
+        return result
+
+    result["name"] = data.name
+    result["file"] = f"{index:04d}_{to_file_name(data.name)}.pdf"
+    try:
+        rendered = await render_cached(
+            executor, data, theme, profile, retry_delay=_QUEUE_RETRY_DELAY
+        )
+    except Exception as exc:  # pylint: disable=broad-except
+        _LOGGER.error("Error rendering batch item %d: %s", index, exc)
+        result.update(status="error", error=str(exc))
+        return result
+    finally:
+        result["render_ms"] = round((perf_counter() - t0) * 1000, 3)
+
+    result["cached"] = rendered.cached
+    result["bytes"] = len(rendered.pdf)
+    result["pdf"] = rendered.pdf
+    return result
+
+
+async def stream_batch_zip(
+    items: List[Dict[str, Any]],
+    theme: str,
+    executor: RenderExecutor,
+    profile: str = "fast",
+) -> AsyncIterator[bytes]:
+    """Render resumes in parallel and yield a ZIP archive incrementally
+
+    At most ``executor.max_workers`` items are in flight at a time, so a
+    large batch does not flood the render queue shared with single
+    requests.
+
+    Args:
+        items: Raw resume payloads, validated one by one.
+        theme: Style theme used for every resume.
+        executor: Render executor the PDFs are built in.
+        profile: PDF output profile used for every resume.
+
+    Yields:
+        Chunks of the ZIP archive, one or more per finished resume.
+    """
+    t0 = perf_counter()
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED)
+    pending = set()
+    manifest = []
+    next_index = 0
+    try:
+        while next_index < len(items) or pending:
+            while next_index < len(items) and (
+                len(pending) < executor.max_workers
+            ):
+                pending.add(asyncio.create_task(_render_item(
+                    executor, next_index, items[next_index], theme, profile
+                )))
+                next_index += 1
+
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result = task.result()
+                pdf = result.pop("pdf", None)
+                if pdf is not None:
+                    archive.writestr(result["file"], pdf)
+                manifest.append(result)
+            chunk = stream.drain()
+            if chunk:
+                yield chunk
+
+        manifest.sort(key=lambda entry: entry["index"])
+        summary = {
+            "total": len(items),
+            "succeeded": sum(e["status"] == "ok" for e in manifest),
+            "failed": sum(e["status"] != "ok" for e in manifest),
+            "elapsed_ms": round((perf_counter() - t0) * 1000, 3),
+            "items": manifest,
+        }
+        archive.writestr(MANIFEST_NAME, json.dumps(summary, indent=2))
+        archive.close()
+        yield stream.drain()
+        _LOGGER.info(
+            "Done batch of %d resumes in %.2fs",
+            len(items), perf_counter() - t0,
+        )
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,378 @@
+"""Rendered PDF cache service.
+
+``RenderCache`` keeps PDFs in the memory of one process, so with several
+gunicorn workers every worker caches its own copies and sees a fraction of
+the hits. ``DiskRenderCache`` is shared by every worker on the node: PDFs
+are files named by their render key, indexed in SQLite with their size and
+last access for eviction, and hits are memory-mapped from the page cache
+rather than copied through Python.
+
+The ``*_async`` methods are used from the event loop. The disk cache runs
+them in a thread, as an index update may wait for the SQLite write lock
+held by another process. Its ``stats`` and ``size`` query the index too,
+so ``/health`` and ``/metrics`` read them from a thread.
+"""
+import asyncio
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from time import time
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+from app.core.config import config as c
+from app.core.metrics import metrics
+from app.models.resume import ResumeData
+from app.services.style import Style
+from app.services.utils import LocalConnection, atomic_write
+
+
+def render_key(
+    data: ResumeData, style: Style, profile: str = "balanced",
+    fit: bool = False,
+) -> str:
+    """Build a content address for a render.
+
+    The key is a SHA-256 over the canonical JSON of the validated resume
+    (field order fixed by the model, defaults filled in), the effective
+    style configuration, the output profile and the fit-to-page flag, so
+    equal inputs always map to the same key.
+
+    Args:
+        data: Validated resume data.
+        style: Style the resume is rendered with.
+        profile: Name of the PDF output profile.
+        fit: Whether the resume is shrunk to fit on one page.
+
+    Returns:
+        Hex digest identifying the rendered PDF.
+    """
+    digest = hashlib.sha256()
+    digest.update(data.model_dump_json().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(style.cache_key().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(profile.encode("utf-8"))
+    if fit:
+        # the fitted scales follow from the data and the theme style
+        digest.update(b"\0fit")
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered PDFs bounded by total bytes."""
+    def __init__(self, max_bytes: int):
+        """Initialize the cache
+
+        Args:
+            max_bytes: Byte budget for cached PDFs. 0 disables the cache.
+        """
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total bytes currently cached."""
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for ``key`` and mark it recently used."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """Cache ``value`` under ``key``, evicting least recently used PDFs.
+
+        Values larger than the whole budget are not cached.
+        """
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def view(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for ``key`` to send, like ``get``."""
+        return self.get(key)
+
+    async def get_async(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for ``key``, see ``get``."""
+        return self.get(key)
+
+    async def view_async(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for ``key`` to send, see ``view``."""
+        return self.view(key)
+
+    async def put_async(self, key: str, value: bytes) -> None:
+        """Cache ``value`` under ``key``, see ``put``."""
+        self.put(key, value)
+
+    def clear(self) -> None:
+        """Drop all cached PDFs and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache counters."""
+        return {
+            "kind": "memory",
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class DiskRenderCache:
+    """Render cache on local disk shared by every process on the node.
+
+    Files are written to a temporary name and renamed into place, so
+    readers never see a partial PDF. The index is updated after the rename
+    and evicts least recently used PDFs past the byte budget in the same
+    transaction. A PDF evicted while it is sent stays readable to the
+    process that mapped it until it is unmapped.
+    """
+    # Seconds between updates of the last access of an entry, so hits on
+    # hot entries do not each take the index write lock
+    _TOUCH_INTERVAL = 60.0
+
+    def __init__(self, root: str, max_bytes: int):
+        """Initialize the cache
+
+        Args:
+            root: Directory holding the SQLite index and the PDF files.
+            max_bytes: Byte budget for cached PDFs. 0 disables the cache.
+        """
+        self.root = root
+        self.max_bytes = max(0, max_bytes)
+        # counters of this process, the entries are shared
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # the counters are updated from the threads of the async methods
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._connection = LocalConnection(
+            os.path.join(root, "renders.sqlite3")
+        )
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS renders ("
+                "key TEXT PRIMARY KEY, size INTEGER, accessed_at REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS renders_accessed_at "
+                "ON renders (accessed_at)"
+            )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.pdf")
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM renders"
+        ).fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Total bytes currently cached by all processes."""
+        return self._connection().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM renders"
+        ).fetchone()[0]
+
+    def _open(self, key: str) -> Optional[BinaryIO]:
+        """Open the file of an entry, counting the hit or miss."""
+        row = self._connection().execute(
+            "SELECT accessed_at FROM renders WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            # pylint: disable-next=consider-using-with
+            f = open(self._path(key), "rb")
+        except FileNotFoundError:
+            # evicted by another process since the lookup
+            with self._connection() as conn:
+                conn.execute("DELETE FROM renders WHERE key = ?", (key,))
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time()
+        if now - row[0] > self._TOUCH_INTERVAL:
+            with self._connection() as conn:
+                conn.execute(
+                    "UPDATE renders SET accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+        with self._lock:
+            self.hits += 1
+        return f
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for ``key`` read into memory."""
+        f = self._open(key)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def view(self, key: str) -> Optional[memoryview]:
+        """Return the cached PDF for ``key`` mapped from its file
+
+        The view reads the file from the page cache without copying it,
+        and stays valid when the entry is evicted. The mapping is released
+        with the last reference to the view.
+        """
+        f = self._open(key)
+        if f is None:
+            return None
+        with f:
+            return memoryview(
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            )
+
+    def put(self, key: str, value: bytes) -> None:
+        """Cache ``value`` under ``key``, evicting least recently used PDFs.
+
+        Values larger than the whole budget are not cached.
+        """
+        if not value or len(value) > self.max_bytes:
+            return
+        atomic_write(self._path(key), value)
+
+        evicted: List[str] = []
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO renders (key, size, accessed_at) "
+                "VALUES (?, ?, ?)", (key, len(value), time()),
+            )
+            excess = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM renders"
+            ).fetchone()[0] - self.max_bytes
+            if excess > 0:
+                rows = conn.execute(
+                    "SELECT key, size FROM renders WHERE key != ? "
+                    "ORDER BY accessed_at", (key,),
+                )
+                for old_key, size in rows:
+                    evicted.append(old_key)
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany(
+                    "DELETE FROM renders WHERE key = ?",
+                    [(old_key,) for old_key in evicted],
+                )
+        for old_key in evicted:
+            try:
+                os.unlink(self._path(old_key))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self.evictions += len(evicted)
+
+    async def get_async(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for ``key``, see ``get``."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def view_async(self, key: str) -> Optional[memoryview]:
+        """Return the cached PDF for ``key`` to send, see ``view``."""
+        return await asyncio.to_thread(self.view, key)
+
+    async def put_async(self, key: str, value: bytes) -> None:
+        """Cache ``value`` under ``key``, see ``put``."""
+        await asyncio.to_thread(self.put, key, value)
+
+    def clear(self) -> None:
+        """Drop all cached PDFs and reset the counters."""
+        with self._connection() as conn:
+            keys = [
+                row[0] for row in conn.execute("SELECT key FROM renders")
+            ]
+            conn.execute("DELETE FROM renders")
+        for key in keys:
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache counters."""
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM renders"
+        ).fetchone()
+        return {
+            "kind": "disk",
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def create_render_cache(
+    kind: str, path: str, max_bytes: int
+) -> Union[RenderCache, DiskRenderCache]:
+    """Create a render cache by kind
+
+    Args:
+        kind: Either "memory" or "disk".
+        path: Directory used by the disk cache.
+        max_bytes: Byte budget for cached PDFs.
+
+    Returns:
+        The render cache.
+    """
+    if kind == "memory":
+        return RenderCache(max_bytes)
+    if kind == "disk":
+        return DiskRenderCache(path, max_bytes)
+    raise ValueError(f"Unknown render cache: {kind}")
+
+
+render_cache = create_render_cache(
+    c.RENDER_CACHE, c.RENDER_CACHE_PATH, c.RENDER_CACHE_MAX_BYTES
+)
+metrics.callback(
+    "resume_render_cache_hits_total", "Render cache hits",
+    lambda: render_cache.hits, kind="counter",
+)
+metrics.callback(
+    "resume_render_cache_misses_total", "Render cache misses",
+    lambda: render_cache.misses, kind="counter",
+)
+metrics.callback(
+    "resume_render_cache_bytes", "Bytes held by the render cache",
+    lambda: render_cache.size,
+)
@@ -0,0 +1,167 @@
+"""Resume document representation.
+
+``ResumeDocument`` is the resume as the renderers see it: the header and
+the sections in render order, with empty sections left out, text escaped
+for paragraph markup and the theme's bullet marker resolved. It is built
+once from ``ResumeData`` by ``build_document`` and consumed by the PDF
+generator and the preview renderers, so none of them walks the model or
+decides on section order again.
+
+The document is made of named tuples: immutable, without instance dicts
+and hashable, so it can key caches. It is pickled as plain tuples when it
+is handed to a worker process or a job queue.
+"""
+from typing import NamedTuple, Tuple
+from xml.sax import saxutils
+
+from app.models.resume import ResumeData
+from app.services.style import Style
+
+
+def escape(text: str) -> str:
+    """Escape text for paragraph markup."""
+    # most values need no escaping, which is cheaper to test than to do
+    if "&" in text or "<" in text or ">" in text:
+        return saxutils.escape(text)
+    return text
+
+
+class Line(NamedTuple):
+    """Paragraph of text, optionally starting with a bold label."""
+    text: str
+    label: str = ""
+
+
+class Entry(NamedTuple):
+    """Dated section entry, e.g. a job or a degree."""
+    heading: str
+    date: str
+    lines: Tuple[Line, ...] = ()
+    bullets: Tuple[str, ...] = ()
+
+
+class Section(NamedTuple):
+    """Titled section with paragraphs followed by entries."""
+    title: str
+    lines: Tuple[Line, ...] = ()
+    entries: Tuple[Entry, ...] = ()
+
+
+class ResumeDocument(NamedTuple):
+    """Render-ready resume, all text escaped for paragraph markup."""
+    name: str
+    title: str
+    # contact details joined into one line, or "" without any
+    contact: str
+    sections: Tuple[Section, ...]
+    # prefix of every bullet paragraph, the marker and a space
+    bullet: str = ""
+
+    def __reduce__(self):
+        # pickle reduces every named tuple through a Python call, plain
+        # tuples are written by the C pickler, which is twice as fast
+        return _restore, ((
+            self.name, self.title, self.contact, self.bullet,
+            tuple(
+                (
+                    section.title,
+                    tuple(map(tuple, section.lines)),
+                    tuple(
+                        (
+                            entry.heading, entry.date,
+                            tuple(map(tuple, entry.lines)), entry.bullets,
+                        )
+                        for entry in section.entries
+                    ),
+                )
+                for section in self.sections
+            ),
+        ),)
+
+
+def _restore(state: tuple) -> ResumeDocument:
+    """Rebuild a document from its pickled plain tuples."""
+    name, title, contact, bullet, sections = state
+    return ResumeDocument(name, title, contact, tuple(
+        Section(
+            section_title,
+            tuple(Line._make(line) for line in lines),
+            tuple(
+                Entry(heading, date, tuple(Line._make(line) for line in
+                                           entry_lines), bullets)
+                for heading, date, entry_lines, bullets in entries
+            ),
+        )
+        for section_title, lines, entries in sections
+    ), bullet)
+
+
+def build_document(resume: ResumeData, style: Style) -> ResumeDocument:
+    """Build the document of a resume
+
+    Sections follow the PDF order: summary, skills, experience and
+    education.
+
+    Args:
+        resume: Validated resume data.
+        style: Style the document is rendered with, for the bullet marker.
+
+    Returns:
+        The resume document.
+    """
+    sections = []
+    if resume.summary:
+        sections.append(Section(
+            "Professional Summary", lines=(Line(escape(resume.summary)),)
+        ))
+
+    if resume.skills:
+        sections.append(Section("Skills", lines=tuple(
+            Line(escape(", ".join(skills)), escape(category))
+            for category, skills in resume.skills.items()
+        )))
+
+    if resume.experience:
+        entries = []
+        for job in resume.experience:
+            description = job.description
+            entries.append(Entry(
+                escape(f"{job.title} - {job.company}"),
+                escape(job.date),
+                lines=(
+                    (Line(escape(description)),)
+                    if description and isinstance(description, str) else ()
+                ),
+                bullets=(
+                    tuple(escape(item) for item in description)
+                    if isinstance(description, list) else ()
+                ),
+            ))
+        sections.append(Section(
+            "Professional Experience", entries=tuple(entries)
+        ))
+
+    if resume.education:
+        sections.append(Section("Education", entries=tuple(
+            Entry(
+                escape(edu.degree),
+                escape(edu.year),
+                lines=(Line(escape(edu.institution)),) + (
+                    (Line(escape(edu.description)),)
+                    if edu.description else ()
+                ),
+            )
+            for edu in resume.education
+        )))
+
+    contact = " | ".join(
+        value for value in (resume.email, resume.phone, resume.linkedin)
+        if value
+    )
+    return ResumeDocument(
+        name=escape(resume.name),
+        title=escape(resume.title),
+        contact=escape(contact),
+        sections=tuple(sections),
+        bullet=f"{style.get_bullet_point()} ",
+    )
@@ -0,0 +1,215 @@
+"""Render executor service.
+
+PDF rendering with reportlab is CPU-bound and synchronous, so it must not run
+on the event loop. ``RenderExecutor`` runs render tasks in a process pool (or
+a thread pool as a fallback) and bounds the number of tasks waiting for a
+worker, so a burst of requests fails fast instead of piling up.
+
+Render workers are recycled so their memory stays bounded: each one is
+replaced after a number of tasks, and the pool is replaced once a worker
+reports more resident memory than allowed after a render. A replaced pool
+finishes the tasks it was given before its workers exit.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import config as c
+from app.core.exceptions import RenderQueueFullException
+from app.core.metrics import metrics
+from app.services.memory import MemoryWatchdog
+from app.services.warmup import warm_up_worker
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RenderExecutor:
+    """Bounded executor for CPU-bound render tasks."""
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: int = 1,
+        max_queue_size: int = 32,
+        start_method: Optional[str] = None,
+        initializer: Optional[Callable[[], None]] = None,
+        max_tasks_per_worker: int = 0,
+        max_worker_rss_bytes: int = 0,
+    ):
+        """Initialize the render executor
+
+        Args:
+            kind: Either "process" or "thread".
+            max_workers: Number of workers rendering concurrently.
+            max_queue_size: Number of tasks allowed to wait for a worker
+                before new tasks are rejected.
+            start_method: multiprocessing start method for the process pool.
+            initializer: Picklable callable run once in every worker before
+                its first task, e.g. to warm up the renderer.
+            max_tasks_per_worker: Tasks after which a process worker is
+                replaced, 0 keeps workers for the life of the pool.
+            max_worker_rss_bytes: Resident memory a worker may report
+                after a task before the pool is replaced, 0 disables it.
+        """
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown render executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self.start_method = start_method
+        self.initializer = initializer
+        self.max_tasks_per_worker = max(0, max_tasks_per_worker)
+        self.watchdog = MemoryWatchdog(
+            "render", max_rss_bytes=max_worker_rss_bytes
+        )
+        self.recycles = 0
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of submitted tasks that have not finished yet."""
+        return self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted tasks waiting for a free worker."""
+        return max(0, self._pending - self.max_workers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the executor state."""
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "recycles": self.recycles,
+        }
+
+    def start(self) -> Executor:
+        """Create the underlying pool if it does not exist yet."""
+        if self._executor is not None:
+            return self._executor
+
+        if self.kind == "process":
+            try:
+                context = multiprocessing.get_context(self.start_method)
+                max_tasks = self.max_tasks_per_worker or None
+                if max_tasks and context.get_start_method() == "fork":
+                    _LOGGER.warning(
+                        "Render workers are not replaced after %d tasks, "
+                        "which needs the spawn or forkserver start method",
+                        max_tasks,
+                    )
+                    max_tasks = None
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=self.initializer,
+                    max_tasks_per_child=max_tasks,
+                )
+            except (OSError, ValueError, NotImplementedError) as exc:
+                _LOGGER.warning(
+                    "Process pool unavailable, falling back to threads: %s",
+                    exc,
+                )
+                self.kind = "thread"
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="render",
+                initializer=self.initializer,
+            )
+
+        _LOGGER.info(
+            "Started %s render executor with %d workers",
+            self.kind, self.max_workers,
+        )
+        return self._executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def recycle(self) -> None:
+        """Replace the pool, letting the old one finish its tasks."""
+        if self._executor is None:
+            return
+        old, self._executor = self._executor, None
+        old.shutdown(wait=False)
+        self.recycles += 1
+        self.watchdog.reset()
+        _LOGGER.info("Recycled %s render executor", self.kind)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` in the pool and wait for its result
+
+        Results with a ``memory`` mapping holding the worker's
+        ``rss_bytes``, like ``RenderResult``, are checked against the
+        worker memory limit, and the pool is recycled past it.
+
+        Args:
+            func: A picklable, module-level callable.
+            *args: Positional arguments passed to ``func``.
+            **kwargs: Keyword arguments passed to ``func``.
+
+        Returns:
+            The return value of ``func``.
+
+        Raises:
+            RenderQueueFullException: If the queue is already full.
+        """
+        if self._pending >= self.max_workers + self.max_queue_size:
+            raise RenderQueueFullException(
+                f"Render queue is full ({self.queue_depth} waiting)"
+            )
+
+        executor = self.start()
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        try:
+            result = await loop.run_in_executor(
+                executor, functools.partial(func, *args, **kwargs)
+            )
+        except BrokenProcessPool:
+            _LOGGER.error("Render process pool is broken, recreating it")
+            self.shutdown(wait=False)
+            raise
+        finally:
+            self._pending -= 1
+
+        memory = getattr(result, "memory", None)
+        # a result of an already replaced pool says nothing of this one
+        if (
+            self.kind == "process" and memory and "rss_bytes" in memory
+            and executor is self._executor
+            and self.watchdog.check(memory["rss_bytes"])
+        ):
+            self.recycle()
+        return result
+
+
+render_executor = RenderExecutor(
+    kind=c.RENDER_EXECUTOR,
+    max_workers=c.RENDER_WORKERS,
+    max_queue_size=c.RENDER_QUEUE_SIZE,
+    start_method=c.RENDER_START_METHOD,
+    initializer=warm_up_worker,
+    max_tasks_per_worker=c.RENDER_WORKER_MAX_TASKS,
+    max_worker_rss_bytes=c.RENDER_WORKER_MAX_RSS_BYTES,
+)
+metrics.callback(
+    "resume_render_in_flight", "Renders submitted and not finished",
+    lambda: render_executor.in_flight,
+)
+metrics.callback(
+    "resume_render_queue_depth", "Renders waiting for a free worker",
+    lambda: render_executor.queue_depth,
+)
@@ -0,0 +1,255 @@
+"""Fit-to-page service.
+
+Reportlab only knows the height of a resume after ``doc.build``, so
+shrinking a resume to one page by trial and error costs a full render per
+attempt. ``estimate_height`` predicts the height from font metrics instead:
+it wraps every paragraph of the resume document the way reportlab does,
+word by word with ``stringWidth`` against the widths and sizes of the
+Style, and stacks the paragraphs with their spacing like the frame does.
+
+``fit_to_page`` binary-searches the spacing scale, then the font scale,
+for the largest that fits, and the PDF is built once with the result.
+Word widths are cached per text at unit font size and line counts per text,
+font size and width, so repeated texts and the candidate scales of a search
+are mostly cache hits.
+"""
+import math
+from functools import lru_cache
+from typing import List, Tuple
+from xml.sax.saxutils import unescape
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from app.core.config import config as c
+from app.services.document import Line, ResumeDocument
+from app.services.layout import CONTENT_WIDTH, get_layout
+from app.services.style import Style, get_style
+
+# Frame of the SimpleDocTemplate, the page less 1 inch margins and the
+# 6 point frame padding on each side
+FRAME_WIDTH = CONTENT_WIDTH - 12
+FRAME_HEIGHT = letter[1] - 2 * inch - 12
+
+# Scales are searched in steps of 1%, which keeps the number of distinct
+# styles built by fitting small
+_STEPS = 100
+
+# Paragraph text split in runs of one font, as (text, font name) pairs
+Runs = Tuple[Tuple[str, str], ...]
+# Space before, height and space after of a flowable
+_Block = Tuple[float, float, float]
+
+
+@lru_cache(maxsize=c.FIT_CACHE_SIZE)
+def _unit_widths(runs: Runs) -> Tuple[float, Tuple[float, ...]]:
+    """Return the space width and word widths of a text at font size 1."""
+    widths = []
+    for text, font in runs:
+        widths.extend(stringWidth(word, font, 1) for word in text.split())
+    return stringWidth(" ", runs[-1][1], 1), tuple(widths)
+
+
+@lru_cache(maxsize=c.FIT_CACHE_SIZE)
+def line_count(
+    runs: Runs, font_size: float, widths: Tuple[float, float]
+) -> int:
+    """Count the lines of a paragraph
+
+    Lines are broken like reportlab breaks them: greedily, a word moving to
+    the next line when it would overflow the current one, and a word wider
+    than a whole line split across lines.
+
+    Args:
+        runs: Unescaped paragraph text, in runs of one font.
+        font_size: Font size of the paragraph.
+        widths: Width of the first line and of the following lines.
+
+    Returns:
+        The number of lines, 0 for a paragraph without words.
+    """
+    space, words = _unit_widths(runs)
+    if not words:
+        return 0
+    # compare unit widths against the line widths at font size 1
+    limit = widths[0] / font_size
+    rest = widths[1] / font_size
+    lines = 1
+    current = -space
+    for width in words:
+        if current + space + width > limit and current > -space:
+            lines += 1
+            limit = rest
+            current = width
+        else:
+            current += space + width
+        if current > limit:
+            # reportlab splits words longer than a line
+            extra = math.ceil(current / rest) - 1
+            lines += extra
+            limit = rest
+            current -= extra * rest
+    return lines
+
+
+def _paragraph(
+    text: str, style: ParagraphStyle, width: float,
+    label: str = "", label_font: str = "",
+) -> Tuple[float, float]:
+    """Return the space before and the height of a paragraph."""
+    text = unescape(text)
+    if style.textTransform == "uppercase":
+        text = text.upper()
+    runs: Runs = ((text, style.fontName),)
+    if label:
+        runs = ((unescape(label) + ":", label_font),) + runs
+    lines = line_count(runs, style.fontSize, (
+        width - style.leftIndent - style.firstLineIndent - style.rightIndent,
+        width - style.leftIndent - style.rightIndent,
+    ))
+    return style.spaceBefore, lines * style.leading
+
+
+def _line_blocks(
+    lines: Tuple[Line, ...], style: Style, blocks: List[_Block]
+) -> None:
+    """Add the blocks of paragraphs, with their label in bold."""
+    normal = style.normal
+    for line in lines:
+        before, height = _paragraph(
+            line.text, normal, FRAME_WIDTH, line.label, style.bold_font
+        )
+        blocks.append((before, height, normal.spaceAfter))
+
+
+def _blocks(document: ResumeDocument, style: Style) -> List[_Block]:
+    """Return the blocks of the flowables the generator builds."""
+    layout = get_layout(style)
+    blocks: List[_Block] = []
+
+    header = [(document.name, style.name), (document.title, style.title)]
+    if document.contact:
+        header.append((document.contact, style.contact_info))
+    for text, paragraph_style in header:
+        before, height = _paragraph(text, paragraph_style, FRAME_WIDTH)
+        blocks.append((before, height, paragraph_style.spaceAfter))
+
+    header_style = style.section_header
+    bullet_style = style.bullet_point
+    cell_styles = (style.item_title, style.item_subtitle)
+    row_padding = layout.top_padding + layout.bottom_padding
+    for section in document.sections:
+        before, height = _paragraph(section.title, header_style, FRAME_WIDTH)
+        blocks.append((before, height, header_style.spaceAfter))
+        # the zero-height separator line
+        blocks.append((0, 0, 0))
+        _line_blocks(section.lines, style, blocks)
+
+        for entry in section.entries:
+            height = max(
+                _paragraph(text, cell_style, cell_width)[1]
+                for text, cell_style, cell_width in zip(
+                    (entry.heading, entry.date), cell_styles,
+                    layout.cell_widths,
+                )
+            )
+            blocks.append((0, height + row_padding, 0))
+            _line_blocks(entry.lines, style, blocks)
+            for item in entry.bullets:
+                before, height = _paragraph(
+                    document.bullet + item, bullet_style, FRAME_WIDTH
+                )
+                blocks.append((before, height, bullet_style.spaceAfter))
+    return blocks
+
+
+def estimate_height(document: ResumeDocument, style: Style) -> float:
+    """Estimate the height of a resume laid out in one tall frame
+
+    Space before a flowable overlaps the space after the previous one and
+    is dropped at the top of the frame, as in reportlab frames.
+
+    Args:
+        document: Resume document.
+        style: Style the resume is rendered with.
+
+    Returns:
+        The height in points from the top of the frame to the bottom of
+        the last flowable.
+    """
+    height = 0.0
+    previous_after = 0.0
+    first = True
+    for before, block_height, after in _blocks(document, style):
+        if not first:
+            height += max(before - previous_after, 0) + previous_after
+        height += block_height
+        previous_after = after
+        first = False
+    return height
+
+
+def estimate_pages(document: ResumeDocument, style: Style) -> int:
+    """Estimate the number of pages of a resume."""
+    return max(1, math.ceil(estimate_height(document, style) / FRAME_HEIGHT))
+
+
+def _scaled(theme: str, font_steps: int, spacing_steps: int) -> Style:
+    return get_style(
+        theme,
+        font_scale=font_steps / _STEPS,
+        spacing_scale=spacing_steps / _STEPS,
+    )
+
+
+def _largest_fitting(fits, low: int, high: int) -> int:
+    """Binary-search the largest step in [low, high] that fits."""
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def fit_to_page(document: ResumeDocument, theme: str = "default") -> Style:
+    """Return the style of a theme scaled to fit a resume on one page
+
+    Spacing shrinks first, down to FIT_MIN_SPACING_SCALE, and fonts only
+    if the resume still does not fit, down to FIT_MIN_FONT_SCALE. A resume
+    that does not fit even then gets the smallest scales.
+
+    Args:
+        document: Resume document.
+        theme: Name of the style theme.
+
+    Returns:
+        The theme style itself if the resume fits already, else the shared
+        style with the largest fitting scales.
+
+    Raises:
+        UnknownStyleException: If the theme is not registered.
+    """
+    style = get_style(theme)
+    if estimate_height(document, style) <= FRAME_HEIGHT:
+        return style
+
+    min_font = round(c.FIT_MIN_FONT_SCALE * _STEPS)
+    min_spacing = round(c.FIT_MIN_SPACING_SCALE * _STEPS)
+
+    def fits(font: int, spacing: int) -> bool:
+        scaled = _scaled(theme, font, spacing)
+        return estimate_height(document, scaled) <= FRAME_HEIGHT
+
+    if fits(_STEPS, min_spacing):
+        spacing = _largest_fitting(
+            lambda steps: fits(_STEPS, steps), min_spacing, _STEPS - 1
+        )
+        return _scaled(theme, _STEPS, spacing)
+    font = _largest_fitting(
+        lambda steps: fits(steps, min_spacing), min_font, _STEPS - 1
+    )
+    return _scaled(theme, font, min_spacing)
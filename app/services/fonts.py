@@ -0,0 +1,246 @@
+"""Font registry service.
+
+The built-in PDF fonts (Helvetica, Times, Courier) only cover the Windows
+Latin-1 character set. Names in other scripts need TrueType fonts, and
+parsing a TTF file costs milliseconds to tens of milliseconds per font. The
+``FontRegistry`` registers each TrueType family with reportlab once per
+process. Render workers preload the configured families at startup, and a
+family a Style needs that was not preloaded is loaded on first use.
+
+Families are reportlab's bundled Vera plus every family found in
+``FONT_DIR``. A family is a set of files named ``<Family>.ttf`` or
+``<Family>-Regular.ttf``, with optional ``-Bold``, ``-Italic`` (or
+``-Oblique``) and ``-BoldItalic`` (or ``-BoldOblique``) variants. A missing
+variant falls back to the closest available one. Reportlab embeds only
+the subset of glyphs a document uses.
+"""
+import logging
+import os
+import re
+import threading
+from time import perf_counter
+from typing import Dict, Iterable, Optional
+
+import reportlab
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from app.core.config import config as c
+from app.core.metrics import metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Suffix of the registered font name of each variant of a family
+VARIANTS = {
+    "regular": "",
+    "bold": "-Bold",
+    "italic": "-Italic",
+    "bold_italic": "-BoldItalic",
+}
+
+# Variants used when a family has no file for a variant, in order
+_FALLBACKS = {
+    "bold": ("regular",),
+    "italic": ("regular",),
+    "bold_italic": ("bold", "italic", "regular"),
+}
+
+# File name suffixes of each variant in a font directory
+_FILE_SUFFIXES = {
+    "-Regular": "regular",
+    "": "regular",
+    "-Bold": "bold",
+    "-Italic": "italic",
+    "-Oblique": "italic",
+    "-BoldItalic": "bold_italic",
+    "-BoldOblique": "bold_italic",
+}
+_FONT_FILE = re.compile(
+    r"(?P<family>[^-]+)(?P<suffix>-(?:Regular|Bold|Italic|Oblique|"
+    r"BoldItalic|BoldOblique))?\.ttf",
+    re.IGNORECASE,
+)
+
+_VERA_DIR = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+_VERA_FILES = {
+    "regular": "Vera.ttf",
+    "bold": "VeraBd.ttf",
+    "italic": "VeraIt.ttf",
+    "bold_italic": "VeraBI.ttf",
+}
+
+_FONT_FILE_REF = re.compile(rb"/FontFile2 (\d+) 0 R")
+
+EMBEDDED_FONT_BYTES = metrics.histogram(
+    "resume_embedded_font_bytes", "Bytes of embedded font subsets per PDF",
+    buckets=(0, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+
+
+def font_name(family: str, variant: str = "regular") -> str:
+    """Return the registered font name of a family variant."""
+    return family + VARIANTS[variant]
+
+
+def discover_families(font_dir: Optional[str]) -> Dict[str, Dict[str, str]]:
+    """Find the TrueType families available to the registry
+
+    Args:
+        font_dir: Directory searched for font files, or None.
+
+    Returns:
+        File path of each variant by family name.
+    """
+    families = {
+        "Vera": {
+            variant: os.path.join(_VERA_DIR, file_name)
+            for variant, file_name in _VERA_FILES.items()
+        }
+    }
+    if not font_dir or not os.path.isdir(font_dir):
+        return families
+
+    for file_name in sorted(os.listdir(font_dir)):
+        match = _FONT_FILE.fullmatch(file_name)
+        if match is None:
+            continue
+        suffix = match.group("suffix") or ""
+        variant = next(
+            v for s, v in _FILE_SUFFIXES.items() if s.lower() == suffix.lower()
+        )
+        families.setdefault(match.group("family"), {}).setdefault(
+            variant, os.path.join(font_dir, file_name)
+        )
+    # a family needs a regular variant to fall back to
+    return {
+        family: files for family, files in families.items()
+        if "regular" in files
+    }
+
+
+class FontRegistry:
+    """Registers TrueType families with reportlab once per process."""
+    def __init__(self, font_dir: Optional[str] = None):
+        """Initialize the registry
+
+        Args:
+            font_dir: Directory searched for font families, or None to
+                only use the bundled Vera family.
+        """
+        self.families = discover_families(font_dir)
+        # load time in seconds of every loaded family
+        self._loaded: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def load_seconds(self) -> float:
+        """Total time spent loading font families in this process."""
+        return sum(self._loaded.values())
+
+    def is_loaded(self, family: str) -> bool:
+        """Return whether a family is registered in this process."""
+        return family in self._loaded
+
+    def load(self, family: str) -> float:
+        """Parse and register a family unless it is already registered
+
+        Args:
+            family: Name of a family in ``families``.
+
+        Returns:
+            Seconds spent loading the family, 0 if it was already loaded.
+
+        Raises:
+            KeyError: If the family is unknown.
+        """
+        with self._lock:
+            if family in self._loaded:
+                return 0.0
+            files = self.families[family]
+            t0 = perf_counter()
+            for variant in VARIANTS:
+                path = next(
+                    files[v] for v in (variant,) + _FALLBACKS.get(variant, ())
+                    if v in files
+                )
+                pdfmetrics.registerFont(
+                    TTFont(font_name(family, variant), path)
+                )
+            pdfmetrics.registerFontFamily(
+                family,
+                normal=font_name(family),
+                bold=font_name(family, "bold"),
+                italic=font_name(family, "italic"),
+                boldItalic=font_name(family, "bold_italic"),
+            )
+            elapsed = perf_counter() - t0
+            self._loaded[family] = elapsed
+        _LOGGER.info("Loaded font family %s in %.1fms", family, elapsed * 1000)
+        return elapsed
+
+    def preload(self, families: Iterable[str]) -> float:
+        """Load several families, skipping unknown ones
+
+        Returns:
+            Seconds spent loading the families.
+        """
+        elapsed = 0.0
+        for family in families:
+            if family not in self.families:
+                _LOGGER.warning("Font family %s not found", family)
+                continue
+            elapsed += self.load(family)
+        return elapsed
+
+    def ensure(self, name: str) -> bool:
+        """Make sure a font is registered before it is used
+
+        Args:
+            name: A built-in font name or a registered family variant
+                name, e.g. "Helvetica" or "Vera-Bold".
+
+        Returns:
+            Whether the font can be used.
+        """
+        if name in pdfmetrics.standardFonts:
+            return True
+        for suffix in sorted(VARIANTS.values(), key=len, reverse=True):
+            family = name[:-len(suffix)] if suffix else name
+            if name.endswith(suffix) and family in self.families:
+                self.load(family)
+                return True
+        return name in pdfmetrics.getRegisteredFontNames()
+
+    def stats(self) -> Dict[str, float]:
+        """Return the load time of every loaded family in milliseconds."""
+        return {
+            family: round(seconds * 1000, 3)
+            for family, seconds in self._loaded.items()
+        }
+
+
+def embedded_font_bytes(pdf: bytes) -> int:
+    """Return the size of the embedded font programs in a PDF."""
+    total = 0
+    for number in set(_FONT_FILE_REF.findall(pdf)):
+        match = re.search(
+            rb"\n" + number + rb" 0 obj\n<<[^>]*?/Length (\d+)", pdf
+        )
+        if match:
+            total += int(match.group(1))
+    return total
+
+
+font_registry = FontRegistry(font_dir=c.FONT_DIR)
+metrics.callback(
+    "resume_font_load_seconds", "Time spent loading TrueType font families",
+    lambda: font_registry.load_seconds,
+)
+
+
+def preload_fonts() -> None:
+    """Load the configured families, used as render worker initializer."""
+    font_registry.preload(
+        family.strip() for family in c.FONT_FAMILIES.split(",")
+        if family.strip()
+    )
@@ -1,188 +1,365 @@
 """Resume generator service."""
 import logging
-from time import time
-from typing import List, Dict, Union
+from io import BytesIO
+from time import perf_counter
+from multiprocessing.connection import Connection
+from typing import BinaryIO, List, Dict, NamedTuple, Optional, Tuple, Union
+from xml.sax.saxutils import unescape
 
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table
-
-from app.services.style import Style
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+
+from app.core.config import config as c
+from app.models.resume import ResumeData
+from app.services.document import (
+    Line, ResumeDocument, Section, build_document
+)
+from app.services.fit import fit_to_page
+from app.services.fonts import EMBEDDED_FONT_BYTES, embedded_font_bytes
+from app.services.layout import get_layout
+from app.services.markup import paragraph_cache, record_lookups
+from app.services.memory import record_memory, track_memory
+from app.services.profiles import OutputProfile, get_profile
+from app.services.progressive import ChunkWriter, ProgressiveCanvas
+from app.services.style import Style, get_style
 
 _LOGGER = logging.getLogger(__name__)
 
+# Resume document, or validated resume data, or its JSON or dict form
+# which is validated first
+ResumeInput = Union[ResumeDocument, ResumeData, str, bytes, Dict]
+
+
+class RenderResult(NamedTuple):
+    """Rendered PDF with the duration of each render stage in seconds."""
+    pdf: bytes
+    timings: Dict[str, float]
+    # paragraph markup cache lookups of the render, by "hit" and "miss"
+    paragraph_lookups: Dict[str, int]
+    # bytes of the font subsets embedded in the PDF
+    font_bytes: int
+    # memory accounting of the render, see ResumeGenerator.memory
+    memory: Dict[str, int]
+
 
 class ResumeGenerator:
     """Resume generator service."""
-    def __init__(self, style: Style):
+    def __init__(self, style: Style, profile: Optional[OutputProfile] = None):
         """Initialize the resume generator with styles
 
         Args:
             style: Style configuration for the resume
+            profile: PDF output profile, balanced by default
         """
         self.style = style
-
-    def generate_pdf(self, resume_data: Dict, output_path: str) -> None:
+        self.profile = profile or get_profile("balanced")
+        self.layout = get_layout(style)
+        self.paragraph_lookups = {"hit": 0, "miss": 0}
+        # memory of the last render, as measured by track_memory
+        self.memory: Dict[str, int] = {}
+        # embedded font bytes of the last progressive render
+        self.font_bytes = 0
+
+    def generate_pdf(
+        self, resume: ResumeInput, output: Union[str, BinaryIO],
+        progressive: bool = False,
+    ) -> Dict[str, float]:
         """
         Generate a PDF resume from the provided data
 
+        The memory of the render is measured as set by MEMORY_ACCOUNTING
+        and left in ``memory``.
+
         Args:
-            resume_data: Dictionary containing resume information
-            output_path: Path where the PDF should be saved
+            resume: Resume document, or validated resume data, or its JSON
+                or dictionary form
+            output: Path where the PDF should be saved, or a writable
+                binary stream the PDF is written to
+            progressive: Write each page to ``output`` as soon as it is laid
+                out, see ``ProgressiveCanvas``. ``output`` must be a stream
+
+        Returns:
+            Duration in seconds of the build_content and doc_build stages
         """
-        t0 = time()
+        t0 = perf_counter()
         _LOGGER.info("Start building resume")
         try:
-            doc = SimpleDocTemplate(output_path, pagesize=letter)
-            content = self._build_content(resume_data)
-            doc.build(content)
+            with track_memory(c.MEMORY_ACCOUNTING) as self.memory:
+                document = to_document(resume, self.style)
+                doc = self.create_document(output, unescape(document.name))
+                content = self._build_content(document)
+                t1 = perf_counter()
+                doc.build(
+                    content,
+                    canvasmaker=ProgressiveCanvas if progressive else Canvas,
+                )
+                if progressive:
+                    self.font_bytes = doc.canv.font_bytes
+                # free the flowables before the memory is measured
+                del content
         except Exception as exc:
             _LOGGER.error("Error generating PDF: %s", exc)
             raise
-        _LOGGER.info("Done building resume in %.2fs", time() - t0)
+        t2 = perf_counter()
+        _LOGGER.info(
+            "Done building resume in %.2fs (content %.3fs, layout %.3fs)%s",
+            t2 - t0, t1 - t0, t2 - t1, _format_memory(self.memory),
+        )
+        return {"build_content": t1 - t0, "doc_build": t2 - t1}
+
+    def create_document(
+        self, output: Union[str, BinaryIO], name: str = ""
+    ) -> SimpleDocTemplate:
+        """Create the document template the resume is built into
 
-    def _build_content(self, resume_data: Dict) -> List:
-        """Build the PDF content from resume data"""
-        content = []
-
-        # Add header with name and contact info
-        self._add_header(content, resume_data)
-
-        # Add summary if available
-        if resume_data.get('summary'):
-            self._add_section(
-                content, 'Professional Summary', resume_data['summary']
+        Args:
+            output: Path or writable binary stream for the PDF
+            name: Name of the person, used as document metadata
+        """
+        if self.profile.metadata:
+            metadata = {"title": name, "author": name, "subject": "Resume"}
+        else:
+            metadata = dict.fromkeys(
+                ("title", "author", "subject", "creator", "producer"), ""
             )
+        # invariant output keeps equal inputs byte-identical, which
+        # makes the PDF safe to cache and serve with a strong ETag
+        return SimpleDocTemplate(
+            output,
+            pagesize=letter,
+            invariant=1,
+            pageCompression=int(self.profile.compress),
+            **metadata,
+        )
+
+    def generate_pdf_bytes(self, resume: ResumeInput) -> bytes:
+        """
+        Generate a PDF resume in memory
 
-        # Add skills if available
-        if resume_data.get('skills'):
-            self._add_skills(content, resume_data['skills'])
+        Args:
+            resume: Resume document, or validated resume data, or its JSON
+                or dictionary form
 
-        # Add experience if available
-        if resume_data.get('experience'):
-            self._add_experience(content, resume_data['experience'])
+        Returns:
+            The PDF document as bytes
+        """
+        buffer = BytesIO()
+        self.generate_pdf(resume, buffer)
+        return buffer.getvalue()
+
+    def _paragraph(self, text: str, style: ParagraphStyle) -> Paragraph:
+        """Build a paragraph through the shared markup cache"""
+        paragraph, cached = paragraph_cache.paragraph(text, style)
+        self.paragraph_lookups["hit" if cached else "miss"] += 1
+        return paragraph
+
+    def _build_content(self, document: ResumeDocument) -> List:
+        """Build the PDF content from a resume document"""
+        self.paragraph_lookups = {"hit": 0, "miss": 0}
+        content = []
 
-        # Add education if available
-        if resume_data.get('education'):
-            self._add_education(content, resume_data['education'])
+        # Add header with name and contact info
+        self._add_header(content, document)
+
+        # Add the sections in document order
+        for section in document.sections:
+            self._add_section(content, section, document.bullet)
 
         return content
 
-    def _add_header(self, content: List, resume_data: Dict) -> None:
+    def _add_header(self, content: List, document: ResumeDocument) -> None:
         """Add header with name and contact information"""
-        name = resume_data.get('name', '')
-        content.append(Paragraph(name, self.style.name))
-        title = resume_data.get('title', '')
-        content.append(Paragraph(title, self.style.title))
+        content.append(self._paragraph(document.name, self.style.name))
+        content.append(self._paragraph(document.title, self.style.title))
 
         # Contact information
-        contact_info = []
-        if resume_data.get('email'):
-            contact_info.append(resume_data['email'])
-        if resume_data.get('phone'):
-            contact_info.append(resume_data['phone'])
-        if resume_data.get('linkedin'):
-            contact_info.append(resume_data['linkedin'])
-
-        if contact_info:
+        if document.contact:
             content.append(
-                Paragraph(' | '.join(contact_info), self.style.contact_info)
+                self._paragraph(document.contact, self.style.contact_info)
             )
 
     def _add_section_title(self, content: List, title: str) -> None:
         """Add a section title with an underline."""
         # Add the section title
-        content.append(Paragraph(title, self.style.section_header))
+        content.append(self._paragraph(title, self.style.section_header))
 
         # Add horizontal line under the section title
-        separator = Table([[""]],
-                          colWidths=[6.5*inch],  # Adjust width as needed
-                          rowHeights=[0])
-        separator.setStyle(self.style.section_title_line)
-        content.append(separator)
-
-    def _add_section(self, content: List, title: str, text: str) -> None:
-        """Add a simple section with title and content"""
-        self._add_section_title(content, title)
-        content.append(Paragraph(text, self.style.normal))
-
-    def _add_experience(
-        self, content: List, experience_list: List[Dict]
-    ) -> None:
-        """Add experience section"""
-        self._add_section_title(content, 'Professional Experience')
-
-        for job in experience_list:
-            job_title = job.get('title', '')
-            company = job.get('company', '')
-            date_range = job.get('date', '')
+        content.append(self.layout.separator())
 
-            # Create a table with job title on left, date on right
-            title_paragraph = Paragraph(f"{job_title} - {company}",
-                                        self.style.item_title)
-            date_paragraph = Paragraph(date_range, self.style.item_subtitle)
-
-            # Create a table with one row and two columns
-            job_table = Table([[title_paragraph, date_paragraph]], 
-                              colWidths=[4*inch, 2.5*inch])
-            job_table.setStyle(self.style.job_table)
+    def _add_lines(self, content: List, lines: Tuple[Line, ...]) -> None:
+        """Add paragraphs, with their label in bold"""
+        for line in lines:
+            text = f"<b>{line.label}:</b> {line.text}" if line.label else (
+                line.text
+            )
+            content.append(self._paragraph(text, self.style.normal))
 
-            content.append(job_table)
+    def _add_section(
+        self, content: List, section: Section, bullet: str
+    ) -> None:
+        """Add a section with its paragraphs and entries"""
+        self._add_section_title(content, section.title)
+        self._add_lines(content, section.lines)
+
+        for entry in section.entries:
+            # Create a row with the heading on left, date on right
+            heading_paragraph = self._paragraph(entry.heading,
+                                                self.style.item_title)
+            date_paragraph = self._paragraph(entry.date,
+                                             self.style.item_subtitle)
+            content.append(self.layout.row(heading_paragraph, date_paragraph))
+            self._add_lines(content, entry.lines)
 
             # Add responsibilities/achievements
-            if job.get('description'):
-                if isinstance(job['description'], list):
-                    for item in job['description']:
-                        bullet = self.style.get_bullet_point()
-                        content.append(Paragraph(f"{bullet} {item}",
-                                                 self.style.bullet_point))
-                else:
-                    content.append(Paragraph(job['description'],
-                                             self.style.normal))
-
-    def _add_education(
-        self, content: List, education_list: List[Dict]
-    ) -> None:
-        """Add education section"""
-        self._add_section_title(content, 'Education')
-
-        for edu in education_list:
-            degree = edu.get('degree', '')
-            institution = edu.get('institution', '')
-            year = edu.get('year', '')
-
-            # Create a table with degree on left, year on right
-            degree_paragraph = Paragraph(degree, self.style.item_title)
-            year_paragraph = Paragraph(year, self.style.item_subtitle)
-
-            # Create a table with one row and two columns
-            edu_table = Table(
-                [[degree_paragraph, year_paragraph]],
-                              colWidths=[4*inch, 2.5*inch])
-            edu_table.setStyle(self.style.job_table)
-            
-            content.append(edu_table)
-            content.append(Paragraph(institution, self.style.normal))
-
-            if edu.get('description'):
-                content.append(Paragraph(edu['description'], self.style.normal))
-
-    def _add_skills(
-        self, content: List, skills: Union[List[str], Dict[str, List[str]]]
-    ) -> None:
-        """Add skills section"""
-        self._add_section_title(content, 'Skills')
-
-        if isinstance(skills, list):
-            # Format skills as a paragraph with commas
-            skills_text = ", ".join(skills)
-            content.append(Paragraph(skills_text, self.style.normal))
-        elif isinstance(skills, dict):
-            # Handle categorized skills
-            for category, skills_list in skills.items():
-                content.append(
-                    Paragraph(
-                        f"<b>{category}:</b> {', '.join(skills_list)}",
-                        self.style.normal
-                    )
-                )
+            for item in entry.bullets:
+                content.append(self._paragraph(
+                    bullet + item, self.style.bullet_point
+                ))
+
+
+def _format_memory(memory: Dict[str, int]) -> str:
+    """Format the memory of a render for the render log line."""
+    if not memory:
+        return ""
+    mib = 1024 * 1024
+    text = (
+        f", rss {memory['rss_bytes'] / mib:.1f}MiB "
+        f"({memory['rss_growth_bytes'] / mib:+.1f}MiB)"
+    )
+    if "peak_bytes" in memory:
+        text += f", peak {memory['peak_bytes'] / mib:.2f}MiB"
+    return text
+
+
+def to_resume(resume: ResumeInput) -> ResumeData:
+    """Return ``resume`` as validated resume data
+
+    Args:
+        resume: Validated resume data, its JSON, or a dictionary
+
+    Returns:
+        The resume data, validated from JSON with pydantic's native JSON
+        parser or from a dictionary if needed
+    """
+    if isinstance(resume, ResumeData):
+        return resume
+    if isinstance(resume, (str, bytes)):
+        return ResumeData.model_validate_json(resume)
+    return ResumeData.model_validate(resume)
+
+
+def to_document(resume: ResumeInput, style: Style) -> ResumeDocument:
+    """Return ``resume`` as a resume document for ``style``
+
+    Args:
+        resume: Resume document, or validated resume data, or its JSON or
+            dictionary form
+        style: Style the document is rendered with
+
+    Returns:
+        The resume document, built from the resume data if needed
+    """
+    if isinstance(resume, ResumeDocument):
+        return resume
+    return build_document(to_resume(resume), style)
+
+
+def _render(
+    resume: ResumeInput, theme: str, profile: str, fit: bool,
+    output: BinaryIO, progressive: bool = False,
+) -> Tuple[ResumeGenerator, Dict[str, float]]:
+    """Render a resume into ``output`` and return the generator and timings."""
+    style = get_style(theme)
+    fit_seconds = None
+    if fit:
+        t0 = perf_counter()
+        resume = to_document(resume, style)
+        style = fit_to_page(resume, theme)
+        fit_seconds = perf_counter() - t0
+    generator = ResumeGenerator(style=style, profile=get_profile(profile))
+    timings = generator.generate_pdf(resume, output, progressive)
+    if fit_seconds is not None:
+        timings["fit"] = fit_seconds
+    return generator, timings
+
+
+def render_pdf(
+    resume: ResumeInput, theme: str = "default", profile: str = "balanced",
+    fit: bool = False,
+) -> RenderResult:
+    """Render a resume PDF in memory.
+
+    Module-level entry point so it can be submitted to a process pool. The
+    style is looked up by theme name in the worker's style registry rather
+    than pickled with every task. Callers submit the resume document built
+    for the same theme, which pickles smaller and faster than the model.
+
+    With ``fit``, the theme is scaled down until the resume fits on one
+    page by the metric height estimate, and the PDF is built once.
+
+    Args:
+        resume: Resume document, or validated resume data, or its JSON or
+            dictionary form
+        theme: Name of the style theme to render with
+        profile: Name of the PDF output profile
+        fit: Whether to shrink the resume to fit on one page
+
+    Returns:
+        The PDF document with its stage timings, paragraph cache lookups
+        and embedded font size
+    """
+    buffer = BytesIO()
+    generator, timings = _render(resume, theme, profile, fit, buffer)
+    pdf = buffer.getvalue()
+    return RenderResult(
+        pdf, timings, generator.paragraph_lookups, embedded_font_bytes(pdf),
+        generator.memory,
+    )
+
+
+def stream_pdf(
+    resume: ResumeInput, connection: Connection, theme: str = "default",
+    profile: str = "balanced", fit: bool = False,
+    chunk_size: int = c.STREAM_CHUNK_SIZE,
+) -> RenderResult:
+    """Render a resume PDF progressively into a pipe.
+
+    Like ``render_pdf``, but the PDF is sent through ``connection`` in
+    chunks of ``chunk_size`` bytes while it is rendered, each page once it
+    is laid out. Sends block while the pipe is full, so a slow reader
+    holds the render back instead of letting it buffer the PDF. The
+    connection is closed when the render ends.
+
+    Args:
+        resume: Resume document, or validated resume data, or its JSON or
+            dictionary form
+        connection: Writable end of a pipe the PDF chunks are sent to
+        theme: Name of the style theme to render with
+        profile: Name of the PDF output profile
+        fit: Whether to shrink the resume to fit on one page
+        chunk_size: Bytes collected before a chunk is sent
+
+    Returns:
+        The render statistics of ``render_pdf``, with an empty ``pdf``
+    """
+    writer = ChunkWriter(connection.send_bytes, chunk_size)
+    try:
+        generator, timings = _render(
+            resume, theme, profile, fit, writer, progressive=True
+        )
+        writer.flush()
+    finally:
+        connection.close()
+    return RenderResult(
+        b"", timings, generator.paragraph_lookups, generator.font_bytes,
+        generator.memory,
+    )
+
+
+def record_render(result: RenderResult) -> None:
+    """Record the statistics a render reported back from its worker."""
+    record_lookups(result.paragraph_lookups)
+    EMBEDDED_FONT_BYTES.observe(result.font_bytes)
+    record_memory(result.memory)
@@ -0,0 +1,430 @@
+"""Asynchronous render job service.
+
+Long renders are submitted as jobs: the client gets a job id right away,
+polls the job status and downloads the PDF once it is done. Jobs run on the
+render executor and their state and results live in a pluggable
+``JobStore``. Finished jobs expire after a TTL and a periodic cleanup task
+removes them together with their results.
+
+``InMemoryJobStore`` is local to one process, so it needs a single worker or
+sticky routing. ``SQLiteJobStore`` keeps an SQLite index and result files
+on disk and is shared by every worker on the node. The job manager calls the
+``*_async`` store methods, which the SQLite store runs in a thread, so a
+worker waiting for the index lock or a result file does not hold up its
+other requests.
+"""
+import asyncio
+import logging
+import os
+import re
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, fields
+from enum import Enum
+from time import time
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import config as c
+from app.core.exceptions import (
+    JobNotFoundException, RenderQueueFullException
+)
+from app.models.resume import ResumeData
+from app.services.executor import RenderExecutor, render_executor
+from app.services.rendering import render_cached
+from app.services.utils import LocalConnection, atomic_write, to_file_name
+
+_LOGGER = logging.getLogger(__name__)
+
+# Pause before retrying a job rejected by a full render queue
+_QUEUE_RETRY_DELAY = 0.1
+
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a render job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """State of a render job."""
+    id: str
+    status: JobStatus
+    file_name: str
+    created_at: float
+    updated_at: float
+    expires_at: float
+    size: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON serializable representation."""
+        data = asdict(self)
+        data["status"] = self.status.value
+        return data
+
+
+class JobStore(ABC):
+    """Storage for job state and rendered results."""
+    @abstractmethod
+    def save(self, job: Job) -> None:
+        """Insert or update a job."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, or None if it does not exist."""
+
+    @abstractmethod
+    def save_result(self, job_id: str, pdf: bytes) -> None:
+        """Store the rendered PDF of a job."""
+
+    @abstractmethod
+    def load_result(self, job_id: str) -> Optional[bytes]:
+        """Return the rendered PDF of a job, or None if there is none."""
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        """Delete a job and its result."""
+
+    @abstractmethod
+    def expired(self, now: float) -> List[str]:
+        """Return the ids of jobs that expired before ``now``."""
+
+    async def save_async(self, job: Job) -> None:
+        """Insert or update a job, see ``save``."""
+        self.save(job)
+
+    async def get_async(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, see ``get``."""
+        return self.get(job_id)
+
+    async def save_result_async(self, job_id: str, pdf: bytes) -> None:
+        """Store the rendered PDF of a job, see ``save_result``."""
+        self.save_result(job_id, pdf)
+
+    async def load_result_async(self, job_id: str) -> Optional[bytes]:
+        """Return the rendered PDF of a job, see ``load_result``."""
+        return self.load_result(job_id)
+
+
+class InMemoryJobStore(JobStore):
+    """Job store kept in the memory of the current process."""
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._results: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def save_result(self, job_id: str, pdf: bytes) -> None:
+        with self._lock:
+            self._results[job_id] = pdf
+
+    def load_result(self, job_id: str) -> Optional[bytes]:
+        return self._results.get(job_id)
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._results.pop(job_id, None)
+
+    def expired(self, now: float) -> List[str]:
+        with self._lock:
+            return [
+                job.id for job in self._jobs.values() if job.expires_at < now
+            ]
+
+
+class SQLiteJobStore(JobStore):
+    """Job store with an SQLite index and one result file per job."""
+    _COLUMNS = [f.name for f in fields(Job)]
+
+    def __init__(self, root: str):
+        """Initialize the store
+
+        Args:
+            root: Directory holding the SQLite database and result files.
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._connection = LocalConnection(
+            os.path.join(root, "jobs.sqlite3")
+        )
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT, file_name TEXT, "
+                "created_at REAL, updated_at REAL, expires_at REAL, "
+                "size INTEGER, error TEXT)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_expires_at "
+                "ON jobs (expires_at)"
+            )
+
+    def _result_path(self, job_id: str) -> str:
+        return os.path.join(self.root, f"{job_id}.pdf")
+
+    def save(self, job: Job) -> None:
+        row = job.to_dict()
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        with self._connection() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(self._COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                [row[column] for column in self._COLUMNS],
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute(
+            f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = Job(**dict(zip(self._COLUMNS, row)))
+        job.status = JobStatus(job.status)
+        return job
+
+    def save_result(self, job_id: str, pdf: bytes) -> None:
+        atomic_write(self._result_path(job_id), pdf)
+
+    def load_result(self, job_id: str) -> Optional[bytes]:
+        try:
+            with open(self._result_path(job_id), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, job_id: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        try:
+            os.unlink(self._result_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def expired(self, now: float) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT id FROM jobs WHERE expires_at < ?", (now,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    async def save_async(self, job: Job) -> None:
+        """Insert or update a job, see ``save``."""
+        await asyncio.to_thread(self.save, job)
+
+    async def get_async(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, see ``get``."""
+        return await asyncio.to_thread(self.get, job_id)
+
+    async def save_result_async(self, job_id: str, pdf: bytes) -> None:
+        """Store the rendered PDF of a job, see ``save_result``."""
+        await asyncio.to_thread(self.save_result, job_id, pdf)
+
+    async def load_result_async(self, job_id: str) -> Optional[bytes]:
+        """Return the rendered PDF of a job, see ``load_result``."""
+        return await asyncio.to_thread(self.load_result, job_id)
+
+
+def create_job_store(kind: str, path: str) -> JobStore:
+    """Create a job store by kind
+
+    Args:
+        kind: Either "memory" or "sqlite".
+        path: Directory used by the SQLite store.
+
+    Returns:
+        The job store.
+    """
+    if kind == "memory":
+        return InMemoryJobStore()
+    if kind == "sqlite":
+        return SQLiteJobStore(path)
+    raise ValueError(f"Unknown job store: {kind}")
+
+
+class JobManager:
+    """Submit render jobs to the executor and track them in a store."""
+    def __init__(
+        self,
+        store: JobStore,
+        executor: RenderExecutor,
+        ttl: float,
+        cleanup_interval: float,
+        max_running: int = 1,
+        max_pending: int = 100,
+    ):
+        """Initialize the job manager
+
+        Args:
+            store: Store holding job state and results.
+            executor: Render executor the jobs run on.
+            ttl: Seconds a job and its result are kept.
+            cleanup_interval: Seconds between two expiry sweeps.
+            max_running: Number of jobs rendering at once, the others stay
+                queued until one finishes.
+            max_pending: Number of unfinished jobs, running or queued,
+                before new jobs are rejected.
+        """
+        self.store = store
+        self.executor = executor
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self.max_running = max(1, max_running)
+        self.max_pending = max(1, max_pending)
+        self._tasks: Set[asyncio.Task] = set()
+        self._running = asyncio.Semaphore(self.max_running)
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the periodic cleanup task."""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def stop(self) -> None:
+        """Stop the cleanup task and cancel running jobs."""
+        tasks = list(self._tasks)
+        if self._cleanup_task is not None:
+            tasks.append(self._cleanup_task)
+            self._cleanup_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # a semaphore is bound to the loop it was first waited on
+        self._running = asyncio.Semaphore(self.max_running)
+
+    async def submit(
+        self,
+        data: ResumeData,
+        theme: str = "default",
+        profile: str = "balanced",
+    ) -> Job:
+        """Create a job and start rendering it in the background
+
+        Args:
+            data: Validated resume data.
+            theme: Name of the style theme to render with.
+            profile: Name of the PDF output profile.
+
+        Returns:
+            The queued job.
+
+        Raises:
+            RenderQueueFullException: If max_pending jobs are unfinished.
+        """
+        if len(self._tasks) >= self.max_pending:
+            raise RenderQueueFullException(
+                f"Too many render jobs ({len(self._tasks)} unfinished)"
+            )
+        now = time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            status=JobStatus.QUEUED,
+            file_name=to_file_name(data.name),
+            created_at=now,
+            updated_at=now,
+            expires_at=now + self.ttl,
+        )
+        await self.store.save_async(job)
+        task = asyncio.create_task(self._run(job, data, theme, profile))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def get(self, job_id: str) -> Job:
+        """Return a job by id
+
+        Raises:
+            JobNotFoundException: If the job does not exist or expired.
+        """
+        job = None
+        if _JOB_ID.fullmatch(job_id):
+            job = await self.store.get_async(job_id)
+        if job is None or job.expires_at < time():
+            raise JobNotFoundException(f"Job {job_id} not found")
+        return job
+
+    async def result(self, job_id: str) -> Optional[bytes]:
+        """Return the PDF of a finished job, or None if it is not done."""
+        job = await self.get(job_id)
+        if job.status != JobStatus.DONE:
+            return None
+        return await self.store.load_result_async(job_id)
+
+    async def _update(self, job: Job, **changes) -> None:
+        for name, value in changes.items():
+            setattr(job, name, value)
+        job.updated_at = time()
+        await self.store.save_async(job)
+
+    async def _run(
+        self, job: Job, data: ResumeData, theme: str, profile: str
+    ) -> None:
+        """Wait for a running slot, render a job and store its result."""
+        try:
+            async with self._running:
+                await self._update(job, status=JobStatus.RUNNING)
+                rendered = await render_cached(
+                    self.executor, data, theme, profile,
+                    retry_delay=_QUEUE_RETRY_DELAY,
+                )
+            await self.store.save_result_async(job.id, rendered.pdf)
+            await self._update(
+                job,
+                status=JobStatus.DONE,
+                size=len(rendered.pdf),
+                expires_at=time() + self.ttl,
+            )
+            _LOGGER.info("Job %s done", job.id)
+        except asyncio.CancelledError:
+            await self._update(
+                job, status=JobStatus.FAILED, error="Cancelled"
+            )
+            raise
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.error("Job %s failed: %s", job.id, exc)
+            await self._update(
+                job, status=JobStatus.FAILED, error=str(exc)
+            )
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Delete expired jobs and their results
+
+        Returns:
+            Number of deleted jobs.
+        """
+        expired = self.store.expired(time() if now is None else now)
+        for job_id in expired:
+            self.store.delete(job_id)
+        if expired:
+            _LOGGER.info("Removed %d expired jobs", len(expired))
+        return len(expired)
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await asyncio.to_thread(self.cleanup)
+            except Exception as exc:  # pylint: disable=broad-except
+                _LOGGER.exception("Error cleaning up jobs: %s", exc)
+
+
+job_manager = JobManager(
+    store=create_job_store(c.JOB_STORE, c.JOB_STORE_PATH),
+    executor=render_executor,
+    ttl=c.JOB_TTL_SECONDS,
+    cleanup_interval=c.JOB_CLEANUP_INTERVAL_SECONDS,
+    max_running=c.JOB_MAX_RUNNING,
+    max_pending=c.JOB_MAX_PENDING,
+)
@@ -0,0 +1,179 @@
+"""Resume layout service.
+
+The section separators and the two-column title rows used to be a new
+``Table`` per entry, styled with the same ``TableStyle`` every time. A
+``Layout`` computes the geometry once per Style: frame width, column
+widths, cell paddings and separator line. Each render only creates tiny
+flowables that position their paragraphs with that precomputed geometry.
+The output draws the same as the Table version, but skips table style
+resolution, cell spans and the second paragraph wrap that Table does on draw.
+
+A paragraph longer than a page, e.g. a skill category listing thousands of
+skills, is split at each page break into the lines that fit and a new
+paragraph of the rest. Reportlab breaks that rest into lines again from
+its first word on the next page, so the time spent on such a paragraph
+grows with the square of its length. ``ResumeParagraph`` hands its
+already broken lines to the rest instead, which breaks the same way at
+the same width, and only falls back to breaking again when the width
+changes.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+from reportlab.lib.units import inch
+from reportlab.platypus import Flowable, Paragraph
+
+from app.services.style import Style
+
+# Full width of the resume content, the letter frame minus 1 inch margins
+CONTENT_WIDTH = 6.5 * inch
+# Widths of the title and date columns of a two-column row
+COLUMN_WIDTHS = (4 * inch, 2.5 * inch)
+
+
+@dataclass(frozen=True)
+class Layout:
+    """Precomputed layout geometry of a Style."""
+    width: float
+    column_widths: Tuple[float, float]
+    # column offsets from the left edge of the row
+    column_positions: Tuple[float, float]
+    # width available to each cell, i.e. its column minus the paddings
+    cell_widths: Tuple[float, float]
+    left_padding: float
+    right_padding: float
+    top_padding: float
+    bottom_padding: float
+    separator_thickness: float
+    separator_color: object
+
+    def separator(self) -> "SectionRule":
+        """Return the line drawn under a section title."""
+        return SectionRule(self)
+
+    def row(self, left: Paragraph, right: Paragraph) -> "TwoColumnRow":
+        """Return a row with ``left`` and ``right`` side by side."""
+        return TwoColumnRow(self, left, right)
+
+
+class SectionRule(Flowable):
+    """Zero-height horizontal line spanning the content width."""
+    def __init__(self, layout: Layout):
+        super().__init__()
+        self.layout = layout
+        self.width = layout.width
+        self.height = 0
+        # centered like the Table it replaces
+        self.hAlign = "CENTER"
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, 0
+
+    def draw(self):
+        self.canv.setStrokeColor(self.layout.separator_color)
+        self.canv.setLineWidth(self.layout.separator_thickness)
+        self.canv.setLineCap(1)
+        self.canv.setLineJoin(1)
+        self.canv.line(0, 0, self.width, 0)
+
+
+class TwoColumnRow(Flowable):
+    """One row of two top-aligned paragraphs, e.g. a job title and date."""
+    def __init__(self, layout: Layout, left: Paragraph, right: Paragraph):
+        super().__init__()
+        self.layout = layout
+        self.cells = (left, right)
+        self.width = layout.width
+        self.hAlign = "CENTER"
+        self._cell_heights = (0, 0)
+
+    def wrap(self, availWidth, availHeight):
+        layout = self.layout
+        self._cell_heights = tuple(
+            cell.wrap(cell_width, availHeight)[1]
+            for cell, cell_width in zip(self.cells, layout.cell_widths)
+        )
+        self.height = (
+            max(self._cell_heights)
+            + layout.top_padding + layout.bottom_padding
+        )
+        return self.width, self.height
+
+    def draw(self):
+        layout = self.layout
+        top = self.height - layout.top_padding
+        for cell, x, height in zip(
+            self.cells, layout.column_positions, self._cell_heights
+        ):
+            cell.drawOn(self.canv, x + layout.left_padding, top - height)
+
+
+class ResumeParagraph(Paragraph):
+    """Paragraph whose rest keeps its lines when split across pages."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # lines of a split rest, the width they were broken at and the
+        # fragments of the rest itself, to break it again at another width
+        self._kept_lines = None
+        self._kept_width = None
+        self._kept_frags = None
+
+    def wrap(self, availWidth, availHeight):
+        if self._kept_lines is None:
+            return super().wrap(availWidth, availHeight)
+        if availWidth != self._kept_width:
+            self.frags = self._kept_frags
+            self._kept_lines = self._kept_width = self._kept_frags = None
+            return super().wrap(availWidth, availHeight)
+        # the height Paragraph.wrap computes without auto leading
+        self.width = availWidth
+        self.blPara = self._kept_lines
+        self.height = len(self._kept_lines.lines) * self.style.leading
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        parts = super().split(availWidth, availHeight)
+        if len(parts) != 2 or not self._can_keep_lines():
+            return parts
+        first, rest = parts
+        # the rest has no first line indent, so its lines are all as wide
+        # as the lines after the first one here
+        lines = self.blPara.clone()
+        lines.lines = self.blPara.lines[len(first.blPara.lines):]
+        rest._kept_lines = lines
+        rest._kept_width = availWidth
+        rest._kept_frags = rest.frags
+        # processed lines index the fragments they were broken from
+        rest.frags = self.frags
+        return parts
+
+    def _can_keep_lines(self) -> bool:
+        """Whether the rest can be drawn from the lines broken here."""
+        autoLeading = getattr(
+            self, "autoLeading", getattr(self.style, "autoLeading", "")
+        )
+        return autoLeading in ("", "off") and self.style.wordWrap != "CJK"
+
+
+@lru_cache(maxsize=None)
+def get_layout(style: Style) -> Layout:
+    """Return the shared Layout computed from a Style's table styles."""
+    cell = {}
+    for command in style.job_table.getCommands():
+        cell[command[0]] = command[3]
+    left = cell.get("LEFTPADDING", 6)
+    right = cell.get("RIGHTPADDING", 6)
+    positions = (0, COLUMN_WIDTHS[0])
+    return Layout(
+        width=CONTENT_WIDTH,
+        column_widths=COLUMN_WIDTHS,
+        column_positions=positions,
+        cell_widths=tuple(w - left - right for w in COLUMN_WIDTHS),
+        left_padding=left,
+        right_padding=right,
+        top_padding=cell.get("TOPPADDING", 3),
+        bottom_padding=cell.get("BOTTOMPADDING", 3),
+        separator_thickness=style.separator_thickness,
+        separator_color=style.separator_color,
+    )
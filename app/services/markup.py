@@ -0,0 +1,126 @@
+"""Paragraph markup cache service.
+
+Every ``Paragraph`` runs reportlab's markup parser over its text, although
+skill names, category labels, company names and section titles repeat
+across many resumes. ``ParagraphCache`` keeps the parsed fragments of
+recent (text, style) pairs and builds new paragraphs from them without
+parsing again.
+
+Reportlab does not modify the parsed fragments after parsing: line breaking
+and splitting clone fragments before changing them. Cached fragments can
+therefore be shared by paragraphs of different renders. Each paragraph
+still gets its own list of fragments.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph
+
+from app.core.config import config as c
+from app.core.metrics import metrics
+from app.services.layout import ResumeParagraph
+
+
+class _Parsed(NamedTuple):
+    """Result of parsing a paragraph markup."""
+    style: ParagraphStyle
+    frags: Tuple[Any, ...]
+    bullet_text: Optional[List[Any]]
+
+
+class ParagraphCache:
+    """Thread-safe LRU cache of parsed paragraph markup."""
+    def __init__(self, max_entries: int):
+        """Initialize the cache
+
+        Args:
+            max_entries: Number of parsed texts kept. 0 disables the cache.
+        """
+        self.max_entries = max(0, max_entries)
+        # keyed by the style object, styles are shared instances
+        self._entries: "OrderedDict[Tuple[str, ParagraphStyle], _Parsed]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def paragraph(
+        self, text: str, style: ParagraphStyle
+    ) -> Tuple[Paragraph, bool]:
+        """Build a paragraph, reusing the parsed markup of ``text``
+
+        Args:
+            text: Paragraph markup.
+            style: Paragraph style.
+
+        Returns:
+            The paragraph and whether its markup came from the cache.
+        """
+        key = (text, style)
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if parsed is not None:
+            return ResumeParagraph(
+                text, parsed.style, bulletText=parsed.bullet_text,
+                frags=list(parsed.frags),
+            ), True
+
+        paragraph = ResumeParagraph(text, style)
+        if self.max_entries:
+            self._put(key, _Parsed(
+                paragraph.style, tuple(paragraph.frags),
+                paragraph.bulletText,
+            ))
+        return paragraph, False
+
+    def _put(self, key: Tuple[str, ParagraphStyle], parsed: _Parsed) -> None:
+        with self._lock:
+            self._entries[key] = parsed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached markup and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache counters."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+paragraph_cache = ParagraphCache(max_entries=c.PARAGRAPH_CACHE_SIZE)
+
+# Renders run in worker processes with their own cache, so lookups are
+# reported back with each render result and counted here
+PARAGRAPH_LOOKUPS = metrics.counter(
+    "resume_paragraph_cache_lookups_total",
+    "Paragraph markup cache lookups of finished renders",
+    labels=("result",),
+)
+
+
+def record_lookups(lookups: Dict[str, int]) -> None:
+    """Count the paragraph cache lookups reported by a render."""
+    for result, count in lookups.items():
+        PARAGRAPH_LOOKUPS.inc(result, amount=count)
@@ -0,0 +1,275 @@
+"""Memory accounting service.
+
+Reportlab holds the flowables and fragments of a whole render until
+``doc.build`` finishes, and long-running processes keep some of what it
+allocates, so workers grow slowly over days. This module measures and
+bounds that memory:
+
+- ``track_memory`` measures a render, either with the process RSS read
+  before and after, or with tracemalloc, which also reports the peak
+  allocated during the render but slows rendering down.
+- ``estimate_render_memory`` predicts the peak of a render from the resume
+  document, so oversized inputs are rejected before they are rendered.
+- ``MemoryWatchdog`` tells a process to recycle once its RSS or the
+  number of requests it served passes a limit. ``WatchdogMiddleware``
+  applies it to web workers, which stop gracefully with SIGTERM and are
+  replaced by the gunicorn master. The render executor applies it to its
+  workers with the RSS they report after each render.
+"""
+import logging
+import os
+import random
+import resource
+import signal
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from app.core.config import config as c
+from app.core.exceptions import PayloadTooLargeException
+from app.core.metrics import metrics
+from app.services.document import ResumeDocument
+
+_LOGGER = logging.getLogger(__name__)
+
+_MIB = 1024 * 1024
+_BYTE_BUCKETS = tuple(
+    size * _MIB for size in (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128, 256,
+                             512, 1024, 2048)
+)
+RENDER_PEAK_BYTES = metrics.histogram(
+    "resume_render_peak_memory_bytes",
+    "Peak memory allocated by a render, with tracemalloc accounting",
+    buckets=_BYTE_BUCKETS,
+)
+RENDER_WORKER_RSS_BYTES = metrics.histogram(
+    "resume_render_worker_rss_bytes",
+    "Resident memory of the render worker after a render",
+    buckets=_BYTE_BUCKETS,
+)
+# Processes told to recycle, by "web" or "render" and by "rss" or "requests"
+RECYCLES = metrics.counter(
+    "resume_worker_recycles_total",
+    "Workers recycled by the memory watchdog",
+    labels=("process", "reason"),
+)
+
+# Peak allocation of a render, measured with tracemalloc on synthetic
+# resumes: a fixed part, about 16 bytes per character of the longest
+# paragraph, which reportlab wraps and splits as a whole, and about
+# 0.35 KiB per paragraph. The coefficients are rounded up
+_BASE_BYTES = 512 * 1024
+_BYTES_PER_PARAGRAPH_CHAR = 24
+_BYTES_PER_PARAGRAPH = 512
+
+
+def rss_bytes() -> int:
+    """Return the resident memory of this process in bytes
+
+    Read from /proc on Linux. Elsewhere the peak resident memory is
+    returned, the closest the standard library offers.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def track_memory(mode: str = "rss") -> Iterator[Dict[str, int]]:
+    """Measure the memory of the enclosed block
+
+    Args:
+        mode: "rss" for the resident memory after the block and its growth
+            during the block, "tracemalloc" to also measure the peak
+            allocated during the block, or "off".
+
+    Yields:
+        A dictionary filled in when the block exits, with ``rss_bytes``,
+        ``rss_growth_bytes`` and, with tracemalloc, ``peak_bytes``.
+    """
+    usage: Dict[str, int] = {}
+    if mode == "off":
+        yield usage
+        return
+    if mode == "tracemalloc":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    before = rss_bytes()
+    try:
+        yield usage
+    finally:
+        usage["rss_bytes"] = rss_bytes()
+        usage["rss_growth_bytes"] = usage["rss_bytes"] - before
+        if mode == "tracemalloc":
+            usage["peak_bytes"] = tracemalloc.get_traced_memory()[1] - traced
+
+
+def record_memory(usage: Dict[str, int]) -> None:
+    """Record the memory a render reported back from its worker."""
+    if "peak_bytes" in usage:
+        RENDER_PEAK_BYTES.observe(usage["peak_bytes"])
+    if "rss_bytes" in usage:
+        RENDER_WORKER_RSS_BYTES.observe(usage["rss_bytes"])
+
+
+def estimate_render_memory(document: ResumeDocument) -> int:
+    """Estimate the peak memory in bytes of rendering a resume document."""
+    longest = max(len(document.name), len(document.title),
+                  len(document.contact))
+    paragraphs = 3
+    for section in document.sections:
+        paragraphs += 1 + len(section.lines)
+        for line in section.lines:
+            longest = max(longest, len(line.label) + len(line.text))
+        for entry in section.entries:
+            paragraphs += 2 + len(entry.lines) + len(entry.bullets)
+            longest = max(longest, len(entry.heading), len(entry.date))
+            for line in entry.lines:
+                longest = max(longest, len(line.label) + len(line.text))
+            for item in entry.bullets:
+                longest = max(longest, len(item))
+    return (
+        _BASE_BYTES
+        + _BYTES_PER_PARAGRAPH_CHAR * longest
+        + _BYTES_PER_PARAGRAPH * paragraphs
+    )
+
+
+def check_render_memory(
+    document: ResumeDocument, max_bytes: int = c.MAX_RENDER_MEMORY_BYTES
+) -> None:
+    """Reject a document whose estimated render memory is over the limit
+
+    Args:
+        document: Resume document about to be rendered.
+        max_bytes: Limit in bytes, 0 disables the check.
+
+    Raises:
+        PayloadTooLargeException: If the estimate exceeds ``max_bytes``.
+    """
+    if not max_bytes:
+        return
+    estimate = estimate_render_memory(document)
+    if estimate > max_bytes:
+        raise PayloadTooLargeException(
+            f"Resume needs an estimated {estimate / _MIB:.1f} MiB to render, "
+            f"above the limit of {max_bytes / _MIB:.1f} MiB"
+        )
+
+
+class MemoryWatchdog:
+    """Decides when a process should be recycled."""
+    def __init__(
+        self,
+        process: str,
+        max_rss_bytes: int = 0,
+        max_requests: int = 0,
+        jitter: float = 0.1,
+    ):
+        """Initialize the watchdog
+
+        Args:
+            process: Kind of process watched, "web" or "render", for logs
+                and metrics.
+            max_rss_bytes: Resident memory that triggers a recycle, 0
+                disables the limit.
+            max_requests: Requests served that trigger a recycle, 0
+                disables the limit.
+            jitter: Fraction of ``max_requests`` added at random, so
+                processes started together do not recycle together.
+        """
+        self.process = process
+        self.max_rss_bytes = max(0, max_rss_bytes)
+        self.max_requests = max(0, max_requests)
+        self.jitter = jitter
+        self.requests = 0
+        self.tripped = False
+        # drawn on the first check, in the worker rather than in a
+        # preloading master whose random state every fork would share
+        self._request_limit: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is set."""
+        return bool(self.max_rss_bytes or self.max_requests)
+
+    def check(self, rss: Optional[int] = None) -> Optional[str]:
+        """Count a request and check the limits
+
+        Args:
+            rss: Resident memory of the watched process, read from this
+                process if not given.
+
+        Returns:
+            "rss" or "requests" the first time a limit is passed, else
+            None.
+        """
+        self.requests += 1
+        if self.tripped or not self.enabled:
+            return None
+        if self._request_limit is None:
+            self._request_limit = self.max_requests + random.randint(
+                0, int(self.max_requests * self.jitter)
+            )
+        reason = None
+        if self.max_requests and self.requests >= self._request_limit:
+            reason = "requests"
+        elif self.max_rss_bytes:
+            rss = rss_bytes() if rss is None else rss
+            if rss > self.max_rss_bytes:
+                reason = "rss"
+        if reason:
+            self.tripped = True
+            RECYCLES.inc(self.process, reason)
+            _LOGGER.warning(
+                "Recycling %s worker after %d requests (%s limit)",
+                self.process, self.requests, reason,
+            )
+        return reason
+
+    def reset(self) -> None:
+        """Start counting again, for a recycled process."""
+        self.requests = 0
+        self.tripped = False
+        self._request_limit = None
+
+
+class WatchdogMiddleware:
+    """ASGI middleware recycling the web worker past its memory limits.
+
+    The limits are checked after each response. A worker past them sends
+    itself SIGTERM, which the uvicorn worker handles as a graceful
+    shutdown: it stops accepting connections, finishes the requests in
+    flight and exits, and the gunicorn master starts a fresh worker.
+    """
+    def __init__(self, app, watchdog: MemoryWatchdog):
+        self.app = app
+        self.watchdog = watchdog
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.watchdog.enabled:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if self.watchdog.check():
+                os.kill(os.getpid(), signal.SIGTERM)
+
+
+web_watchdog = MemoryWatchdog(
+    "web",
+    max_rss_bytes=c.WORKER_MAX_RSS_BYTES,
+    max_requests=c.WORKER_MAX_REQUESTS,
+)
+metrics.callback(
+    "resume_process_rss_bytes", "Resident memory of the web worker",
+    rss_bytes,
+)
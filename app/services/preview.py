@@ -0,0 +1,190 @@
+"""Resume preview service.
+
+A PDF render runs reportlab's full layout, which is too slow to repeat on
+every edit in an editor. The preview renderers write the sections of the
+resume document, the same the PDF generator renders, as HTML, Markdown or
+plain text with plain string building, in well under a millisecond for a
+typical resume. The PDF is only needed for the final download.
+
+Document text is escaped, so the HTML preview is safe to embed in the
+editor.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict
+from xml.sax.saxutils import unescape
+
+from app.core.exceptions import UnknownFormatException
+from app.services.document import ResumeDocument
+from app.services.style import Style
+
+# Characters with a meaning in Markdown, escaped with a backslash. The
+# backslash comes first so added escapes are not escaped again
+_MARKDOWN_SPECIAL = "\\`*_[]<>#|"
+
+
+def _md(text: str) -> str:
+    """Turn document text into Markdown text."""
+    text = unescape(text)
+    # most values contain none of the characters, so test before replacing
+    for char in _MARKDOWN_SPECIAL:
+        if char in text:
+            text = text.replace(char, "\\" + char)
+    return text
+
+
+def _color(color) -> str:
+    """Return a reportlab color as a CSS hex color."""
+    return "#" + color.hexval()[2:]
+
+
+def render_html(document: ResumeDocument, style: Style) -> str:
+    """Render a resume as an HTML fragment
+
+    Document text is already escaped for markup, which is also valid HTML
+    text.
+
+    Args:
+        document: Resume document.
+        style: Style providing the colors and font.
+
+    Returns:
+        A ``<article>`` element with one ``<section>`` per resume section.
+    """
+    font = "serif" if style.default_font.startswith("Times") else "sans-serif"
+    parts = [
+        f'<article class="resume" style="font-family: {font}; '
+        f'color: {_color(style.primary_color)}">',
+        f"<h1>{document.name}</h1>",
+        f'<p class="title">{document.title}</p>',
+    ]
+    if document.contact:
+        parts.append(f'<p class="contact">{document.contact}</p>')
+
+    def lines(section_lines) -> None:
+        parts.extend(
+            f"<p><b>{line.label}:</b> {line.text}</p>" if line.label
+            else f"<p>{line.text}</p>"
+            for line in section_lines
+        )
+
+    for section in document.sections:
+        parts.append(f"<section><h2>{section.title}</h2><hr>")
+        lines(section.lines)
+        for entry in section.entries:
+            parts.append(
+                f'<div class="item"><h3>{entry.heading}</h3>'
+                f'<span class="date">{entry.date}</span>'
+            )
+            lines(entry.lines)
+            if entry.bullets:
+                parts.append('<ul style="list-style: none">')
+                parts.extend(
+                    f"<li>{document.bullet}{item}</li>"
+                    for item in entry.bullets
+                )
+                parts.append("</ul>")
+            parts.append("</div>")
+        parts.append("</section>")
+
+    parts.append("</article>")
+    return "".join(parts)
+
+
+def render_markdown(document: ResumeDocument, _style: Style) -> str:
+    """Render a resume as Markdown
+
+    Args:
+        document: Resume document.
+        _style: Unused, Markdown lists bring their own markers.
+
+    Returns:
+        The Markdown document.
+    """
+    lines = [
+        f"# {_md(document.name)}", "", f"**{_md(document.title)}**", "",
+    ]
+    if document.contact:
+        lines += [_md(document.contact), ""]
+
+    for section in document.sections:
+        lines += [f"## {section.title}", ""]
+        # labelled lines, e.g. skill categories, form a list
+        for line in section.lines:
+            if line.label:
+                lines.append(f"- **{_md(line.label)}:** {_md(line.text)}")
+            else:
+                lines += [_md(line.text), ""]
+        if section.lines and section.lines[-1].label:
+            lines.append("")
+        for entry in section.entries:
+            lines += [f"### {_md(entry.heading)}", ""]
+            lines += [f"*{_md(entry.date)}*", ""]
+            for line in entry.lines:
+                lines += [_md(line.text), ""]
+            if entry.bullets:
+                lines += [f"- {_md(item)}" for item in entry.bullets]
+                lines.append("")
+
+    return "\n".join(lines)
+
+
+def render_text(document: ResumeDocument, _style: Style) -> str:
+    """Render a resume as plain text
+
+    Args:
+        document: Resume document.
+        _style: Unused, the document carries the bullet marker.
+
+    Returns:
+        The text document with underlined section titles.
+    """
+    lines = [unescape(document.name), unescape(document.title)]
+    if document.contact:
+        lines.append(unescape(document.contact))
+
+    for section in document.sections:
+        lines += ["", section.title.upper(), "=" * len(section.title)]
+        lines.extend(
+            unescape(f"{line.label}: {line.text}" if line.label
+                     else line.text)
+            for line in section.lines
+        )
+        for entry in section.entries:
+            lines.append(unescape(f"{entry.heading}    {entry.date}"))
+            lines.extend(unescape(line.text) for line in entry.lines)
+            lines.extend(
+                unescape(f"  {document.bullet}{item}")
+                for item in entry.bullets
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+@dataclass(frozen=True)
+class PreviewFormat:
+    """Preview renderer and the media type of its output."""
+    name: str
+    media_type: str
+    render: Callable[[ResumeDocument, Style], str]
+
+
+PREVIEW_FORMATS: Dict[str, PreviewFormat] = {
+    "html": PreviewFormat("html", "text/html", render_html),
+    "markdown": PreviewFormat("markdown", "text/markdown", render_markdown),
+    "text": PreviewFormat("text", "text/plain", render_text),
+}
+
+
+def get_preview_format(name: str) -> PreviewFormat:
+    """Return a preview format by name
+
+    Raises:
+        UnknownFormatException: If the format does not exist.
+    """
+    try:
+        return PREVIEW_FORMATS[name]
+    except KeyError as exc:
+        raise UnknownFormatException(
+            f"Unknown preview format '{name}', "
+            f"available: {', '.join(PREVIEW_FORMATS)}"
+        ) from exc
@@ -0,0 +1,56 @@
+"""PDF output profile service.
+
+An output profile trades render CPU against PDF size:
+
+- ``fast`` writes uncompressed content streams, for batch archives and
+  local networks.
+- ``balanced`` compresses content streams and sets the document title and
+  author. It is the default.
+- ``smallest`` compresses content streams and leaves out the document
+  metadata, for clients on slow links.
+
+Reportlab already shares font objects between pages and embeds TrueType
+fonts as subsets, so profiles do not need to deduplicate objects. The
+ASCII85 stream wrapper only exists for 7-bit transports and adds a quarter
+to every compressed stream, so it is disabled process-wide.
+"""
+from dataclasses import dataclass
+from typing import Dict
+
+from reportlab import rl_config
+
+from app.core.exceptions import UnknownProfileException
+
+rl_config.useA85 = 0
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """Options of the PDF writer."""
+    name: str
+    # deflate page content streams
+    compress: bool
+    # write the resume name as document title and author
+    metadata: bool
+
+
+PROFILES: Dict[str, OutputProfile] = {
+    "fast": OutputProfile("fast", compress=False, metadata=True),
+    "balanced": OutputProfile("balanced", compress=True, metadata=True),
+    "smallest": OutputProfile("smallest", compress=True, metadata=False),
+}
+
+
+def get_profile(name: str) -> OutputProfile:
+    """Return an output profile by name
+
+    Raises:
+        UnknownProfileException: If the profile does not exist.
+    """
+    try:
+        return PROFILES[name]
+    except KeyError as exc:
+        raise UnknownProfileException(
+            f"Unknown output profile '{name}', "
+            f"available: {', '.join(PROFILES)}"
+        ) from exc
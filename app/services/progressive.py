@@ -0,0 +1,212 @@
+"""Progressive PDF output.
+
+Reportlab keeps every page of a document in memory and only writes the PDF
+when the canvas is saved, after the layout of the last page, so nothing of
+a PDF can be sent before its render has finished. ``ProgressiveCanvas``
+writes the content stream of each page, the bulk of a PDF, as soon as the
+page is laid out, and frees it. The page objects, fonts, cross-reference
+table and trailer follow when the canvas is saved.
+
+PDF objects may appear in any order in the file, since the cross-reference
+table at the end gives the offset of every object, so the output is a valid
+PDF with the same content streams as a regular render. Its objects are
+numbered in a different order, so the bytes differ from a regular render.
+"""
+from typing import BinaryIO, Callable, List, Optional, Set
+
+from reportlab import rl_config
+from reportlab.pdfbase.pdfdoc import (
+    PDFBase85Encode, PDFCrossReferenceTable, PDFDocument, PDFFile,
+    PDFIndirectObject, PDFPage, PDFStream, PDFTrailer, PDFZCompress,
+    pdfdocEnc,
+)
+from reportlab.pdfgen.canvas import Canvas
+
+from app.services.fonts import embedded_font_bytes
+
+
+class _Tee:
+    """Stream keeping what is written to it before passing it on."""
+    def __init__(self, output: BinaryIO):
+        self.output = output
+        self.pieces: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.pieces.append(data)
+        return self.output.write(data)
+
+    def flush(self) -> None:
+        self.output.flush()
+
+
+class _ProgressiveDocument(PDFDocument):
+    """PDF document writing objects to its output as they are final."""
+    def __init__(self, output: BinaryIO, **kwargs):
+        """Initialize the document
+
+        Args:
+            output: Writable binary stream the document is written to.
+            **kwargs: Keyword arguments of ``PDFDocument``.
+        """
+        super().__init__(**kwargs)
+        self.output = output
+        self.offset = 0
+        self.written: Set[str] = set()
+        self.font_bytes = 0
+
+    def _write(self, data: bytes) -> None:
+        if not self.offset:
+            # the file header comes before the first object
+            header = PDFFile(self._pdfVersion).format(self)
+            self.output.write(header)
+            self.offset = len(header)
+        data = pdfdocEnc(data)
+        self.output.write(data)
+        self.offset += len(data)
+
+    def _write_object(self, name: str) -> None:
+        """Write a registered object and record its offset."""
+        data = PDFIndirectObject(name, self.idToObject[name]).format(self)
+        self._write(b"")  # the header, if nothing was written yet
+        self.idToOffset[name] = self.offset
+        self._write(data)
+        self.written.add(name)
+
+    def write_page_stream(self, page: PDFPage) -> None:
+        """Write the content stream of a finished page and free it."""
+        stream = PDFStream()
+        if page.compression:
+            # rl_config sets its options from defaults when imported
+            use_a85 = rl_config.useA85  # pylint: disable=no-member
+            stream.filters = (
+                [PDFBase85Encode, PDFZCompress] if use_a85
+                else [PDFZCompress]
+            )
+        stream.content = page.stream
+        stream.__Comment__ = "page stream"
+        # the page refers to its stream, which check_format keeps
+        page.Contents = stream
+        page.stream = None
+        self._write_object(self.Reference(stream).name)
+        stream.content = ""
+        # hand the page on now rather than with the next ones
+        self.output.flush()
+
+    def format(self) -> bytes:
+        """Write the objects not written yet, the xref and the trailer.
+
+        Follows ``PDFDocument.format``, which returns the whole PDF
+        instead.
+
+        Returns:
+            Nothing more to write, the output already holds the PDF.
+        """
+        catalog_ref = self.Reference(self.Catalog)
+        info_ref = self.Reference(self.info)
+        # everything but the page streams, which holds the fonts
+        self.output = _Tee(self.output)
+        ids: List[str] = []
+        # formatting an object may register more objects, so walk the
+        # object numbers until none is left
+        number = 1
+        while number in self.numberToId:
+            name = self.numberToId[number]
+            if name not in self.written:
+                self._write_object(name)
+            ids.append(name)
+            number += 1
+
+        xref = PDFCrossReferenceTable()
+        xref.addsection(0, ids)
+        xref_offset = self.offset
+        self._write(xref.format(self))
+        trailer = PDFTrailer(
+            startxref=xref_offset,
+            Size=len(ids) + 1,
+            Root=catalog_ref,
+            Info=info_ref,
+            Encrypt=None,
+            ID=self.ID(),
+        )
+        self._write(trailer.format(self))
+        self.font_bytes = embedded_font_bytes(b"".join(self.output.pieces))
+        return b""
+
+
+class ProgressiveCanvas(Canvas):
+    """Canvas writing each page to its output stream as it is finished."""
+    def __init__(self, filename: BinaryIO, *args, **kwargs):
+        """Initialize the canvas
+
+        Args:
+            filename: Writable binary stream the PDF is written to, and
+                flushed after every page.
+            *args: Positional arguments of ``Canvas``.
+            **kwargs: Keyword arguments of ``Canvas``, without encryption,
+                which needs every object before it can write any.
+        """
+        if kwargs.get("encrypt"):
+            raise ValueError("Progressive output cannot be encrypted")
+        self._output = filename
+        self._lang = kwargs.get("lang")
+        self._progressive: Optional[_ProgressiveDocument] = None
+        super().__init__(filename, *args, **kwargs)
+
+    def _make_preamble(self):
+        if self._progressive is None:
+            # Canvas.__init__ creates a plain document and makes the first
+            # preamble with it before anything else refers to it
+            plain = self._doc
+            self._progressive = _ProgressiveDocument(
+                self._output,
+                compression=plain.compression,
+                invariant=plain.invariant,
+                pdfVersion=plain._pdfVersion,  # pylint: disable=protected-access
+                lang=self._lang,
+            )
+            self._doc = self._progressive
+        super()._make_preamble()
+
+    @property
+    def font_bytes(self) -> int:
+        """Size of the embedded font programs, known once saved."""
+        return self._progressive.font_bytes
+
+    def showPage(self):
+        super().showPage()
+        self._progressive.write_page_stream(
+            self._progressive.Pages.pages[-1]
+        )
+
+
+class ChunkWriter:
+    """Writable stream handing written bytes on in chunks.
+
+    Writes are collected until ``chunk_size`` bytes are buffered or the
+    stream is flushed, so the receiver gets a chunk per page rather than
+    one per PDF object.
+    """
+    def __init__(self, send: Callable[[bytes], None], chunk_size: int):
+        """Initialize the writer
+
+        Args:
+            send: Called with every chunk, in order.
+            chunk_size: Bytes buffered before a chunk is sent.
+        """
+        self._send = send
+        self.chunk_size = max(1, chunk_size)
+        self._buffer = bytearray()
+        self.bytes_written = 0
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self.bytes_written += len(data)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        """Send the buffered bytes."""
+        if self._buffer:
+            self._send(bytes(self._buffer))
+            self._buffer.clear()
@@ -0,0 +1,109 @@
+"""Cached render service.
+
+Single requests, batches and jobs all render a resume the same way: look its
+render key up in the render cache, and on a miss build the resume document,
+check its estimated memory, render it on the render executor and cache the
+PDF. ``render_cached`` is that flow, so the three of them only differ in how
+they wait for capacity.
+"""
+import asyncio
+from contextlib import nullcontext
+from dataclasses import dataclass
+from time import perf_counter
+from typing import AsyncContextManager, Optional, Union
+
+from app.core.exceptions import RenderQueueFullException
+from app.models.resume import ResumeData
+from app.services.cache import render_cache, render_key
+from app.services.document import build_document
+from app.services.executor import RenderExecutor
+from app.services.generator import RenderResult, record_render, render_pdf
+from app.services.memory import check_render_memory
+from app.services.style import get_style
+
+
+@dataclass
+class CachedRender:
+    """PDF of a resume, from the render cache or freshly rendered."""
+    key: str
+    pdf: Union[bytes, memoryview]
+    # the render, None for a cache hit
+    result: Optional[RenderResult] = None
+    # seconds waiting for the slot, and the executor round trip
+    queue_seconds: float = 0.0
+    render_seconds: float = 0.0
+
+    @property
+    def cached(self) -> bool:
+        """Whether the PDF came from the render cache."""
+        return self.result is None
+
+
+async def render_cached(
+    executor: RenderExecutor,
+    data: ResumeData,
+    theme: str = "default",
+    profile: str = "balanced",
+    fit: bool = False,
+    *,
+    key: Optional[str] = None,
+    view: bool = False,
+    slot: Optional[AsyncContextManager] = None,
+    retry_delay: Optional[float] = None,
+) -> CachedRender:
+    """Return the PDF of a resume from the render cache or render it
+
+    Args:
+        executor: Render executor the PDF is built in on a cache miss.
+        data: Resume data to render.
+        theme: Name of the style theme.
+        profile: Name of the PDF output profile.
+        fit: Whether to shrink the resume to fit on one page.
+        key: Render key of the resume, computed if not given.
+        view: Whether a cache hit may be returned as a read-only view
+            instead of bytes.
+        slot: Context held around the render, such as an admission slot.
+            Cache hits do not take it.
+        retry_delay: Seconds to wait before retrying a render rejected by
+            a full render queue. None raises the rejection instead.
+
+    Returns:
+        CachedRender: The PDF, and the render if it was not cached.
+
+    Raises:
+        PayloadTooLargeException: If the estimated render memory exceeds
+            the limit.
+        RenderQueueFullException: If the render queue is full and no
+            retry_delay is given.
+    """
+    style = get_style(theme)
+    if key is None:
+        key = render_key(data, style, profile, fit)
+    lookup = render_cache.view_async if view else render_cache.get_async
+    pdf = await lookup(key)
+    if pdf is not None:
+        return CachedRender(key, pdf)
+
+    document = build_document(data, style)
+    check_render_memory(document)
+    t0 = perf_counter()
+    async with slot or nullcontext():
+        queue_seconds = perf_counter() - t0
+        t0 = perf_counter()
+        while True:
+            try:
+                result = await executor.run(
+                    render_pdf, document, theme=theme, profile=profile,
+                    fit=fit,
+                )
+                break
+            except RenderQueueFullException:
+                if retry_delay is None:
+                    raise
+                await asyncio.sleep(retry_delay)
+    render_seconds = perf_counter() - t0
+    record_render(result)
+    await render_cache.put_async(key, result.pdf)
+    return CachedRender(
+        key, result.pdf, result, queue_seconds, render_seconds
+    )
@@ -0,0 +1,172 @@
+"""Streaming render service.
+
+A regular render hands the PDF over once ``doc.build`` has finished, so
+the client receives nothing until the whole resume is laid out, and the
+PDF is held whole in the render worker, in transit and in the response.
+``RenderStream`` runs ``stream_pdf`` in the render executor instead: the
+worker writes each page as soon as it is laid out into a pipe, and the
+stream hands the chunks to the response as an async iterator.
+
+The pipe is bounded by the operating system, so a slow client holds the
+render back rather than letting the PDF pile up in memory: at most one
+chunk is buffered on either side, plus what the pipe holds. The pipe is
+watched with the event loop, so no thread waits on it.
+"""
+import asyncio
+import logging
+import multiprocessing
+from contextlib import AsyncExitStack
+from time import perf_counter
+from typing import AsyncContextManager, AsyncIterator, Optional
+
+from app.core.config import config as c
+from app.services.document import ResumeDocument
+from app.services.executor import RenderExecutor
+from app.services.generator import RenderResult, record_render, stream_pdf
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RenderStream:
+    """PDF of a render, received in chunks while it is rendered."""
+    def __init__(
+        self,
+        executor: RenderExecutor,
+        document: ResumeDocument,
+        theme: str = "default",
+        profile: str = "balanced",
+        fit: bool = False,
+        chunk_size: int = c.STREAM_CHUNK_SIZE,
+        slot: Optional[AsyncContextManager] = None,
+    ):
+        """Initialize the stream
+
+        Args:
+            executor: Render executor the render runs in.
+            document: Resume document built for ``theme``.
+            theme: Name of the style theme to render with.
+            profile: Name of the PDF output profile.
+            fit: Whether to shrink the resume to fit on one page.
+            chunk_size: Bytes the worker collects before sending them.
+            slot: Context held from the start of the render until the
+                stream ends, e.g. an admission slot.
+        """
+        self.executor = executor
+        self.document = document
+        self.theme = theme
+        self.profile = profile
+        self.fit = fit
+        self.chunk_size = chunk_size
+        self.slot = slot
+        # seconds waiting for the slot and until the first chunk arrived
+        self.queue_seconds = 0.0
+        self.first_byte_seconds = 0.0
+        # bytes received and the largest chunk held at once
+        self.bytes_sent = 0
+        self.peak_buffered_bytes = 0
+        self.result: Optional[RenderResult] = None
+        self._stack = AsyncExitStack()
+        self._reader = None
+        self._writer = None
+        self._task: Optional[asyncio.Task] = None
+        self._first: Optional[bytes] = None
+
+    async def start(self) -> None:
+        """Start the render and wait for its first chunk
+
+        Errors of the render before the first chunk, e.g. a full render
+        queue, are raised here, before a response is started.
+        """
+        t0 = perf_counter()
+        try:
+            if self.slot is not None:
+                await self._stack.enter_async_context(self.slot)
+            self.queue_seconds = perf_counter() - t0
+            self._reader, self._writer = multiprocessing.Pipe(duplex=False)
+            self._task = asyncio.ensure_future(self.executor.run(
+                stream_pdf, self.document, self._writer, theme=self.theme,
+                profile=self.profile, fit=self.fit,
+                chunk_size=self.chunk_size,
+            ))
+            self._first = await self._receive()
+        except BaseException:
+            await self.aclose()
+            raise
+        self.first_byte_seconds = perf_counter() - t0
+
+    async def _readable(self) -> None:
+        """Wait until the pipe has data or the render has ended."""
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = self._reader.fileno()
+        loop.add_reader(
+            fd, lambda: readable.done() or readable.set_result(None)
+        )
+        try:
+            await asyncio.wait(
+                (readable, self._task), return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            loop.remove_reader(fd)
+            readable.cancel()
+
+    async def _receive(self) -> Optional[bytes]:
+        """Return the next chunk, or None once the render has finished
+
+        Raises:
+            Exception: The error of a failed render.
+        """
+        while True:
+            # a chunk arriving is read whole: the worker is writing it
+            if self._reader.poll():
+                try:
+                    chunk = self._reader.recv_bytes()
+                except EOFError:
+                    # a thread worker closed the pipe, it is done
+                    self.result = await self._task
+                    return None
+                self.bytes_sent += len(chunk)
+                self.peak_buffered_bytes = max(
+                    self.peak_buffered_bytes, len(chunk)
+                )
+                return chunk
+            if self._task.done():
+                # every chunk was sent before the render returned
+                self.result = self._task.result()
+                return None
+            await self._readable()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield the chunks of the PDF, then record the render."""
+        try:
+            chunk = self._first
+            self._first = None
+            while chunk is not None:
+                yield chunk
+                chunk = await self._receive()
+            record_render(self.result)
+            _LOGGER.info(
+                "Streamed resume of %d bytes, first byte after %.3fs",
+                self.bytes_sent, self.first_byte_seconds,
+            )
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pipe and release the slot
+
+        A render still running, because the client went away, fails on
+        the closed pipe and stops.
+        """
+        if self._reader is not None:
+            self._reader.close()
+            # a thread worker closes the same connection itself, a process
+            # worker a copy of it
+            if self.executor.kind == "process":
+                self._writer.close()
+        if self._task is not None and not self._task.done():
+            # retrieve the error of the abandoned render
+            self._task.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+        await self._stack.aclose()
@@ -1,14 +1,28 @@
-"""Resume style service."""
-from dataclasses import dataclass
+"""Resume style service.
+
+Styles are immutable and shared: ``get_style`` builds each distinct
+configuration once per process and hands out the same instance afterwards.
+"""
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.platypus import TableStyle
 
+from app.core.config import config as c
+from app.core.exceptions import UnknownStyleException
+from app.services.fonts import font_name, font_registry
+
 
-@dataclass
+@dataclass(frozen=True)
 class Style:
-    """Resume style configuration."""
+    """Resume style configuration.
+
+    Instances are frozen once built; use ``get_style`` to obtain shared
+    instances instead of constructing a new one per resume.
+    """
     # Document colors
     primary_color: str = colors.black
     secondary_color: str = colors.gray
@@ -30,101 +44,218 @@ class Style:
     separator_space_before: int = 8
     separator_space_after: int = 12
 
+    # Scale of the font sizes and of the vertical spacing, below 1 to fit
+    # a resume on fewer pages
+    font_scale: float = 1.0
+    spacing_scale: float = 1.0
+
+    # Derived styles, built once in __post_init__
+    name: ParagraphStyle = field(init=False, repr=False, compare=False)
+    title: ParagraphStyle = field(init=False, repr=False, compare=False)
+    contact_info: ParagraphStyle = field(
+        init=False, repr=False, compare=False
+    )
+    normal: ParagraphStyle = field(init=False, repr=False, compare=False)
+    section_header: ParagraphStyle = field(
+        init=False, repr=False, compare=False
+    )
+    item_title: ParagraphStyle = field(init=False, repr=False, compare=False)
+    item_subtitle: ParagraphStyle = field(
+        init=False, repr=False, compare=False
+    )
+    date: ParagraphStyle = field(init=False, repr=False, compare=False)
+    bullet_point: ParagraphStyle = field(
+        init=False, repr=False, compare=False
+    )
+    job_table: TableStyle = field(init=False, repr=False, compare=False)
+    section_title_line: TableStyle = field(
+        init=False, repr=False, compare=False
+    )
+
     def __post_init__(self):
         """Initialize the actual styles based on configuration."""
-        self.styles = getSampleStyleSheet()
+        # the dataclass is frozen, so derived styles bypass __setattr__
+        for name, value in self._build_styles().items():
+            object.__setattr__(self, name, value)
 
+    def _build_styles(self) -> Dict[str, Any]:
+        """Build the paragraph and table styles for this configuration."""
+        styles = {}
+        size = self.font_scale
+        space = self.spacing_scale
+        # reportlab leaves the leading at 12 unless a style sets it
+        leading = 12 * size
         # large and centered
-        self.name = ParagraphStyle(
+        styles["name"] = ParagraphStyle(
             "Name",
             fontName=self.bold_font,
-            fontSize=22,
+            fontSize=22 * size,
+            leading=leading,
             alignment=1,  # center alignment
-            spaceAfter=14,
+            spaceAfter=14 * space,
         )
         # below name - smaller and centered
-        self.title = ParagraphStyle(
+        styles["title"] = ParagraphStyle(
             "Title",
             fontName=self.default_font,
-            fontSize=11,
+            fontSize=11 * size,
+            leading=leading,
             alignment=1,  # center alignment
-            spaceAfter=6,
+            spaceAfter=6 * space,
         )
-        self.contact_info = ParagraphStyle(
+        styles["contact_info"] = ParagraphStyle(
             "ContactInfo",
             fontName=self.default_font,
-            fontSize=9,
+            fontSize=9 * size,
+            leading=leading,
             alignment=1,  # center alignment
-            spaceAfter=20,
+            spaceAfter=20 * space,
         )
-        self.normal = ParagraphStyle(
+        styles["normal"] = ParagraphStyle(
             "Normal",
             fontName=self.default_font,
-            fontSize=self.default_font_size,
+            fontSize=self.default_font_size * size,
+            leading=leading,
         )
-        self.section_header = ParagraphStyle(
+        styles["section_header"] = ParagraphStyle(
             'SectionHeader',
-            fontSize=12,
-            spaceBefore=20,
-            spaceAfter=6,
+            fontSize=12 * size,
+            leading=leading,
+            spaceBefore=20 * space,
+            spaceAfter=6 * space,
             textColor=self.primary_color,
             fontName=self.bold_font,
             textTransform="uppercase",
             alignment=0,
         )
         # Experience/Education title style (bold)
-        self.item_title = ParagraphStyle(
+        styles["item_title"] = ParagraphStyle(
             'ItemTitle',
             fontName=self.bold_font,
-            fontSize=10,
+            fontSize=10 * size,
+            leading=leading,
             alignment=0,
-            spaceBefore=8,
+            spaceBefore=8 * space,
         )
         # Experience/Education subtitle style (italic)
-        self.item_subtitle = ParagraphStyle(
+        styles["item_subtitle"] = ParagraphStyle(
             'ItemSubtitle',
             fontName=self.italic_font,
-            fontSize=10,
+            fontSize=10 * size,
+            leading=leading,
             alignment=2,
         )
         # Date style (right-aligned)
-        self.date = ParagraphStyle(
+        styles["date"] = ParagraphStyle(
             'Date',
             fontName=self.italic_font,
-            fontSize=10,
+            fontSize=10 * size,
+            leading=leading,
             alignment=2,
-            spaceBefore=10,
-            spaceAfter=8,
+            spaceBefore=10 * space,
+            spaceAfter=8 * space,
         )
         # Bullet points style
-        self.bullet_point = ParagraphStyle(
+        styles["bullet_point"] = ParagraphStyle(
             'BulletPoint',
             fontName=self.default_font,
-            fontSize=10,
+            fontSize=10 * size,
+            leading=leading,
             leftIndent=20,
             firstLineIndent=-10,
-            spaceBefore=2,
-            spaceAfter=2,
+            spaceBefore=2 * space,
+            spaceAfter=2 * space,
         )
 
         # Add a table style for job entries
-        self.job_table = TableStyle([
+        styles["job_table"] = TableStyle([
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
             ('LEFTPADDING', (0, 0), (-1, -1), 6),
             ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2 * space),
+            ('TOPPADDING', (0, 0), (-1, -1), 6 * space),
         ])
 
         # Update horizontal line style for section titles
-        self.section_title_line = TableStyle([
+        styles["section_title_line"] = TableStyle([
             ('LINEABOVE', (0, 0), (-1, 0),
              self.separator_thickness, self.separator_color),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 0), (-1, -1), self.separator_space_before),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), self.separator_space_after),
+            ('TOPPADDING', (0, 0), (-1, -1),
+             self.separator_space_before * space),
+            ('BOTTOMPADDING', (0, 0), (-1, -1),
+             self.separator_space_after * space),
         ])
+        return styles
+
+    def cache_key(self) -> str:
+        """Returns a stable string describing the style configuration."""
+        return repr(tuple(
+            (f.name, getattr(self, f.name)) for f in fields(self) if f.init
+        ))
 
     def get_bullet_point(self) -> str:
         """Returns the bullet character if bullet points are enabled."""
         return self.bullet_character if self.use_bullet_points else ""
+
+
+# Named themes selectable per request, as overrides of the Style defaults
+THEMES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "compact": {
+        "default_font_size": 9,
+        "separator_space_before": 4,
+        "separator_space_after": 8,
+    },
+    "classic": {
+        "default_font": "Times-Roman",
+        "bold_font": "Times-Bold",
+        "italic_font": "Times-Italic",
+    },
+    "modern": {
+        "primary_color": colors.HexColor("#1F4E79"),
+        "secondary_color": colors.HexColor("#5B6770"),
+        "separator_color": colors.HexColor("#1F4E79"),
+        "separator_thickness": 1.5,
+    },
+    # TrueType family covering more scripts than the built-in fonts
+    "unicode": {
+        "default_font": font_name(c.UNICODE_FONT_FAMILY),
+        "bold_font": font_name(c.UNICODE_FONT_FAMILY, "bold"),
+        "italic_font": font_name(c.UNICODE_FONT_FAMILY, "italic"),
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def _build_style(options: Tuple[Tuple[str, Any], ...]) -> Style:
+    """Build a Style once per distinct configuration."""
+    style = Style(**dict(options))
+    for font in (style.default_font, style.bold_font, style.italic_font):
+        if not font_registry.ensure(font):
+            raise UnknownStyleException(f"Unknown font '{font}'")
+    return style
+
+
+def get_style(theme: str = "default", **overrides) -> Style:
+    """Return the shared Style instance for a theme
+
+    Args:
+        theme: Name of a theme registered in ``THEMES``.
+        **overrides: Style fields overriding the theme values.
+
+    Returns:
+        A frozen Style shared by every caller asking for the same
+        configuration.
+
+    Raises:
+        UnknownStyleException: If the theme is not registered or uses a
+            font that is neither built in nor a known TrueType family.
+    """
+    try:
+        options = {**THEMES[theme], **overrides}
+    except KeyError as exc:
+        raise UnknownStyleException(
+            f"Unknown theme '{theme}', available: {', '.join(THEMES)}"
+        ) from exc
+    return _build_style(tuple(sorted(options.items())))
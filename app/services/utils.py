@@ -1,21 +1,119 @@
 """Utility module."""
-import logging
+import math
 import os
+import sqlite3
+import tempfile
+import threading
+import unicodedata
+from typing import Sequence
+from urllib.parse import quote
 
-_LOGGER = logging.getLogger(__name__)
 
+def to_file_name(name: str) -> str:
+    """Turn a person's name into a file name.
 
-async def remove_file(path: str):
-    """Remove a file by path.
+    The result is used inside output directories and ZIP archives, so it
+    never holds a path separator and never names a parent directory.
 
     Args:
-        path (str): The file path to remove.
+        name (str): The name to convert.
+
+    Returns:
+        str: Lowercase name with spaces, dots, commas and slashes replaced,
+            or "resume" if nothing is left of it.
+    """
+    file_name = name.lower()
+    for char in " .,/\\":
+        file_name = file_name.replace(char, "_")
+    if not file_name or file_name.startswith(".."):
+        return "resume"
+    return file_name
+
+
+def content_disposition(file_name: str) -> str:
+    """Build an attachment Content-Disposition header value.
+
+    Header values are Latin-1, so a non-ASCII name is sent as a UTF-8
+    ``filename*`` parameter with an ASCII ``filename`` fallback.
+
+    Args:
+        file_name (str): The file name offered to the client.
+
+    Returns:
+        str: The Content-Disposition header value.
+    """
+    if file_name.isascii():
+        return f"attachment; filename={file_name}"
+    fallback = unicodedata.normalize("NFKD", file_name)
+    fallback = fallback.encode("ascii", "ignore").decode("ascii") or "resume"
+    return (
+        f"attachment; filename={fallback}; "
+        f"filename*=UTF-8''{quote(file_name)}"
+    )
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Compute a percentile with linear interpolation.
+
+    Args:
+        values (Sequence[float]): Samples, in any order.
+        q (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile value, or 0.0 if there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write a file through a temporary file renamed into place.
+
+    Readers never see a partially written file, only the previous one or
+    the new one.
+
+    Args:
+        path (str): The file to write.
+        data (bytes): The new content of the file.
     """
-    _LOGGER.info("Removing file: %s", path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", suffix=".tmp"
+    )
     try:
-        if os.path.exists(path):
-            os.unlink(path)
-            _LOGGER.debug("Done removing file: %s", path)
-    except Exception as exc:
-        _LOGGER.exception("Error removing file: %s", exc)
-    return path
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class LocalConnection:
+    """SQLite connection of each thread and process to one database."""
+    def __init__(self, path: str, timeout: float = 10):
+        """Initialize the connection factory
+
+        Args:
+            path (str): The SQLite database file, opened in WAL mode.
+            timeout (float): Seconds to wait for a lock of the database.
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def __call__(self) -> sqlite3.Connection:
+        """Return this thread's connection to the database."""
+        conn = getattr(self._local, "conn", None)
+        # a connection inherited from a preloading parent process must not
+        # be shared with it, so forked workers open their own
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
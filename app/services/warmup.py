@@ -0,0 +1,143 @@
+"""Warm-up service.
+
+The first render in a fresh process pays for lazy initialization: style
+and font setup, reportlab's font metrics and paragraph parser, and the
+paragraph markup cache. A render worker warms itself up by rendering a
+built-in sample resume once before it takes work. Worker processes do not
+import ``app.main``, so they also set up logging first. ``warm_up`` starts every
+render executor worker before the app accepts traffic, and it records the
+outcome for the readiness endpoint.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from dataclasses import asdict, dataclass, field
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.core.config import config as c
+from app.core.loggers import setup_logging
+from app.models.resume import ResumeData
+from app.services.cache import render_key
+from app.services.document import build_document
+from app.services.fonts import preload_fonts
+from app.services.generator import render_pdf
+from app.services.style import THEMES, get_style
+
+if TYPE_CHECKING:  # the executor uses warm_up_worker as initializer
+    from app.services.executor import RenderExecutor
+
+_LOGGER = logging.getLogger(__name__)
+
+# Built-in sample resume, the example of the API schema
+SAMPLE_RESUME: Dict[str, Any] = (
+    ResumeData.model_config["json_schema_extra"]["examples"][0]
+)
+
+# Seconds the warm-up of this process took, set by warm_up_worker
+_worker_warmup_seconds: Optional[float] = None
+
+
+def warm_up_process() -> float:
+    """Render the sample resume with every theme in this process
+
+    Returns:
+        Seconds spent warming up.
+    """
+    t0 = perf_counter()
+    preload_fonts()
+    data = ResumeData.model_validate(SAMPLE_RESUME)
+    for theme in THEMES:
+        style = get_style(theme)
+        render_key(data, style)
+        render_pdf(build_document(data, style), theme=theme)
+    return perf_counter() - t0
+
+
+def setup_worker_logging() -> None:
+    """Set up logging in a render worker process like in the app
+
+    Records are written by the logging thread rather than queued: pool
+    workers exit without running atexit handlers, which would lose the
+    records still queued.
+    """
+    setup_logging(
+        log_level=c.LOG_LEVEL,
+        use_basic_format=c.LOG_USE_BASIC_FORMAT,
+        sample_rate=c.LOG_SAMPLE_RATE,
+        sampled_loggers=[
+            name.strip() for name in c.LOG_SAMPLED_LOGGERS.split(",") if name
+        ],
+    )
+
+
+def warm_up_worker() -> None:
+    """Warm up a render worker, used as the render executor initializer."""
+    global _worker_warmup_seconds  # pylint: disable=global-statement
+    # thread workers share the logging of the app process
+    if multiprocessing.parent_process() is not None:
+        setup_worker_logging()
+    _worker_warmup_seconds = warm_up_process()
+
+
+def worker_state() -> Tuple[int, Optional[float]]:
+    """Return the pid and warm-up duration of the current worker."""
+    return os.getpid(), _worker_warmup_seconds
+
+
+@dataclass
+class Readiness:
+    """Warm-up state of the app process."""
+    ready: bool = False
+    started_at: Optional[float] = None
+    warmup_seconds: Optional[float] = None
+    # warm-up duration of each render worker by pid
+    workers: Dict[int, Optional[float]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON serializable representation."""
+        data = asdict(self)
+        data["workers"] = {str(pid): s for pid, s in self.workers.items()}
+        return data
+
+
+readiness = Readiness()
+
+
+async def warm_up(executor: "RenderExecutor") -> Readiness:
+    """Start and warm up every render worker
+
+    One task per worker is submitted at once, so the pool starts all its
+    processes, and each of them runs the warm-up initializer before its
+    first task. A failed warm-up is logged and leaves the app not ready
+    instead of stopping it.
+
+    Args:
+        executor: Render executor to warm up.
+
+    Returns:
+        The updated readiness state.
+    """
+    readiness.ready = False
+    readiness.started_at = time()
+    t0 = perf_counter()
+    try:
+        states: List[Tuple[int, Optional[float]]] = await asyncio.gather(*(
+            executor.run(worker_state) for _ in range(executor.max_workers)
+        ))
+    except Exception as exc:  # pylint: disable=broad-except
+        _LOGGER.exception("Render worker warm-up failed: %s", exc)
+        readiness.error = str(exc)
+        return readiness
+
+    readiness.workers = dict(states)
+    readiness.warmup_seconds = perf_counter() - t0
+    readiness.error = None
+    readiness.ready = True
+    _LOGGER.info(
+        "Warmed up %d render workers in %.2fs",
+        len(readiness.workers), readiness.warmup_seconds,
+    )
+    return readiness
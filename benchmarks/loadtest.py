@@ -0,0 +1,538 @@
+"""Load test of the HTTP API.
+
+Replays resume payloads against the app and reports throughput, latency
+percentiles, status counts and the CPU time of every server process:
+
+    python -m benchmarks.loadtest --concurrency 8 --requests 400
+    python -m benchmarks.loadtest --rate 20 --duration 30 --sizes small
+    python -m benchmarks.loadtest --target server --workers 2 \\
+        --render-workers 4 --payloads recorded.jsonl
+
+Targets:
+    inprocess: the ASGI app in this process, through httpx's ASGI transport
+        and with the app lifespan, so without any network. The CPU of this
+        process includes the load generator.
+    server: the production gunicorn configuration started on a unix
+        socket, with ``--workers`` web workers and ``--render-workers``
+        render processes each.
+
+Load:
+    closed loop (``--concurrency``): that many clients each send their next
+        request when the previous one completes.
+    open loop (``--rate``): requests start at a fixed rate, or with Poisson
+        arrivals with ``--poisson``, whether or not earlier ones completed.
+        Latency is measured from the scheduled start, so a server falling
+        behind shows in the percentiles.
+
+Payloads come from a JSON Lines file, one resume payload per line or one
+recorded request ``{"path": ..., "params": {...}, "body": {...}}`` per line,
+or are synthetic resumes of the given sizes. Synthetic resumes differ per
+request so every render is a cache miss, unless ``--cache-hits`` is set.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import (
+    Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Tuple
+)
+
+import httpx
+
+from app.core.config import config as c
+from app.services.utils import percentile
+from benchmarks.synthetic import SIZES, make_resume
+
+GENERATE_PATH = f"{c.API_PREFIX}/v1/resume/generate"
+READY_PATH = f"{c.API_PREFIX}/v1/ready"
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class Request(NamedTuple):
+    """Request replayed by the load generator, with its JSON body encoded."""
+    path: str
+    params: Dict[str, str]
+    body: bytes
+
+
+class Sample(NamedTuple):
+    """Outcome of one request."""
+    latency: float
+    # HTTP status, or the exception class name if the request failed
+    status: str
+
+
+def read_payloads(
+    path: str, default_path: str = GENERATE_PATH
+) -> List[Request]:
+    """Read the requests of a JSON Lines file
+
+    Args:
+        path: File with one resume payload or recorded request per line.
+        default_path: Path resume payloads are sent to.
+
+    Returns:
+        The requests, in file order.
+    """
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "body" in record:
+                requests.append(Request(
+                    record.get("path", default_path),
+                    record.get("params", {}),
+                    json.dumps(record["body"]).encode("utf-8"),
+                ))
+            else:
+                requests.append(Request(
+                    default_path, {}, json.dumps(record).encode("utf-8")
+                ))
+    return requests
+
+
+def synthetic_requests(
+    sizes: List[str], unique: bool = True, path: str = GENERATE_PATH
+) -> Iterator[Request]:
+    """Yield synthetic resume requests, cycling through ``sizes``
+
+    Args:
+        sizes: Names of synthetic resume sizes.
+        unique: Whether every resume gets its own seed, so no two requests
+            share a render cache entry.
+        path: Path the resumes are sent to.
+    """
+    for seed, size in enumerate(itertools.cycle(sizes)):
+        resume = make_resume(**SIZES[size], seed=seed if unique else 0)
+        yield Request(path, {}, json.dumps(resume).encode("utf-8"))
+
+
+async def _send(client: httpx.AsyncClient, request: Request) -> str:
+    try:
+        response = await client.post(
+            request.path, params=request.params, content=request.body,
+            headers={"Content-Type": "application/json"},
+        )
+    except httpx.HTTPError as exc:
+        return type(exc).__name__
+    return str(response.status_code)
+
+
+async def closed_loop(
+    client: httpx.AsyncClient,
+    requests: Iterator[Request],
+    concurrency: int,
+    count: Optional[int] = None,
+    duration: Optional[float] = None,
+) -> List[Sample]:
+    """Send requests from ``concurrency`` clients, each waiting for the last
+
+    Args:
+        client: Client of the target.
+        requests: Requests to send, in order.
+        concurrency: Number of concurrent clients.
+        count: Total number of requests to send.
+        duration: Seconds after which no new request is sent.
+
+    Returns:
+        One sample per request.
+    """
+    if count is not None:
+        requests = itertools.islice(requests, count)
+    deadline = perf_counter() + duration if duration else None
+    samples: List[Sample] = []
+
+    async def user() -> None:
+        # the iterator is shared, each request goes to exactly one client
+        for request in requests:
+            if deadline is not None and perf_counter() >= deadline:
+                return
+            t0 = perf_counter()
+            status = await _send(client, request)
+            samples.append(Sample(perf_counter() - t0, status))
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return samples
+
+
+async def open_loop(
+    client: httpx.AsyncClient,
+    requests: Iterator[Request],
+    rate: float,
+    count: Optional[int] = None,
+    duration: Optional[float] = None,
+    poisson: bool = False,
+) -> List[Sample]:
+    """Start requests at ``rate`` per second, regardless of completions
+
+    Args:
+        client: Client of the target.
+        requests: Requests to send, in order.
+        rate: Requests started per second.
+        count: Total number of requests to send.
+        duration: Seconds after which no new request is started.
+        poisson: Whether arrivals are exponentially distributed rather
+            than evenly spaced.
+
+    Returns:
+        One sample per request, latencies measured from the scheduled
+        start.
+    """
+    if count is not None:
+        requests = itertools.islice(requests, count)
+    samples: List[Sample] = []
+    tasks = []
+
+    async def fire(request: Request, scheduled: float) -> None:
+        status = await _send(client, request)
+        samples.append(Sample(perf_counter() - scheduled, status))
+
+    start = perf_counter()
+    offset = 0.0
+    for request in requests:
+        if duration is not None and offset >= duration:
+            break
+        delay = start + offset - perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(request, start + offset)))
+        offset += random.expovariate(rate) if poisson else 1 / rate
+    await asyncio.gather(*tasks)
+    return samples
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """Summarize the samples of a run
+
+    Args:
+        samples: Samples of the run.
+        elapsed: Wall time of the run in seconds.
+
+    Returns:
+        Request count, throughput of successful requests, latency
+        percentiles in milliseconds, counts by status and the error rate.
+    """
+    latencies = [sample.latency * 1000 for sample in samples]
+    statuses: Dict[str, int] = {}
+    for sample in samples:
+        statuses[sample.status] = statuses.get(sample.status, 0) + 1
+    ok = sum(n for status, n in statuses.items() if status.startswith("2"))
+    return {
+        "requests": len(samples),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies, default=0.0), 2),
+        },
+        "status": dict(sorted(statuses.items())),
+        "error_rate": (
+            round(1 - ok / len(samples), 4) if samples else 0.0
+        ),
+    }
+
+
+def _read_stat(pid: int) -> Optional[Tuple[int, float]]:
+    """Return the parent pid and CPU seconds of a process from /proc."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+            # the command name may contain spaces, fields follow its ")"
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    return int(fields[1]), (int(fields[11]) + int(fields[12])) / ticks
+
+
+def _role(pid: int, root: int) -> str:
+    """Name the role of a server process from its command line."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            cmdline = f.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        cmdline = ""
+    if pid == root:
+        return "main"
+    if "resource_tracker" in cmdline:
+        return "tracker"
+    if "multiprocessing" in cmdline:
+        return "render"
+    return "worker"
+
+
+def cpu_times(root: int) -> Dict[int, Tuple[str, float]]:
+    """Return the role and CPU seconds of ``root`` and its descendants
+
+    CPU times are read from /proc, so the result is empty elsewhere than
+    on Linux.
+    """
+    if not os.path.isdir("/proc"):
+        return {}
+    stats = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            stat = _read_stat(int(entry))
+            if stat is not None:
+                stats[int(entry)] = stat
+    tree = {root}
+    # parents may be listed after their children, grow until stable
+    while True:
+        grown = {
+            pid for pid, (ppid, _) in stats.items()
+            if ppid in tree and pid not in tree
+        }
+        if not grown:
+            break
+        tree |= grown
+    return {
+        pid: (_role(pid, root), stats[pid][1])
+        for pid in sorted(tree) if pid in stats
+    }
+
+
+def cpu_report(
+    before: Dict[int, Tuple[str, float]],
+    after: Dict[int, Tuple[str, float]],
+    elapsed: float,
+) -> List[Dict[str, Any]]:
+    """Return the CPU used by every process during a run."""
+    report = []
+    for pid, (role, seconds) in after.items():
+        used = seconds - before.get(pid, (role, 0.0))[1]
+        report.append({
+            "pid": pid,
+            "role": role,
+            "cpu_s": round(used, 3),
+            "cpu_percent": round(100 * used / elapsed, 1) if elapsed else 0.0,
+        })
+    return report
+
+
+@asynccontextmanager
+async def inprocess_target() -> AsyncIterator[Tuple[httpx.AsyncClient, int]]:
+    """Run the app in this process and yield a client and the root pid."""
+    # pylint: disable=import-outside-toplevel
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=None
+        ) as client:
+            yield client, os.getpid()
+
+
+@asynccontextmanager
+async def server_target(
+    workers: int,
+    render_workers: Optional[int],
+    env: Dict[str, str],
+    timeout: float,
+    startup_timeout: float = 60.0,
+) -> AsyncIterator[Tuple[httpx.AsyncClient, int]]:
+    """Start gunicorn on a unix socket and yield a client and its pid
+
+    Args:
+        workers: Number of web workers.
+        render_workers: Render processes per web worker.
+        env: Additional environment of the server.
+        timeout: Timeout of each request in seconds.
+        startup_timeout: Seconds to wait for the server to become ready.
+    """
+    socket_dir = tempfile.mkdtemp(prefix="resume-loadtest-")
+    socket_path = os.path.join(socket_dir, "app.sock")
+    server_env = {
+        **os.environ,
+        "BIND": f"unix:{socket_path}",
+        "WEB_CONCURRENCY": str(workers),
+        **env,
+    }
+    if render_workers:
+        server_env["RENDER_WORKERS"] = str(render_workers)
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "app.main:app"],
+        cwd=REPO_ROOT, env=server_env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    transport = httpx.AsyncHTTPTransport(uds=socket_path)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=timeout
+        ) as client:
+            deadline = perf_counter() + startup_timeout
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(
+                        f"Server exited with code {process.returncode}"
+                    )
+                try:
+                    if (await client.get(READY_PATH)).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if perf_counter() > deadline:
+                    raise RuntimeError("Server did not become ready")
+                await asyncio.sleep(0.2)
+            yield client, process.pid
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        os.rmdir(socket_dir)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run a load test as configured by the command line arguments."""
+    if args.payloads:
+        requests: Iterator[Request] = itertools.cycle(
+            read_payloads(args.payloads)
+        )
+    else:
+        requests = synthetic_requests(
+            args.sizes.split(","), unique=not args.cache_hits
+        )
+    if args.target == "server":
+        env = dict(item.split("=", 1) for item in args.env)
+        target = server_target(
+            args.workers, args.render_workers, env, args.timeout
+        )
+    else:
+        target = inprocess_target()
+
+    async with target as (client, root):
+        if args.warmup:
+            await closed_loop(
+                client, requests, max(1, args.concurrency), args.warmup
+            )
+        before = cpu_times(root)
+        t0 = perf_counter()
+        if args.rate:
+            samples = await open_loop(
+                client, requests, args.rate, args.requests, args.duration,
+                args.poisson,
+            )
+        else:
+            samples = await closed_loop(
+                client, requests, args.concurrency, args.requests,
+                args.duration,
+            )
+        elapsed = perf_counter() - t0
+        after = cpu_times(root)
+
+    return {
+        "target": args.target,
+        "load": (
+            {"rate": args.rate, "poisson": args.poisson} if args.rate
+            else {"concurrency": args.concurrency}
+        ),
+        **summarize(samples, elapsed),
+        "cpu": cpu_report(before, after, elapsed),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of ``python -m benchmarks.loadtest``."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    parser.add_argument(
+        "--target", choices=("inprocess", "server"), default="inprocess"
+    )
+    parser.add_argument(
+        "--payloads", help="JSON Lines file of payloads or recorded requests"
+    )
+    parser.add_argument(
+        "--sizes", default="small,medium",
+        help="Synthetic resume sizes, used without --payloads",
+    )
+    parser.add_argument(
+        "--cache-hits", action="store_true",
+        help="Repeat synthetic resumes so renders can hit the cache",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4,
+        help="Concurrent clients of the closed loop",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=0.0,
+        help="Requests per second of an open loop, instead of --concurrency",
+    )
+    parser.add_argument("--poisson", action="store_true")
+    parser.add_argument("--requests", type=int, default=None)
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument(
+        "--warmup", type=int, default=10, help="Untimed requests sent first"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Web workers of the server"
+    )
+    parser.add_argument(
+        "--render-workers", type=int, default=None,
+        help="Render processes per web worker of the server",
+    )
+    parser.add_argument(
+        "--env", action="append", default=[], metavar="KEY=VALUE",
+        help="Environment variable of the server, may be repeated",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0,
+        help="Timeout of a server request in seconds",
+    )
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+    if args.rate < 0 or args.concurrency < 1:
+        parser.error("--rate must be positive and --concurrency at least 1")
+    unknown = set(args.sizes.split(",")) - set(SIZES)
+    if not args.payloads and unknown:
+        parser.error(f"Unknown sizes: {', '.join(sorted(unknown))}")
+    if any("=" not in item for item in args.env):
+        parser.error("--env takes KEY=VALUE")
+    logging.disable(logging.INFO)
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    latency = report["latency_ms"]
+    print(
+        f"{report['requests']} requests in {report['elapsed_s']:.2f}s: "
+        f"{report['throughput_rps']:.2f} req/s, "
+        f"error rate {report['error_rate']:.2%}"
+    )
+    print(
+        f"latency p50 {latency['p50']:.1f}ms  p95 {latency['p95']:.1f}ms  "
+        f"p99 {latency['p99']:.1f}ms  max {latency['max']:.1f}ms"
+    )
+    print("status " + "  ".join(
+        f"{status}: {count}" for status, count in report["status"].items()
+    ))
+    for process in report["cpu"]:
+        print(
+            f"cpu {process['role']:<7} pid {process['pid']:<7} "
+            f"{process['cpu_s']:8.2f}s {process['cpu_percent']:6.1f}%"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
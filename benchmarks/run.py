@@ -0,0 +1,421 @@
+"""Benchmark runner for the rendering pipeline.
+
+Times each stage of a render separately on synthetic resumes of growing
+size, writes the results as JSON and compares them against a stored
+baseline:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes small,large --iterations 50
+    python -m benchmarks.run --save-baseline
+    python -m benchmarks.run --scaling 3 --skip-endpoint
+
+Stages:
+    build_content: ``ResumeGenerator._build_content`` (flowable creation)
+    doc_build: ``doc.build`` on prebuilt content (layout and PDF output)
+    profile_<name>: ``doc.build`` with each PDF output profile, with the
+        size of the resulting PDF in ``bytes``
+    first_byte, first_byte_progressive: time from the start of a render
+        until its first bytes are written, for regular and progressive
+        output, with the largest piece handed over at once in
+        ``buffered_bytes``
+    endpoint: ``POST /resume/generate`` end to end through the ASGI app,
+        with the render cache cleared before every request
+
+With ``--scaling``, ``doc.build`` is also timed on resumes of 1 to 50
+pages grown in one dimension at a time: more entries, more bullets in one
+entry, or more skills in one category, i.e. a single paragraph spanning
+pages. Each shape reports the time per page at every length and the
+``growth`` of the largest over the smallest, about 1 when the layout time
+grows linearly with the length.
+
+Memory peaks come from a separate tracemalloc pass so tracing overhead does
+not skew the timings. The endpoint peak only covers the API process, not
+the render executor workers.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import config as c
+from app.models.resume import ResumeData
+from app.services.document import build_document
+from app.services.generator import ResumeGenerator
+from app.services.profiles import PROFILES
+from app.services.progressive import ChunkWriter
+from app.services.style import get_style
+from app.services.utils import percentile
+from benchmarks.synthetic import SIZES, make_resume
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+Stats = Dict[str, float]
+
+# Resume shapes of the scaling benchmark: synthetic resume arguments and
+# the argument grown with the length, with roughly how much of it fills a
+# page
+SCALING_SHAPES = {
+    "entries": ({}, "jobs", 7),
+    "bullets": ({"jobs": 1}, "bullets", 40),
+    "skills": ({"jobs": 1, "skill_categories": 1}, "skills_per_category", 500),
+}
+SCALING_PAGES = (1, 10, 25, 50)
+
+
+def measure(
+    func: Callable[[Any], Any],
+    iterations: int,
+    warmup: int = 1,
+    setup: Callable[[], Any] = lambda: None,
+) -> Stats:
+    """Time ``func`` and record its peak traced memory
+
+    Args:
+        func: Callable to time, called with the result of ``setup``.
+        iterations: Number of timed runs.
+        warmup: Number of untimed runs before timing.
+        setup: Untimed callable run before every call of ``func``.
+
+    Returns:
+        Timing percentiles in milliseconds and the peak memory in KiB.
+    """
+    def timed() -> float:
+        arg = setup()
+        t0 = perf_counter()
+        func(arg)
+        return (perf_counter() - t0) * 1000
+
+    for _ in range(warmup):
+        timed()
+    samples = [timed() for _ in range(iterations)]
+    return summarize(samples, traced_peak(func, setup()))
+
+
+def traced_peak(func: Callable[[Any], Any], arg: Any) -> int:
+    """Return the peak memory traced while ``func(arg)`` runs."""
+    tracemalloc.start()
+    try:
+        func(arg)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(samples: List[float], peak: int) -> Stats:
+    """Return the percentiles of samples in ms and the peak memory in KiB."""
+    return {
+        "iterations": len(samples),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def bench_stages(
+    resume: Dict[str, Any], iterations: int, warmup: int
+) -> Dict[str, Stats]:
+    """Benchmark content building and document layout for one resume."""
+    generator = ResumeGenerator(style=get_style())
+    data = build_document(ResumeData(**resume), get_style())
+
+    def build_pdf(content: List):
+        generator.create_document(BytesIO()).build(content)
+
+    # pylint: disable=protected-access
+    return {
+        "build_content": measure(
+            lambda _: generator._build_content(data), iterations, warmup
+        ),
+        "doc_build": measure(
+            build_pdf, iterations, warmup,
+            setup=lambda: generator._build_content(data),
+        ),
+    }
+
+
+def bench_profiles(
+    resume: Dict[str, Any], iterations: int, warmup: int
+) -> Dict[str, Stats]:
+    """Benchmark document layout and output size per output profile."""
+    data = build_document(ResumeData(**resume), get_style())
+    results = {}
+    for name, profile in PROFILES.items():
+        generator = ResumeGenerator(style=get_style(), profile=profile)
+
+        def build_pdf(content: List, generator=generator):
+            generator.create_document(BytesIO()).build(content)
+
+        # pylint: disable=protected-access
+        stats = measure(
+            build_pdf, iterations, warmup,
+            setup=lambda generator=generator: generator._build_content(data),
+        )
+        stats["bytes"] = len(generator.generate_pdf_bytes(data))
+        results[f"profile_{name}"] = stats
+    return results
+
+
+class _FirstWrite:
+    """Output stream timing its first write and keeping its largest."""
+    def __init__(self):
+        self.started = perf_counter()
+        self.first_ms: Optional[float] = None
+        self.largest = 0
+
+    def write(self, data) -> int:
+        if self.first_ms is None:
+            self.first_ms = (perf_counter() - self.started) * 1000
+        self.largest = max(self.largest, len(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing to flush."""
+
+
+def bench_first_byte(
+    resume: Dict[str, Any], iterations: int, warmup: int
+) -> Dict[str, Stats]:
+    """Benchmark the time to first byte of regular and progressive output
+
+    Progressive output goes through the chunk writer of streamed renders,
+    so ``buffered_bytes`` is the largest chunk sent to the response, where
+    regular output hands over the whole PDF.
+    """
+    generator = ResumeGenerator(style=get_style())
+    data = build_document(ResumeData(**resume), get_style())
+    results = {}
+    for stage, progressive in (
+        ("first_byte", False), ("first_byte_progressive", True)
+    ):
+        def render(sink: _FirstWrite, progressive=progressive) -> None:
+            output = sink
+            if progressive:
+                output = ChunkWriter(sink.write, c.STREAM_CHUNK_SIZE)
+            generator.generate_pdf(data, output, progressive)
+            output.flush()
+
+        samples = []
+        largest = 0
+        for i in range(warmup + iterations):
+            sink = _FirstWrite()
+            render(sink)
+            largest = max(largest, sink.largest)
+            if i >= warmup:
+                samples.append(sink.first_ms)
+        stats = summarize(samples, traced_peak(render, _FirstWrite()))
+        stats["buffered_bytes"] = largest
+        results[stage] = stats
+    return results
+
+
+def bench_scaling(
+    iterations: int, warmup: int, pages: Tuple[int, ...] = SCALING_PAGES
+) -> Dict[str, Dict[str, Any]]:
+    """Benchmark the layout time per page of growing resumes
+
+    Args:
+        iterations: Number of timed runs per length.
+        warmup: Number of untimed runs per length.
+        pages: Approximate page counts of the resumes of each shape.
+
+    Returns:
+        Per shape, the stats of every length with its page count and time
+        per page, and the growth of the time per page.
+    """
+    generator = ResumeGenerator(style=get_style())
+    results = {}
+    for shape, (base, grown, per_page) in SCALING_SHAPES.items():
+        lengths = []
+        for target in pages:
+            resume = make_resume(**base, **{grown: target * per_page})
+            data = build_document(ResumeData(**resume), get_style())
+            doc = generator.create_document(BytesIO())
+
+            def build_pdf(content: List, doc=doc):
+                doc.build(content)
+
+            # pylint: disable=protected-access
+            stats = measure(
+                build_pdf, iterations, warmup,
+                setup=lambda data=data: generator._build_content(data),
+            )
+            stats["pages"] = doc.page
+            stats["ms_per_page"] = round(stats["p50_ms"] / doc.page, 3)
+            lengths.append(stats)
+        results[shape] = {
+            "lengths": lengths,
+            "growth": round(
+                lengths[-1]["ms_per_page"] / lengths[0]["ms_per_page"], 2
+            ),
+        }
+    return results
+
+
+def bench_endpoint(
+    resumes: Dict[str, Dict[str, Any]], iterations: int, warmup: int
+) -> Dict[str, Stats]:
+    """Benchmark the generate endpoint for each resume size."""
+    # pylint: disable=import-outside-toplevel
+    from fastapi.testclient import TestClient
+
+    from app.core.config import config as c
+    from app.main import app
+    from app.services.cache import render_cache
+
+    url = f"{c.API_PREFIX}/v1/resume/generate"
+    results = {}
+    with TestClient(app) as client:
+        for size, resume in resumes.items():
+            def post(_, payload=resume):
+                render_cache.clear()
+                response = client.post(url, json=payload)
+                response.raise_for_status()
+            results[size] = measure(post, iterations, warmup)
+    return results
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Compare p50 timings against a baseline
+
+    Args:
+        results: Results of the current run.
+        baseline: Results of a previous run.
+        threshold: Allowed relative slowdown, e.g. 0.25 for 25%.
+
+    Returns:
+        One message per stage slower than the baseline plus threshold.
+    """
+    regressions = []
+    for size, stages in results["cases"].items():
+        for stage, stats in stages.items():
+            previous = baseline.get("cases", {}).get(size, {}).get(stage)
+            if not previous or not previous.get("p50_ms"):
+                continue
+            ratio = stats["p50_ms"] / previous["p50_ms"]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{size}/{stage}: p50 {stats['p50_ms']:.2f}ms vs "
+                    f"baseline {previous['p50_ms']:.2f}ms (x{ratio:.2f})"
+                )
+    return regressions
+
+
+def run(
+    sizes: List[str], iterations: int, warmup: int, endpoint: bool = True,
+    scaling: int = 0,
+) -> Dict[str, Any]:
+    """Run every benchmark and return the results document."""
+    resumes = {size: make_resume(**SIZES[size]) for size in sizes}
+    cases: Dict[str, Dict[str, Stats]] = {
+        size: {
+            **bench_stages(resume, iterations, warmup),
+            **bench_profiles(resume, iterations, warmup),
+            **bench_first_byte(resume, iterations, warmup),
+        }
+        for size, resume in resumes.items()
+    }
+    if endpoint:
+        for size, stats in bench_endpoint(
+            resumes, iterations, warmup
+        ).items():
+            cases[size]["endpoint"] = stats
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "sizes": {size: SIZES[size] for size in sizes},
+        "cases": cases,
+    }
+    if scaling:
+        results["scaling"] = bench_scaling(scaling, warmup=1)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of ``python -m benchmarks.run``."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--sizes", default=",".join(SIZES))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument(
+        "--threshold", type=float, default=0.25,
+        help="Allowed relative p50 slowdown before failing",
+    )
+    parser.add_argument("--skip-endpoint", action="store_true")
+    parser.add_argument(
+        "--scaling", type=int, default=0, metavar="ITERATIONS",
+        help="Also time 1 to 50 page resumes, with this many iterations",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true",
+        help="Store the results as the new baseline",
+    )
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = set(sizes) - set(SIZES)
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(sorted(unknown))}")
+
+    results = run(
+        sizes, args.iterations, args.warmup, not args.skip_endpoint,
+        args.scaling,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for size, stages in results["cases"].items():
+        for stage, stats in stages.items():
+            line = (
+                f"{size:<8} {stage:<18} p50 {stats['p50_ms']:9.2f}ms  "
+                f"p95 {stats['p95_ms']:9.2f}ms  p99 {stats['p99_ms']:9.2f}ms  "
+                f"peak {stats['peak_kib']:9.1f}KiB"
+            )
+            if "bytes" in stats:
+                line += f"  size {stats['bytes']:8d}B"
+            if "buffered_bytes" in stats:
+                line += f"  buffered {stats['buffered_bytes']:8d}B"
+            print(line)
+    for shape, scaling in results.get("scaling", {}).items():
+        for stats in scaling["lengths"]:
+            print(
+                f"{shape:<8} {stats['pages']:3d} pages          "
+                f"p50 {stats['p50_ms']:9.2f}ms  "
+                f"per page {stats['ms_per_page']:7.2f}ms"
+            )
+        print(f"{shape:<8} growth of the time per page x{scaling['growth']}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
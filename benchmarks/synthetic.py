@@ -0,0 +1,84 @@
+"""Synthetic resumes of configurable size.
+
+Resumes are derived from ``data/sample_resume.json`` by cycling through its
+jobs, bullets and skills, so text length and markup stay realistic while the
+number of entries scales freely.
+"""
+import copy
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "data" / "sample_resume.json"
+
+
+@lru_cache(maxsize=1)
+def load_sample() -> Dict[str, Any]:
+    """Load the sample resume the synthetic resumes are built from."""
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_resume(
+    jobs: int = 3,
+    bullets: int = 4,
+    skill_categories: int = 4,
+    skills_per_category: int = 8,
+    education: int = 3,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Build a synthetic resume payload
+
+    Args:
+        jobs: Number of experience entries.
+        bullets: Number of description bullets per job.
+        skill_categories: Number of skill categories.
+        skills_per_category: Number of skills in each category.
+        education: Number of education entries.
+        seed: Varies the name so otherwise equal resumes hash differently.
+
+    Returns:
+        A payload accepted by ``ResumeData``.
+    """
+    sample = load_sample()
+    resume = copy.deepcopy(sample)
+    resume["name"] = f"{sample['name']} {seed}" if seed else sample["name"]
+
+    sample_jobs = sample["experience"]
+    sample_bullets = [b for job in sample_jobs for b in job["description"]]
+    resume["experience"] = [
+        {
+            **sample_jobs[i % len(sample_jobs)],
+            "title": f"{sample_jobs[i % len(sample_jobs)]['title']} {i + 1}",
+            "description": [
+                sample_bullets[(i + j) % len(sample_bullets)]
+                for j in range(bullets)
+            ],
+        }
+        for i in range(jobs)
+    ]
+
+    sample_skills = [s for skills in sample["skills"].values() for s in skills]
+    categories = list(sample["skills"])
+    resume["skills"] = {
+        f"{categories[i % len(categories)]} {i + 1}": [
+            sample_skills[(i + j) % len(sample_skills)]
+            for j in range(skills_per_category)
+        ]
+        for i in range(skill_categories)
+    }
+
+    sample_education = sample["education"]
+    resume["education"] = [
+        sample_education[i % len(sample_education)] for i in range(education)
+    ]
+    return resume
+
+
+# Named sizes used by the benchmark runner
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"jobs": 3, "bullets": 4, "skill_categories": 4},
+    "medium": {"jobs": 10, "bullets": 6, "skill_categories": 8},
+    "large": {"jobs": 30, "bullets": 8, "skill_categories": 12},
+}
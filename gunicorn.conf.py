@@ -0,0 +1,58 @@
+"""Gunicorn configuration.
+
+The app is imported once in the master process (``preload_app``) and the
+master warms it up before forking, so every worker starts with the modules
+imported, the fonts registered and the styles built. Each worker then
+warms up its render executor during the app startup, before it accepts
+connections.
+
+Settings can be overridden with the environment variables below.
+"""
+import os
+from time import perf_counter
+
+_STARTED = perf_counter()
+
+bind = os.getenv("BIND", "0.0.0.0:7070")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+# the app divides the CPUs between the workers by WEB_CONCURRENCY
+os.environ["WEB_CONCURRENCY"] = str(workers)
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD_APP", "true").lower() in ("1", "true", "yes")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+
+def on_starting(server):
+    """Warm up the preloaded app in the master before workers fork."""
+    server.log.info(
+        "Configuration loaded in %.2fs%s", perf_counter() - _STARTED,
+        ", app preloaded" if server.cfg.preload_app else "",
+    )
+    if not server.cfg.preload_app:
+        return
+    # pylint: disable=import-outside-toplevel
+    from app.services.warmup import warm_up_process
+    server.log.info("Master warmed up in %.2fs", warm_up_process())
+
+
+def when_ready(server):
+    """Log the time until the master accepts connections."""
+    server.log.info("Master ready in %.2fs", perf_counter() - _STARTED)
+
+
+def post_fork(server, worker):
+    """Log the time until a worker is forked."""
+    server.log.info(
+        "Worker %s forked %.2fs after start", worker.pid,
+        perf_counter() - _STARTED,
+    )
+
+
+def post_worker_init(worker):
+    """Log the time until a worker starts the app."""
+    worker.log.info(
+        "Worker %s starting the app %.2fs after start", worker.pid,
+        perf_counter() - _STARTED,
+    )
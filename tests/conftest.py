@@ -0,0 +1,28 @@
+"""Shared test fixtures."""
+import copy
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.resume import ResumeData
+
+
+@pytest.fixture
+def resume_data():
+    """Example resume payload taken from the ResumeData schema."""
+    example = ResumeData.model_config["json_schema_extra"]["examples"][0]
+    return copy.deepcopy(example)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Client of the app with thread render workers and an empty cache."""
+    # pylint: disable-next=import-outside-toplevel
+    from app.main import app
+    # pylint: disable-next=import-outside-toplevel
+    from app.services import cache, executor
+
+    monkeypatch.setattr(executor.render_executor, "kind", "thread")
+    cache.render_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client
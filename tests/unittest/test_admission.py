@@ -0,0 +1,82 @@
+"""Unit tests for app.services.admission module."""
+import asyncio
+
+import pytest
+
+from app.core.exceptions import LoadSheddingException, RateLimitException
+from app.services.admission import (
+    ADMISSIONS, AdmissionController, RateLimiter
+)
+
+
+def test_slots_are_handed_to_waiters_in_order():
+    """Test that waiting requests get freed slots first come first served."""
+    controller = AdmissionController(max_concurrency=1, max_queue=2,
+                                     max_wait=1)
+    order = []
+
+    async def render(name):
+        async with controller.slot():
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(render("a"), render("b"), render("c"))
+
+    asyncio.run(scenario())
+    assert order == ["a", "b", "c"]
+    assert controller.active == controller.waiting == 0
+
+
+def test_full_queue_is_shed():
+    """Test that requests beyond concurrency and queue are shed at once."""
+    controller = AdmissionController(max_concurrency=1, max_queue=1,
+                                     max_wait=1)
+    shed = ADMISSIONS.value("shed", "queue_full")
+
+    async def scenario():
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(LoadSheddingException) as exc_info:
+            await controller.acquire()
+        controller.release()
+        await waiter
+        return exc_info.value
+
+    exc = asyncio.run(scenario())
+    assert exc.retry_after >= 1
+    assert ADMISSIONS.value("shed", "queue_full") == shed + 1
+    assert controller.active == 1
+
+
+def test_queue_wait_deadline():
+    """Test that a request waiting past the deadline is shed."""
+    controller = AdmissionController(max_concurrency=1, max_queue=4,
+                                     max_wait=0.01)
+
+    async def scenario():
+        await controller.acquire()
+        with pytest.raises(LoadSheddingException):
+            await controller.acquire()
+        # a slow render makes the expected wait exceed the deadline
+        controller.release(held=1.0)
+        await controller.acquire()
+        with pytest.raises(LoadSheddingException, match="deadline"):
+            await controller.acquire()
+
+    asyncio.run(scenario())
+    assert controller.waiting == 0
+
+
+def test_rate_limiter_token_bucket():
+    """Test that a client is limited once its burst is used up."""
+    limiter = RateLimiter(rate=1, burst=2)
+    limiter.check("a")
+    limiter.check("a")
+    with pytest.raises(RateLimitException) as exc_info:
+        limiter.check("a")
+    limiter.check("b")
+
+    assert exc_info.value.retry_after == 1
+    RateLimiter(rate=0, burst=1).check("a")
@@ -0,0 +1,57 @@
+"""Unit tests for app.services.batch module."""
+import asyncio
+import io
+import json
+import zipfile
+
+from app.services.batch import MANIFEST_NAME, stream_batch_zip
+from app.services.executor import RenderExecutor
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def test_stream_batch_zip(resume_data):
+    """Test that the batch is streamed as a ZIP with a manifest."""
+    items = [resume_data, {"name": "Invalid"}, dict(resume_data, name="Jo")]
+    executor = RenderExecutor(kind="thread", max_workers=2)
+    try:
+        chunks = asyncio.run(
+            _collect(stream_batch_zip(items, "default", executor))
+        )
+    finally:
+        executor.shutdown()
+
+    assert len(chunks) > 1
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+
+    manifest = json.loads(archive.read(MANIFEST_NAME))
+    assert manifest["total"] == 3
+    assert manifest["succeeded"] == 2
+    assert [e["status"] for e in manifest["items"]] == [
+        "ok", "invalid", "ok"
+    ]
+    for entry in manifest["items"]:
+        if entry["status"] == "ok":
+            pdf = archive.read(entry["file"])
+            assert pdf.startswith(b"%PDF-")
+            assert len(pdf) == entry["bytes"]
+
+
+def test_stream_batch_zip_file_names(resume_data):
+    """Test that names with path separators stay flat archive entries."""
+    items = [dict(resume_data, name="A/B"), dict(resume_data, name="../x")]
+    executor = RenderExecutor(kind="thread", max_workers=2)
+    try:
+        chunks = asyncio.run(
+            _collect(stream_batch_zip(items, "default", executor))
+        )
+    finally:
+        executor.shutdown()
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert sorted(archive.namelist()) == [
+        "0000_a_b.pdf", "0001____x.pdf", MANIFEST_NAME
+    ]
@@ -0,0 +1,128 @@
+"""Unit tests for the benchmarks package."""
+import asyncio
+import itertools
+import json
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.models.resume import ResumeData
+from benchmarks.loadtest import (
+    GENERATE_PATH, Request, Sample, closed_loop, cpu_times, open_loop,
+    read_payloads, summarize,
+)
+from benchmarks.run import bench_first_byte, bench_scaling, compare
+from benchmarks.synthetic import make_resume
+
+
+def test_make_resume_scales():
+    """Test that synthetic resumes have the requested size and validate."""
+    resume = make_resume(jobs=12, bullets=7, skill_categories=9, seed=3)
+    data = ResumeData(**resume)
+
+    assert len(data.experience) == 12
+    assert all(len(job.description) == 7 for job in data.experience)
+    assert len(data.skills) == 9
+    assert data.name.endswith(" 3")
+
+
+def test_compare_flags_regressions():
+    """Test that slowdowns beyond the threshold are reported."""
+    baseline = {"cases": {"small": {"doc_build": {"p50_ms": 10.0}}}}
+    slower = {"cases": {"small": {"doc_build": {"p50_ms": 13.0}}}}
+    faster = {"cases": {"small": {"doc_build": {"p50_ms": 9.0}}}}
+
+    assert len(compare(slower, baseline, threshold=0.25)) == 1
+    assert not compare(slower, baseline, threshold=0.5)
+    assert not compare(faster, baseline, threshold=0.25)
+
+
+def test_read_payloads(tmp_path):
+    """Test that payload lines and recorded requests are both replayed."""
+    path = tmp_path / "payloads.jsonl"
+    path.write_text(
+        json.dumps({"name": "A"}) + "\n\n"
+        + json.dumps({
+            "path": "/preview", "params": {"format": "text"},
+            "body": {"name": "B"},
+        }) + "\n",
+        encoding="utf-8",
+    )
+
+    first, second = read_payloads(str(path))
+
+    assert first == Request(GENERATE_PATH, {}, b'{"name": "A"}')
+    assert second == Request("/preview", {"format": "text"}, b'{"name": "B"}')
+
+
+def test_summarize():
+    """Test throughput, percentiles and error rate of a run."""
+    samples = [Sample(0.01 * i, "200") for i in range(1, 10)]
+    samples.append(Sample(1.0, "503"))
+
+    report = summarize(samples, elapsed=2.0)
+
+    assert report["requests"] == 10
+    assert report["throughput_rps"] == 4.5
+    assert report["latency_ms"]["p50"] == 55.0
+    assert report["latency_ms"]["max"] == 1000.0
+    assert report["status"] == {"200": 9, "503": 1}
+    assert report["error_rate"] == 0.1
+
+
+def test_load_loops():
+    """Test that the closed and open loops send every request."""
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo():
+        return {}
+
+    requests = itertools.repeat(Request("/echo", {}, b"{}"))
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            closed = await closed_loop(client, requests, 3, count=10)
+            opened = await open_loop(client, requests, 200.0, count=10)
+        return closed, opened
+
+    closed, opened = asyncio.run(run())
+
+    assert [sample.status for sample in closed] == ["200"] * 10
+    assert [sample.status for sample in opened] == ["200"] * 10
+
+
+def test_cpu_times():
+    """Test that the CPU time of this process is accounted."""
+    times = cpu_times(os.getpid())
+
+    assert times[os.getpid()][0] == "main"
+    assert times[os.getpid()][1] > 0
+
+
+def test_bench_first_byte():
+    """Test that progressive output hands over pages before the whole PDF."""
+    results = bench_first_byte(make_resume(jobs=12), iterations=2, warmup=0)
+
+    regular = results["first_byte"]
+    progressive = results["first_byte_progressive"]
+    assert regular["iterations"] == progressive["iterations"] == 2
+    assert progressive["buffered_bytes"] < regular["buffered_bytes"]
+
+
+def test_bench_scaling():
+    """Test that every shape reports its time per page by length."""
+    results = bench_scaling(iterations=1, warmup=0, pages=(1, 3))
+
+    assert set(results) == {"entries", "bullets", "skills"}
+    for scaling in results.values():
+        short, longer = scaling["lengths"]
+        assert short["pages"] < longer["pages"]
+        assert longer["ms_per_page"] == pytest.approx(
+            longer["p50_ms"] / longer["pages"], abs=0.001
+        )
+        assert scaling["growth"] > 0
@@ -0,0 +1,63 @@
+"""Unit tests for app.api.v1.body module."""
+import asyncio
+import json
+
+import pytest
+from fastapi.exceptions import RequestValidationError
+from starlette.requests import Request
+
+from app.api.v1.body import json_body, parse_body, read_body
+from app.core.exceptions import PayloadTooLargeException
+from app.models.resume import ResumeData
+
+
+def _request(chunks, headers=()):
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True}
+        for chunk in chunks
+    ] + [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+    }
+    return Request(scope, receive)
+
+
+def test_read_body_limits_size():
+    """Test that bodies over the limit are rejected while reading."""
+    assert asyncio.run(read_body(_request([b"ab", b"cd"]), 4)) == b"abcd"
+    with pytest.raises(PayloadTooLargeException):
+        asyncio.run(read_body(_request([b"ab", b"cde"]), 4))
+    with pytest.raises(PayloadTooLargeException):
+        asyncio.run(read_body(
+            _request([], headers=[("content-length", "5")]), 4
+        ))
+
+
+def test_parse_body(resume_data):
+    """Test that JSON bodies are validated like FastAPI body parameters."""
+    data = parse_body(ResumeData, json.dumps(resume_data).encode())
+    assert data == ResumeData(**resume_data)
+
+    del resume_data["name"]
+    with pytest.raises(RequestValidationError) as exc_info:
+        parse_body(ResumeData, json.dumps(resume_data).encode())
+    assert exc_info.value.errors()[0]["loc"] == ("body", "name")
+
+    with pytest.raises(RequestValidationError):
+        parse_body(ResumeData, b"{")
+
+
+def test_json_body_inlines_nested_models():
+    """Test that the documented body schema has no dangling refs."""
+    schema = json_body(ResumeData)["requestBody"]["content"][
+        "application/json"]["schema"]
+
+    assert "$ref" not in json.dumps(schema)
+    assert schema["properties"]["experience"]["items"]["properties"][
+        "company"]["type"] == "string"
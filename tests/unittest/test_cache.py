@@ -0,0 +1,169 @@
+"""Unit tests for app.services.cache module."""
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from app.models.resume import ResumeData
+from app.services.cache import (
+    DiskRenderCache, RenderCache, create_render_cache, render_key,
+)
+from app.services.style import Style
+
+
+def test_lru_eviction_by_bytes():
+    """Test that the least recently used entries are evicted first."""
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+
+    cache.put("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"1234"
+    assert cache.size == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_hit_miss_counters():
+    """Test that hits and misses are counted."""
+    cache = RenderCache(max_bytes=100)
+    cache.get("missing")
+    cache.put("key", b"pdf")
+    cache.get("key")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_oversized_value_not_cached():
+    """Test that values over the byte budget are skipped."""
+    cache = RenderCache(max_bytes=2)
+    cache.put("key", b"pdf")
+    assert len(cache) == 0
+
+
+def test_render_key(resume_data):
+    """Test that the key depends on the data, style and profile."""
+    data = ResumeData(**resume_data)
+    same = ResumeData(**resume_data)
+    other = ResumeData(**{**resume_data, "title": "Other"})
+
+    assert render_key(data, Style()) == render_key(same, Style())
+    assert render_key(data, Style()) != render_key(other, Style())
+    assert render_key(data, Style()) != render_key(
+        data, Style(default_font_size=11)
+    )
+    assert render_key(data, Style()) != render_key(data, Style(), "fast")
+    assert render_key(data, Style()) != render_key(
+        data, Style(), "balanced", fit=True
+    )
+
+
+def test_disk_cache_shared_between_instances(tmp_path):
+    """Test that caches on one directory, as in two workers, share PDFs."""
+    first = DiskRenderCache(str(tmp_path), max_bytes=100)
+    second = DiskRenderCache(str(tmp_path), max_bytes=100)
+
+    first.put("key", b"%PDF-1")
+
+    assert second.get("key") == b"%PDF-1"
+    assert bytes(second.view("key")) == b"%PDF-1"
+    assert second.get("missing") is None
+    assert second.stats() == {
+        "kind": "disk", "entries": 1, "bytes": 6, "max_bytes": 100,
+        "hits": 2, "misses": 1, "evictions": 0,
+    }
+    # the PDF is renamed into place, no temporary file is left behind
+    assert os.path.exists(tmp_path / "key.pdf")
+    assert not [name for name in os.listdir(tmp_path)
+                if name.endswith(".tmp")]
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """Test that the oldest entries are evicted past the byte budget."""
+    cache = DiskRenderCache(str(tmp_path), max_bytes=10)
+    cache._TOUCH_INTERVAL = 0  # pylint: disable=protected-access
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    view = cache.view("a")
+
+    cache.put("c", b"1234")
+
+    assert cache.get("b") is None
+    assert not os.path.exists(tmp_path / "b.pdf")
+    assert cache.get("a") == b"1234" and cache.get("c") == b"1234"
+    assert cache.size == 8 and len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+    # a mapped PDF stays readable after its eviction
+    cache.put("d", b"123456")
+    assert not os.path.exists(tmp_path / "a.pdf")
+    assert bytes(view) == b"1234"
+
+    cache.put("huge", b"x" * 11)
+    assert cache.get("huge") is None
+
+
+def test_disk_cache_forgets_missing_files(tmp_path):
+    """Test that an entry whose file was removed is a miss and dropped."""
+    cache = DiskRenderCache(str(tmp_path), max_bytes=100)
+    cache.put("key", b"pdf")
+    os.unlink(tmp_path / "key.pdf")
+
+    assert cache.view("key") is None
+    assert len(cache) == 0
+
+    cache.put("key", b"pdf")
+    cache.clear()
+    assert len(cache) == 0 and not os.path.exists(tmp_path / "key.pdf")
+
+
+def test_create_render_cache(tmp_path):
+    """Test that render caches are created by kind."""
+    assert isinstance(create_render_cache("memory", "", 1), RenderCache)
+    assert isinstance(
+        create_render_cache("disk", str(tmp_path), 1), DiskRenderCache
+    )
+    with pytest.raises(ValueError):
+        create_render_cache("redis", "", 1)
+
+
+@pytest.mark.parametrize("kind", ["memory", "disk"])
+def test_async_access(tmp_path, kind):
+    """Test that both caches can be used from the event loop."""
+    cache = create_render_cache(kind, str(tmp_path), max_bytes=100)
+
+    async def run():
+        await cache.put_async("a", b"%PDF-a")
+        return await cache.get_async("a"), await cache.view_async("a")
+
+    value, view = asyncio.run(run())
+    assert value == b"%PDF-a" and bytes(view) == b"%PDF-a"
+    assert cache.stats()["hits"] == 2
+
+
+def test_disk_cache_waits_for_the_index_off_the_loop(tmp_path):
+    """Test that a locked index does not block the event loop."""
+    cache = DiskRenderCache(str(tmp_path), max_bytes=100)
+    other = sqlite3.connect(
+        os.path.join(tmp_path, "renders.sqlite3"), isolation_level=None
+    )
+
+    async def run():
+        # another process holds the write lock for a while, and releases
+        # it from the loop, which a blocking put would never reach
+        other.execute("BEGIN IMMEDIATE")
+        asyncio.get_running_loop().call_later(
+            0.2, other.execute, "COMMIT"
+        )
+        await cache.put_async("a", b"%PDF-a")
+
+    asyncio.run(run())
+    other.close()
+    assert cache.get("a") == b"%PDF-a"
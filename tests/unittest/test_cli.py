@@ -0,0 +1,47 @@
+"""Unit tests for app.cli module."""
+import io
+import json
+
+from app import cli
+
+
+def test_render_jsonl(resume_data, tmp_path):
+    """Test that valid lines are rendered and invalid ones reported."""
+    lines = [json.dumps(resume_data), "", json.dumps({"name": "Invalid"})]
+    stream = io.StringIO("\n".join(lines) + "\n")
+
+    report = cli.render(stream, str(tmp_path), workers=1, chunksize=1)
+
+    assert report["total"] == 2
+    assert report["ok"] == 1
+    assert report["invalid"] == 1
+    pdfs = list(tmp_path.glob("*.pdf"))
+    assert [p.name for p in pdfs] == ["000000_john_doe__ph_d_.pdf"]
+    assert pdfs[0].read_bytes().startswith(b"%PDF-")
+
+
+def test_render_keeps_files_in_output_dir(resume_data, tmp_path):
+    """Test that a name with a path separator is written in output_dir."""
+    output_dir = tmp_path / "out"
+    stream = io.StringIO(json.dumps(dict(resume_data, name="A/B")) + "\n")
+
+    report = cli.render(stream, str(output_dir), workers=1, chunksize=1)
+
+    assert report["ok"] == 1
+    assert [p.name for p in tmp_path.rglob("*.pdf")] == ["000000_a_b.pdf"]
+    assert (output_dir / "000000_a_b.pdf").exists()
+
+
+def test_main_exit_code(resume_data, tmp_path, monkeypatch, capsys):
+    """Test the command line entry point."""
+    input_path = tmp_path / "resumes.jsonl"
+    input_path.write_text(json.dumps(resume_data) + "\n", encoding="utf-8")
+    monkeypatch.setattr(cli, "setup_logging", lambda **kwargs: None)
+
+    code = cli.main([
+        "render", str(input_path), "-o", str(tmp_path / "out"),
+        "--workers", "1", "--json",
+    ])
+
+    assert code == 0
+    assert json.loads(capsys.readouterr().out)["ok"] == 1
@@ -39,3 +39,16 @@ def test_settings(monkeypatch):
     assert c.LOG_LEVEL == "DEBUG"
     assert c.LOG_USE_BASIC_FORMAT is False
     assert c.API_PREFIX == "/custom/api"
+
+
+def test_cpus_per_web_worker(monkeypatch):
+    """Test that the CPUs are divided between the web workers."""
+    monkeypatch.setattr(config.os, "cpu_count", lambda: 8)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert config.cpus_per_web_worker() == 8
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert config.cpus_per_web_worker() == 2
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "16")
+    assert config.cpus_per_web_worker() == 1
@@ -0,0 +1,65 @@
+"""Unit tests for app.services.document module."""
+import pickle
+
+from app.models.resume import ResumeData
+from app.services.document import Entry, Line, build_document
+from app.services.generator import ResumeGenerator
+from app.services.style import get_style
+
+
+def test_build_document_sections(resume_data):
+    """Test that sections follow the PDF order and hold the resume."""
+    document = build_document(ResumeData(**resume_data), get_style())
+
+    assert [section.title for section in document.sections] == [
+        "Professional Summary", "Skills", "Professional Experience",
+        "Education",
+    ]
+    skills = document.sections[1]
+    assert skills.lines[2] == Line(
+        "AWS, GCP, Azure ML, Kubernetes, Docker, Spark, Hadoop, Airflow",
+        "Cloud &amp; Big Data",
+    )
+    education = document.sections[3].entries[0]
+    assert education[:2] == ("Ph.D. in Artificial Intelligence", "2016")
+    assert education.lines[0] == Line("Stanford University")
+    assert document.bullet == "• "
+    assert document.contact == (
+        "john.doe@example.com | (123) 456-7890 | linkedin.com/in/johndoe"
+    )
+
+
+def test_build_document_skips_empty_sections(resume_data):
+    """Test that missing optional sections and descriptions are left out."""
+    resume_data.update(summary=None, education=None)
+    resume_data["experience"][0]["description"] = "Led the team"
+    document = build_document(ResumeData(**resume_data), get_style())
+
+    assert [section.title for section in document.sections] == [
+        "Skills", "Professional Experience",
+    ]
+    assert document.sections[1].entries[0] == Entry(
+        "Lead AI Consultant - Global AI Solutions", "Jan 2021 - Present",
+        lines=(Line("Led the team"),),
+    )
+
+
+def test_document_is_hashable_and_pickles(resume_data):
+    """Test that documents can key caches and cross process boundaries."""
+    document = build_document(ResumeData(**resume_data), get_style())
+    restored = pickle.loads(pickle.dumps(document))
+
+    assert restored == document
+    assert hash(restored) == hash(document)
+    assert type(restored.sections[2].entries[0]) is Entry
+
+
+def test_text_is_not_markup(resume_data):
+    """Test that field values are rendered as text, not parsed as markup."""
+    resume_data["summary"] = "R&D budgets <b>grew</b> > 5%"
+    document = build_document(ResumeData(**resume_data), get_style())
+    # pylint: disable=protected-access
+    content = ResumeGenerator(style=get_style())._build_content(document)
+
+    summary = [p for p in content if hasattr(p, "getPlainText")][4]
+    assert summary.getPlainText() == "R&D budgets <b>grew</b> > 5%"
@@ -0,0 +1,101 @@
+"""Unit tests for app.services.executor module."""
+import asyncio
+import os
+import threading
+from typing import Dict, NamedTuple
+
+import pytest
+
+from app.core.exceptions import RenderQueueFullException
+from app.services.executor import RenderExecutor
+
+
+def _add(a, b):
+    return a + b
+
+
+def test_run_returns_result():
+    """Test that run executes the function in the pool."""
+    executor = RenderExecutor(kind="thread", max_workers=2)
+    try:
+        assert asyncio.run(executor.run(_add, 1, b=2)) == 3
+        assert executor.in_flight == 0
+    finally:
+        executor.shutdown()
+
+
+def test_invalid_kind():
+    """Test that an unknown executor kind is rejected."""
+    with pytest.raises(ValueError):
+        RenderExecutor(kind="fiber")
+
+
+def test_queue_full_rejects_and_reports_depth():
+    """Test that tasks beyond workers + queue size are rejected."""
+    executor = RenderExecutor(kind="thread", max_workers=1, max_queue_size=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.create_task(executor.run(release.wait))
+        second = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        assert executor.in_flight == 2
+        assert executor.queue_depth == 1
+        with pytest.raises(RenderQueueFullException):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(first, second)
+
+    try:
+        asyncio.run(scenario())
+        assert executor.stats()["queue_depth"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+class _Reported(NamedTuple):
+    pid: int
+    memory: Dict[str, int]
+
+
+def _report_memory(rss: int) -> _Reported:
+    return _Reported(os.getpid(), {"rss_bytes": rss})
+
+
+def test_pool_recycled_past_worker_rss():
+    """Test that a worker reporting too much memory replaces the pool."""
+    executor = RenderExecutor(
+        kind="process", max_workers=1, start_method="spawn",
+        max_worker_rss_bytes=100,
+    )
+
+    async def scenario():
+        small = await executor.run(_report_memory, 10)
+        same = await executor.run(_report_memory, 200)
+        replaced = await executor.run(_report_memory, 10)
+        return small.pid, same.pid, replaced.pid
+
+    try:
+        first, second, third = asyncio.run(scenario())
+        assert first == second != third
+        assert executor.stats()["recycles"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_worker_replaced_after_max_tasks():
+    """Test that process workers are replaced after their task limit."""
+    executor = RenderExecutor(
+        kind="process", max_workers=1, start_method="spawn",
+        max_tasks_per_worker=1,
+    )
+
+    async def scenario():
+        return [(await executor.run(_report_memory, 0)).pid for _ in range(2)]
+
+    try:
+        first, second = asyncio.run(scenario())
+        assert first != second
+    finally:
+        executor.shutdown()
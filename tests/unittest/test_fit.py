@@ -0,0 +1,108 @@
+"""Unit tests for app.services.fit module."""
+from io import BytesIO
+
+import pytest
+
+from app.models.resume import ResumeData
+from app.services.document import build_document
+from app.services.fit import (
+    FRAME_HEIGHT, FRAME_WIDTH, _blocks, estimate_height, estimate_pages,
+    fit_to_page, line_count,
+)
+from app.services.generator import ResumeGenerator, render_pdf
+from app.services.style import get_style
+from benchmarks.synthetic import make_resume
+
+
+def _build(document, style):
+    """Build a PDF and return its page count."""
+    generator = ResumeGenerator(style=style)
+    doc = generator.create_document(BytesIO())
+    doc.build(generator._build_content(document))
+    return doc.page
+
+
+@pytest.mark.parametrize("theme", ["default", "compact", "unicode"])
+@pytest.mark.parametrize("scales", [(1.0, 1.0), (0.85, 0.5)])
+def test_blocks_match_flowables(resume_data, theme, scales):
+    """Test that estimated blocks match the wrapped flowables."""
+    resume_data["skills"]["R&D"] = ["A/B testing & <experiments>"] * 20
+    style = get_style(theme, font_scale=scales[0], spacing_scale=scales[1])
+    document = build_document(ResumeData(**resume_data), style)
+    content = ResumeGenerator(style=style)._build_content(document)
+    blocks = _blocks(document, style)
+
+    assert len(blocks) == len(content)
+    for flowable, (before, height, after) in zip(content, blocks):
+        assert flowable.wrap(FRAME_WIDTH, 10000)[1] == pytest.approx(height)
+        assert flowable.getSpaceBefore() == pytest.approx(before)
+        assert flowable.getSpaceAfter() == pytest.approx(after)
+
+
+def test_line_count():
+    """Test that lines break before words that would overflow."""
+    runs = (("word " * 10, "Helvetica"),)
+    word = 10 * 2.5  # "word" is 2.5 em wide in Helvetica
+    space = 10 * 0.278
+
+    assert line_count(runs, 10, (10 * word + 9 * space,) * 2) == 1
+    assert line_count(runs, 10, (5 * word + 4 * space,) * 2) == 2
+    assert line_count((("", "Helvetica"),), 10, (100, 100)) == 0
+    # a word wider than the line is split across lines
+    assert line_count((("w" * 100, "Helvetica"),), 10, (100, 100)) > 1
+
+
+@pytest.mark.parametrize("jobs", [3, 6, 12])
+def test_estimate_pages_matches_build(jobs):
+    """Test that the estimated page count is the built one."""
+    style = get_style()
+    document = build_document(
+        ResumeData(**make_resume(jobs=jobs)), style
+    )
+
+    assert estimate_pages(document, style) == _build(document, style)
+
+
+def test_fit_to_page(resume_data):
+    """Test that fitting shrinks spacing, then fonts, to one page."""
+    short = build_document(
+        ResumeData(**make_resume(jobs=1, education=1)), get_style()
+    )
+    assert fit_to_page(short) is get_style()
+
+    longer = build_document(ResumeData(**resume_data), get_style())
+    style = fit_to_page(longer)
+    assert estimate_height(longer, get_style()) > FRAME_HEIGHT
+    assert style.font_scale == 1.0 and style.spacing_scale < 1.0
+    assert estimate_height(longer, style) <= FRAME_HEIGHT
+    assert _build(longer, style) == 1
+    # the scales are the largest that fit
+    wider = get_style(spacing_scale=round(style.spacing_scale + 0.01, 2))
+    assert estimate_height(longer, wider) > FRAME_HEIGHT
+
+
+def test_fit_to_page_shrinks_fonts_and_stops_at_minimum():
+    """Test that fonts shrink when spacing is not enough."""
+    style = get_style()
+    document = build_document(
+        ResumeData(**make_resume(jobs=4, bullets=5)), style
+    )
+    fitted = fit_to_page(document)
+    assert fitted.font_scale < 1.0
+    assert _build(document, fitted) == 1
+
+    too_long = build_document(ResumeData(**make_resume(jobs=20)), style)
+    smallest = fit_to_page(too_long)
+    assert (smallest.font_scale, smallest.spacing_scale) == (0.8, 0.4)
+
+
+def test_render_pdf_fit():
+    """Test that render_pdf reports the fit stage and keeps the PDF valid."""
+    data = ResumeData(**make_resume(jobs=3))
+    document = build_document(data, get_style())
+
+    fitted = render_pdf(document, fit=True)
+    plain = render_pdf(document)
+
+    assert "fit" in fitted.timings and "fit" not in plain.timings
+    assert fitted.pdf.startswith(b"%PDF") and fitted.pdf != plain.pdf
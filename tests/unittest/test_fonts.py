@@ -0,0 +1,57 @@
+"""Unit tests for app.services.fonts module."""
+import shutil
+
+import pytest
+from reportlab.pdfbase import pdfmetrics
+
+from app.core.exceptions import UnknownStyleException
+from app.models.resume import ResumeData
+from app.services.fonts import FontRegistry, discover_families
+from app.services.generator import render_pdf
+from app.services.style import get_style
+
+
+def test_discover_families(tmp_path):
+    """Test that families are found by their file names."""
+    vera = discover_families(None)["Vera"]["regular"]
+    shutil.copy(vera, tmp_path / "Serif-Regular.ttf")
+    shutil.copy(vera, tmp_path / "Serif-BoldOblique.ttf")
+    shutil.copy(vera, tmp_path / "Lonely-Bold.ttf")
+    (tmp_path / "notes.txt").write_text("not a font")
+
+    families = discover_families(str(tmp_path))
+
+    assert set(families) == {"Vera", "Serif"}
+    assert set(families["Serif"]) == {"regular", "bold_italic"}
+
+
+def test_registry_loads_family_once(tmp_path):
+    """Test that a family is parsed once and missing variants fall back."""
+    vera = discover_families(None)["Vera"]["regular"]
+    shutil.copy(vera, tmp_path / "TestSans.ttf")
+    registry = FontRegistry(str(tmp_path))
+
+    assert registry.ensure("TestSans-Bold")
+    assert registry.is_loaded("TestSans")
+    assert registry.load("TestSans") == 0.0
+    assert "TestSans-BoldItalic" in pdfmetrics.getRegisteredFontNames()
+    assert registry.ensure("Helvetica")
+    assert not registry.ensure("Missing-Bold")
+
+
+def test_unknown_font_is_rejected():
+    """Test that a style with an unknown font raises."""
+    with pytest.raises(UnknownStyleException):
+        get_style(default_font="NoSuchFont")
+
+
+def test_unicode_theme_embeds_font_subset(resume_data):
+    """Test that TrueType renders report their embedded font bytes."""
+    resume_data["name"] = "Zoë Müller"
+    data = ResumeData(**resume_data).model_dump()
+
+    builtin = render_pdf(data)
+    unicode = render_pdf(data, theme="unicode")
+
+    assert builtin.font_bytes == 0
+    assert 0 < unicode.font_bytes < len(unicode.pdf)
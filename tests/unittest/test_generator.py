@@ -0,0 +1,71 @@
+"""Unit tests for app.services.generator module."""
+from io import BytesIO
+
+import pytest
+
+from app.models.resume import ResumeData
+from app.core.exceptions import UnknownProfileException
+from app.services.generator import ResumeGenerator, render_pdf
+from app.services.style import Style
+
+
+def test_generate_pdf_bytes(resume_data):
+    """Test that the generator renders a PDF in memory."""
+    data = ResumeData(**resume_data).model_dump()
+    pdf = ResumeGenerator(style=Style()).generate_pdf_bytes(data)
+
+    assert pdf.startswith(b"%PDF-")
+    assert pdf.rstrip().endswith(b"%%EOF")
+
+
+def test_generate_pdf_to_stream_and_file(resume_data, tmp_path):
+    """Test that the generator writes to streams and file paths."""
+    data = ResumeData(**resume_data).model_dump()
+    generator = ResumeGenerator(style=Style())
+
+    buffer = BytesIO()
+    generator.generate_pdf(data, buffer)
+    output_path = tmp_path / "resume.pdf"
+    generator.generate_pdf(data, str(output_path))
+
+    assert buffer.getvalue().startswith(b"%PDF-")
+    assert output_path.read_bytes().startswith(b"%PDF-")
+
+
+def test_render_pdf(resume_data):
+    """Test the module-level render entry point."""
+    data = ResumeData(**resume_data).model_dump()
+    result = render_pdf(data)
+
+    assert result.pdf.startswith(b"%PDF-")
+    assert set(result.timings) == {"build_content", "doc_build"}
+
+
+def test_output_profiles(resume_data):
+    """Test that profiles trade output size for compression work."""
+    data = ResumeData(**resume_data).model_dump()
+    sizes = {
+        profile: render_pdf(data, profile=profile).pdf
+        for profile in ("fast", "balanced", "smallest")
+    }
+
+    assert len(sizes["fast"]) > len(sizes["balanced"])
+    assert len(sizes["balanced"]) > len(sizes["smallest"])
+    assert b"/Title (John Doe, Ph.D.)" in sizes["fast"]
+    assert b"/Title ()" in sizes["smallest"]
+    assert b"ASCII85Decode" not in sizes["balanced"]
+
+
+def test_unknown_output_profile(resume_data):
+    """Test that an unknown profile is rejected."""
+    with pytest.raises(UnknownProfileException):
+        render_pdf(ResumeData(**resume_data).model_dump(), profile="tiny")
+
+
+def test_render_from_model_and_json(resume_data):
+    """Test that models, JSON and dictionaries render the same PDF."""
+    data = ResumeData(**resume_data)
+
+    from_model = render_pdf(data).pdf
+    assert render_pdf(data.model_dump_json()).pdf == from_model
+    assert render_pdf(data.model_dump()).pdf == from_model
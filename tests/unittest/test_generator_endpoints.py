@@ -0,0 +1,170 @@
+"""Unit tests for app.api.v1.endpoints.generator module."""
+from collections import OrderedDict
+
+from app.core.config import config as c
+from app.main import app
+from app.services.admission import admission, rate_limiter
+
+GENERATE = app.url_path_for("generate_resume")
+
+
+def test_generate_resume(client, resume_data):
+    """Test that a resume is rendered with a strong ETag and cached."""
+    response = client.post(GENERATE, json=resume_data)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"] == (
+        "attachment; filename=john_doe__ph_d_"
+    )
+    assert response.content.startswith(b"%PDF-")
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    again = client.post(GENERATE, json=resume_data)
+    assert again.headers["etag"] == etag
+    assert again.content == response.content
+
+    other = client.post(GENERATE, json=resume_data, params={"fit": True})
+    assert other.headers["etag"] != etag
+
+
+def test_generate_resume_not_modified(client, resume_data):
+    """Test that a matching If-None-Match is answered with 304."""
+    etag = client.post(GENERATE, json=resume_data).headers["etag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.post(
+            GENERATE, json=resume_data,
+            headers={"If-None-Match": if_none_match},
+        )
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert not response.content
+
+    response = client.post(
+        GENERATE, json=resume_data, headers={"If-None-Match": '"other"'}
+    )
+    assert response.status_code == 200
+
+
+def test_generate_resume_stream(client, resume_data):
+    """Test that a streamed render gets a weak ETag and is not cached."""
+    params = {"stream": True}
+    response = client.post(GENERATE, json=resume_data, params=params)
+
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF-")
+    assert response.content.rstrip().endswith(b"%%EOF")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "first_byte" in response.headers["server-timing"]
+
+    not_modified = client.post(
+        GENERATE, json=resume_data, params=params,
+        headers={"If-None-Match": etag},
+    )
+    assert not_modified.status_code == 304
+
+    # the streamed PDF was not cached, so the next render is streamed too
+    again = client.post(GENERATE, json=resume_data, params=params)
+    assert again.headers["etag"] == etag
+    assert "first_byte" in again.headers["server-timing"]
+
+    # a cached PDF is sent whole with its strong ETag
+    cached = client.post(GENERATE, json=resume_data).headers["etag"]
+    assert f"W/{cached}" == etag
+    response = client.post(GENERATE, json=resume_data, params=params)
+    assert response.headers["etag"] == cached
+
+
+def _stages(server_timing):
+    return [entry.split(";")[0] for entry in server_timing.split(", ")]
+
+
+def test_generate_resume_server_timing(client, resume_data):
+    """Test that the Server-Timing header reports the render stages."""
+    response = client.post(GENERATE, json=resume_data, params={"fit": True})
+    assert _stages(response.headers["server-timing"]) == [
+        "validate", "queue", "fit", "build_content", "doc_build", "render",
+    ]
+    assert 'render;dur=' in response.headers["server-timing"]
+
+    cached = client.post(GENERATE, json=resume_data, params={"fit": True})
+    assert _stages(cached.headers["server-timing"]) == ["validate", "cache"]
+
+
+def test_generate_resume_rate_limited(client, resume_data, monkeypatch):
+    """Test that a client over its rate limit is answered with 429."""
+    monkeypatch.setattr(rate_limiter, "rate", 0.5)
+    monkeypatch.setattr(rate_limiter, "burst", 1)
+    monkeypatch.setattr(rate_limiter, "_buckets", OrderedDict())
+
+    assert client.post(GENERATE, json=resume_data).status_code == 200
+    response = client.post(GENERATE, json=resume_data)
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "2"
+
+
+def test_generate_resume_shed(client, resume_data, monkeypatch):
+    """Test that renders are shed with 503 when no slot is free."""
+    monkeypatch.setattr(admission, "max_queue", 0)
+    monkeypatch.setattr(admission, "_active", admission.max_concurrency)
+
+    response = client.post(GENERATE, json=resume_data)
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+
+    # cache hits and 304 responses do not take a slot
+    monkeypatch.setattr(admission, "_active", 0)
+    etag = client.post(GENERATE, json=resume_data).headers["etag"]
+    monkeypatch.setattr(admission, "_active", admission.max_concurrency)
+    assert client.post(GENERATE, json=resume_data).status_code == 200
+    response = client.post(
+        GENERATE, json=resume_data, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+def test_preview_resume(client, resume_data):
+    """Test previews in every format and the rejection of unknown ones."""
+    preview = app.url_path_for("preview_resume")
+    for name, media_type in (
+        ("html", "text/html"), ("markdown", "text/markdown"),
+        ("text", "text/plain"),
+    ):
+        response = client.post(
+            preview, json=resume_data, params={"format": name}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == (
+            f"{media_type}; charset=utf-8"
+        )
+        assert "John Doe" in response.text
+
+    response = client.post(preview, json=resume_data, params={"format": "pdf"})
+    assert response.status_code == 422
+
+
+def test_generate_resume_body_limits(client, resume_data, monkeypatch):
+    """Test that oversized bodies get 413 and invalid ones a located 422."""
+    with monkeypatch.context() as patch:
+        patch.setattr(c, "MAX_PAYLOAD_BYTES", 100)
+        response = client.post(GENERATE, json=resume_data)
+    assert response.status_code == 413
+
+    del resume_data["name"]
+    response = client.post(GENERATE, json=resume_data)
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [
+        ["body", "name"]
+    ]
+
+    response = client.post(
+        GENERATE, content=b"{not json",
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][0] == "body"
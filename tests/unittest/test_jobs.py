@@ -0,0 +1,150 @@
+"""Unit tests for app.services.jobs module."""
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.core.exceptions import (
+    JobNotFoundException, RenderQueueFullException
+)
+from app.models.resume import ResumeData
+from app.services.executor import RenderExecutor
+from app.services.jobs import (
+    InMemoryJobStore, Job, JobManager, JobStatus, SQLiteJobStore
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Every job store implementation."""
+    if request.param == "memory":
+        return InMemoryJobStore()
+    return SQLiteJobStore(str(tmp_path / "jobs"))
+
+
+def _job(job_id="a" * 32, expires_at=100.0):
+    return Job(
+        id=job_id, status=JobStatus.QUEUED, file_name="resume",
+        created_at=1.0, updated_at=1.0, expires_at=expires_at,
+    )
+
+
+def test_store_roundtrip(store):
+    """Test that jobs and results are stored and deleted."""
+    job = _job()
+    store.save(job)
+    job.status = JobStatus.DONE
+    store.save(job)
+    store.save_result(job.id, b"%PDF-")
+
+    loaded = store.get(job.id)
+    assert loaded.status == JobStatus.DONE
+    assert loaded.to_dict() == job.to_dict()
+    assert store.load_result(job.id) == b"%PDF-"
+
+    store.delete(job.id)
+    assert store.get(job.id) is None
+    assert store.load_result(job.id) is None
+
+
+def test_store_expired(store):
+    """Test that expired jobs are listed."""
+    store.save(_job("a" * 32, expires_at=10.0))
+    store.save(_job("b" * 32, expires_at=30.0))
+
+    assert store.expired(now=20.0) == ["a" * 32]
+
+
+def test_manager_runs_job_and_cleans_up(resume_data, store):
+    """Test a job from submission to expiry."""
+    executor = RenderExecutor(kind="thread", max_workers=1)
+    manager = JobManager(store, executor, ttl=60, cleanup_interval=60)
+    data = ResumeData(**resume_data)
+
+    async def scenario():
+        job = await manager.submit(data)
+        assert (await manager.get(job.id)).status in (
+            JobStatus.QUEUED, JobStatus.RUNNING
+        )
+        assert await manager.result(job.id) is None
+        while (await manager.get(job.id)).status not in (
+            JobStatus.DONE, JobStatus.FAILED
+        ):
+            await asyncio.sleep(0.01)
+        job = await manager.get(job.id)
+        return job, await manager.result(job.id)
+
+    try:
+        job, pdf = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert job.status == JobStatus.DONE
+    assert pdf.startswith(b"%PDF-")
+    assert job.size == len(pdf)
+
+    assert manager.cleanup(now=job.expires_at + 1) == 1
+    with pytest.raises(JobNotFoundException):
+        asyncio.run(manager.get(job.id))
+
+
+def test_manager_limits_jobs(resume_data):
+    """Test that extra jobs stay queued and are rejected past the limit."""
+    executor = RenderExecutor(kind="thread", max_workers=2)
+    manager = JobManager(
+        InMemoryJobStore(), executor, ttl=60, cleanup_interval=60,
+        max_running=1, max_pending=2,
+    )
+
+    async def status(job):
+        return (await manager.get(job.id)).status
+
+    async def scenario():
+        jobs = [
+            await manager.submit(ResumeData(**dict(resume_data, name=name)))
+            for name in ("Limit First", "Limit Second")
+        ]
+        with pytest.raises(RenderQueueFullException):
+            await manager.submit(ResumeData(**resume_data))
+        await asyncio.sleep(0)
+        statuses = [await status(job) for job in jobs]
+        while any([await status(job) != JobStatus.DONE for job in jobs]):
+            await asyncio.sleep(0.01)
+        return statuses
+
+    try:
+        statuses = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert statuses == [JobStatus.RUNNING, JobStatus.QUEUED]
+
+
+def test_sqlite_store_runs_off_the_loop(tmp_path):
+    """Test that SQLite store calls do not block the event loop."""
+    store = SQLiteJobStore(str(tmp_path / "jobs"))
+    job = _job()
+    lock = sqlite3.connect(str(tmp_path / "jobs" / "jobs.sqlite3"))
+    lock.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        ticks = []
+        loop.call_later(0.05, ticks.append, "tick")
+        loop.call_later(0.2, lock.commit)
+        await store.save_async(job)
+        return ticks, await store.get_async(job.id)
+
+    ticks, loaded = asyncio.run(scenario())
+    lock.close()
+    assert ticks == ["tick"]
+    assert loaded.to_dict() == job.to_dict()
+
+
+def test_manager_rejects_malformed_ids():
+    """Test that ids which cannot be job ids are not looked up."""
+    manager = JobManager(
+        InMemoryJobStore(), RenderExecutor(kind="thread"), 60, 60
+    )
+    with pytest.raises(JobNotFoundException):
+        asyncio.run(manager.get("../../etc/passwd"))
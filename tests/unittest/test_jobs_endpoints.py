@@ -0,0 +1,68 @@
+"""Unit tests for app.api.v1.endpoints.jobs module."""
+import asyncio
+import time
+
+from app.main import app
+from app.services.jobs import job_manager
+
+SUBMIT = app.url_path_for("submit_job")
+
+
+def test_job_lifecycle(client, resume_data):
+    """Test that a submitted job is accepted, finishes and is downloaded."""
+    response = client.post(SUBMIT, json=resume_data)
+
+    assert response.status_code == 202
+    submitted = response.json()
+    assert submitted["status"] in ("queued", "running")
+    assert response.headers["location"] == submitted["status_url"]
+
+    job = submitted
+    deadline = time.monotonic() + 10
+    while job["status"] not in ("done", "failed"):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+        job = client.get(submitted["status_url"]).json()
+    assert job["status"] == "done"
+
+    download = client.get(submitted["download_url"])
+    assert download.status_code == 200
+    assert download.headers["content-disposition"] == (
+        "attachment; filename=john_doe__ph_d_"
+    )
+    assert download.content.startswith(b"%PDF-")
+    assert len(download.content) == job["size"]
+
+
+def test_job_not_done(client, resume_data, monkeypatch):
+    """Test that a job still waiting for a slot cannot be downloaded."""
+    monkeypatch.setattr(job_manager, "_running", asyncio.Semaphore(0))
+    job = client.post(SUBMIT, json=resume_data).json()
+
+    response = client.get(job["download_url"])
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == f"Job {job['id']} is queued"
+    assert client.get(job["status_url"]).json()["status"] == "queued"
+
+
+def test_job_not_found(client):
+    """Test that unknown and malformed job ids are answered with 404."""
+    for job_id in ("a" * 32, "not-a-job"):
+        status = client.get(app.url_path_for("get_job", job_id=job_id))
+        download = client.get(
+            app.url_path_for("download_job", job_id=job_id)
+        )
+        assert (status.status_code, download.status_code) == (404, 404)
+
+
+def test_job_rejected_when_full(client, resume_data, monkeypatch):
+    """Test that jobs past the pending limit are answered with 503."""
+    monkeypatch.setattr(job_manager, "_running", asyncio.Semaphore(0))
+    monkeypatch.setattr(job_manager, "max_pending", 1)
+
+    assert client.post(SUBMIT, json=resume_data).status_code == 202
+    response = client.post(SUBMIT, json=resume_data)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
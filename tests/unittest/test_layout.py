@@ -0,0 +1,91 @@
+"""Unit tests for app.services.layout module."""
+from io import BytesIO
+
+import pytest
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table
+
+from app.services.layout import ResumeParagraph, get_layout
+from app.services.style import get_style
+
+_LONG_TEXTS = [
+    "lorem ipsum dolor sit amet " * 1200,
+    "<b>Languages:</b> " + ", ".join(["Python &amp; <i>Go</i>"] * 1500),
+]
+
+
+def test_get_layout_is_shared_per_style():
+    """Test that the layout is computed once per style."""
+    layout = get_layout(get_style())
+
+    assert get_layout(get_style()) is layout
+    assert get_layout(get_style("modern")) is not layout
+    assert get_layout(get_style("modern")).separator_thickness == 1.5
+
+
+def test_row_matches_table_geometry():
+    """Test that a row takes the size of the Table it replaces."""
+    style = get_style()
+    layout = get_layout(style)
+    left = "Senior Engineer with a long title - " * 4
+    right = "Jan 2020 - Present"
+
+    row = layout.row(
+        Paragraph(left, style.item_title),
+        Paragraph(right, style.item_subtitle),
+    )
+    table = Table(
+        [[Paragraph(left, style.item_title),
+          Paragraph(right, style.item_subtitle)]],
+        colWidths=list(layout.column_widths),
+    )
+    table.setStyle(style.job_table)
+
+    assert row.wrap(456, 700) == table.wrap(456, 700)
+
+
+def test_separator_has_no_height():
+    """Test that the section separator only draws a line."""
+    separator = get_layout(get_style()).separator()
+
+    assert separator.wrap(456, 700) == (468, 0)
+
+
+@pytest.mark.parametrize("text", _LONG_TEXTS)
+def test_resume_paragraph_draws_like_paragraph(text):
+    """Test that a paragraph split across pages draws the same."""
+    style = get_style()
+
+    def build(paragraph_class):
+        output = BytesIO()
+        doc = SimpleDocTemplate(output, pagesize=letter, invariant=1)
+        doc.build([
+            paragraph_class(text, style.bullet_point),
+            paragraph_class("After", style.normal),
+        ])
+        return doc.page, output.getvalue()
+
+    pages, pdf = build(ResumeParagraph)
+    assert pages > 3
+    assert (pages, pdf) == build(Paragraph)
+
+
+@pytest.mark.parametrize("text", _LONG_TEXTS)
+def test_resume_paragraph_rest_keeps_lines(text):
+    """Test that the rest of a split reuses its lines at the same width."""
+    style = get_style()
+    paragraph = ResumeParagraph(text, style.normal)
+    paragraph.wrap(400, 10000)
+
+    first, rest = paragraph.split(400, 200)
+    kept = rest.wrap(400, 10000)
+    assert rest.blPara is rest._kept_lines
+
+    plain_rest = Paragraph(text, style.normal).split(400, 200)[1]
+    assert kept == plain_rest.wrap(400, 10000)
+    assert len(first.blPara.lines) + len(rest.blPara.lines) == len(
+        paragraph.blPara.lines
+    )
+    # another width breaks the lines of the rest again
+    assert rest.wrap(300, 10000) == plain_rest.wrap(300, 10000)
+    assert rest._kept_lines is None
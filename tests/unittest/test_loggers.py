@@ -1,7 +1,12 @@
 """Unit tests for app.core.loggers module."""
+import logging
+import sys
 from unittest.mock import patch
 
-from app.core.loggers import setup_logging
+from app.core.loggers import (
+    DROPPED_RECORDS, BoundedQueueHandler, SamplingFilter, setup_logging,
+    stop_logging,
+)
 
 
 @patch('logging.config.dictConfig')
@@ -59,3 +64,79 @@ def test_setup_logging_custom_level_and_format(mock_dict_config):
     assert config["loggers"][""]["level"] == "ERROR"
     assert "stdout-basic" in config["loggers"][""]["handlers"]
     assert "stderr-basic" in config["loggers"][""]["handlers"]
+
+
+def test_setup_logging_queue(capsys):
+    """Test that the queue mode writes records from the listener thread."""
+    setup_logging(log_level="INFO", use_basic_format=True, queue_size=10)
+    try:
+        root = logging.getLogger()
+        assert [type(h) for h in root.handlers] == [BoundedQueueHandler]
+        logging.getLogger("app.test").info("queued record")
+    finally:
+        stop_logging()
+
+    assert "queued record" in capsys.readouterr().out
+    assert not any(
+        isinstance(h, BoundedQueueHandler) for h in logging.getLogger().handlers
+    )
+
+
+def test_queue_handler_defers_formatting(capsys):
+    """Test that records are queued unformatted and written by the listener."""
+    setup_logging(log_level="INFO", use_basic_format=True, queue_size=10)
+    handler = logging.getLogger().handlers[0]
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "app.test", logging.ERROR, __file__, 1, "failed %s", ("job",),
+            sys.exc_info(),
+        )
+    try:
+        assert handler.prepare(record) is record
+        assert (record.msg, record.args) == ("failed %s", ("job",))
+        assert record.exc_info is not None and record.exc_text is None
+        handler.handle(record)
+    finally:
+        stop_logging()
+
+    err = capsys.readouterr().err
+    assert "failed job" in err
+    assert "ValueError: boom" in err
+
+
+def test_bounded_queue_handler_drops_when_full():
+    """Test that a full queue drops and counts records instead of blocking."""
+    handler = BoundedQueueHandler(2)
+    dropped = DROPPED_RECORDS.value("overflow")
+    logger = logging.getLogger("app.test.bounded")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        for i in range(5):
+            logger.warning("record %d", i)
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    assert handler.queue.qsize() == 2
+    assert DROPPED_RECORDS.value("overflow") == dropped + 3
+
+
+def test_sampling_filter():
+    """Test that only INFO records of the sampled loggers are sampled."""
+    def record(name, level):
+        return logging.LogRecord(name, level, __file__, 1, "msg", (), None)
+
+    never = SamplingFilter(0.0, ["app.services.generator"])
+    assert not never.filter(record("app.services.generator", logging.INFO))
+    assert not never.filter(
+        record("app.services.generator.child", logging.DEBUG)
+    )
+    assert never.filter(record("app.services.generator", logging.WARNING))
+    assert never.filter(record("app.services.generatorx", logging.INFO))
+    assert never.filter(record("app.main", logging.INFO))
+
+    always = SamplingFilter(1.0, ["app.services.generator"])
+    assert always.filter(record("app.services.generator", logging.INFO))
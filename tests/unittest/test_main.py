@@ -0,0 +1,32 @@
+"""Unit tests for app.main module."""
+from app.main import app
+
+
+def test_metrics(client, resume_data):
+    """Test that /metrics exposes request counters and stage histograms."""
+    generate = app.url_path_for("generate_resume")
+    client.post(generate, json=resume_data)
+
+    response = client.get(app.url_path_for("metrics_endpoint"))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert "# TYPE resume_http_requests_total counter" in text
+    assert (
+        f'resume_http_requests_total{{method="POST",path="{generate}",'
+        'status="200"}'
+    ) in text
+    assert 'resume_stage_seconds_bucket{stage="doc_build",le="+Inf"}' in text
+    assert "resume_render_cache_bytes " in text
+
+
+def test_health_and_ready(client):
+    """Test the health and readiness endpoints once the app started."""
+    health = client.get(app.url_path_for("health_check")).json()
+    assert health["status"] == "healthy"
+    assert health["render"]["kind"] == "thread"
+    assert set(health["cache"]) >= {"entries", "bytes", "hits", "misses"}
+
+    ready = client.get(app.url_path_for("ready_check"))
+    assert ready.status_code == 200
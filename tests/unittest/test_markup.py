@@ -0,0 +1,76 @@
+"""Unit tests for app.services.markup module."""
+from app.models.resume import ResumeData
+from app.services.generator import ResumeGenerator, render_pdf
+from app.services.markup import (
+    PARAGRAPH_LOOKUPS, ParagraphCache, paragraph_cache, record_lookups
+)
+from app.services.style import get_style
+
+
+def test_paragraph_cache_reuses_parsed_markup():
+    """Test that a cached paragraph lays out like a freshly parsed one."""
+    cache = ParagraphCache(max_entries=8)
+    style = get_style().section_header
+    text = "<b>Cloud &amp; Big Data:</b> AWS, GCP"
+
+    first, first_cached = cache.paragraph(text, style)
+    second, second_cached = cache.paragraph(text, style)
+
+    assert (first_cached, second_cached) == (False, True)
+    assert second.frags is not first.frags
+    assert second.getPlainText() == first.getPlainText() == (
+        "CLOUD & BIG DATA: AWS, GCP"
+    )
+    assert second.wrap(200, 100) == first.wrap(200, 100)
+    assert cache.stats()["hits"] == 1
+
+
+def test_paragraph_cache_evicts_least_recently_used():
+    """Test that the cache keeps at most max_entries texts."""
+    cache = ParagraphCache(max_entries=2)
+    style = get_style().normal
+    cache.paragraph("a", style)
+    cache.paragraph("b", style)
+    cache.paragraph("a", style)
+    cache.paragraph("c", style)
+
+    assert len(cache) == 2
+    assert cache.paragraph("a", style)[1]
+    assert not cache.paragraph("b", style)[1]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_paragraph_cache_disabled():
+    """Test that a zero sized cache never stores markup."""
+    cache = ParagraphCache(max_entries=0)
+    cache.paragraph("a", get_style().normal)
+
+    assert not cache.paragraph("a", get_style().normal)[1]
+    assert len(cache) == 0
+
+
+def test_cached_render_is_identical(resume_data):
+    """Test that renders from cached markup produce the same PDF."""
+    data = ResumeData(**resume_data).model_dump()
+    generator = ResumeGenerator(style=get_style())
+    paragraph_cache.clear()
+
+    cold = generator.generate_pdf_bytes(data)
+    assert generator.paragraph_lookups["miss"] > 0
+    warm = generator.generate_pdf_bytes(data)
+
+    assert warm == cold
+    assert generator.paragraph_lookups["miss"] == 0
+
+
+def test_record_lookups(resume_data):
+    """Test that render lookups are counted in the metrics."""
+    result = render_pdf(ResumeData(**resume_data).model_dump())
+    hits = PARAGRAPH_LOOKUPS.value("hit")
+
+    record_lookups(result.paragraph_lookups)
+
+    assert sum(result.paragraph_lookups.values()) > 0
+    assert PARAGRAPH_LOOKUPS.value("hit") == (
+        hits + result.paragraph_lookups["hit"]
+    )
@@ -0,0 +1,110 @@
+"""Unit tests for app.services.memory module."""
+import asyncio
+import signal
+
+import pytest
+
+from app.core.exceptions import PayloadTooLargeException
+from app.models.resume import ResumeData
+from app.services import memory
+from app.services.document import build_document
+from app.services.memory import (
+    MemoryWatchdog, WatchdogMiddleware, check_render_memory,
+    estimate_render_memory, rss_bytes, track_memory,
+)
+from app.services.style import get_style
+from benchmarks.synthetic import make_resume
+
+
+def _document(**kwargs):
+    return build_document(ResumeData(**make_resume(**kwargs)), get_style())
+
+
+def test_track_memory():
+    """Test that each accounting mode reports its measurements."""
+    with track_memory("off") as usage:
+        pass
+    assert not usage
+
+    with track_memory("rss") as usage:
+        pass
+    assert usage["rss_bytes"] > 0
+    assert set(usage) == {"rss_bytes", "rss_growth_bytes"}
+
+    with track_memory("tracemalloc") as usage:
+        buffer = bytearray(4 * 1024 * 1024)
+        del buffer
+    assert usage["peak_bytes"] >= 4 * 1024 * 1024
+
+
+def test_rss_bytes():
+    """Test that the resident memory grows with allocations."""
+    before = rss_bytes()
+    buffer = bytearray(32 * 1024 * 1024)
+    buffer[::4096] = b"x" * len(buffer[::4096])
+
+    assert rss_bytes() - before >= 16 * 1024 * 1024
+
+
+def test_estimate_render_memory(resume_data):
+    """Test that the estimate grows with paragraphs and their length."""
+    small = estimate_render_memory(_document(jobs=2))
+
+    assert estimate_render_memory(_document(jobs=20)) > small
+    resume_data["summary"] = "word " * 100000
+    long_paragraph = build_document(ResumeData(**resume_data), get_style())
+    assert estimate_render_memory(long_paragraph) > 500000 * 16
+
+
+def test_check_render_memory(resume_data):
+    """Test that documents over the memory limit are rejected."""
+    document = build_document(ResumeData(**resume_data), get_style())
+    estimate = estimate_render_memory(document)
+
+    check_render_memory(document, max_bytes=estimate)
+    check_render_memory(document, max_bytes=0)
+    with pytest.raises(PayloadTooLargeException, match="MiB to render"):
+        check_render_memory(document, max_bytes=estimate - 1)
+
+
+def test_watchdog_request_limit():
+    """Test that the request limit trips once, within its jitter."""
+    watchdog = MemoryWatchdog("web", max_requests=10, jitter=0.5)
+    reasons = [watchdog.check() for _ in range(20)]
+
+    assert reasons.count("requests") == 1
+    assert 10 <= reasons.index("requests") + 1 <= 15
+
+    watchdog.reset()
+    assert watchdog.requests == 0 and not watchdog.tripped
+
+
+def test_watchdog_rss_limit():
+    """Test that the resident memory limit uses the reported value."""
+    watchdog = MemoryWatchdog("render", max_rss_bytes=1000)
+
+    assert watchdog.check(999) is None
+    assert watchdog.check(1001) == "rss"
+    assert not MemoryWatchdog("web").enabled
+    assert MemoryWatchdog("web").check(10 ** 12) is None
+
+
+def test_watchdog_middleware_stops_worker(monkeypatch):
+    """Test that the middleware sends SIGTERM once past the limit."""
+    signals = []
+    monkeypatch.setattr(
+        memory.os, "kill", lambda pid, sig: signals.append(sig)
+    )
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["type"])
+
+    middleware = WatchdogMiddleware(
+        app, MemoryWatchdog("web", max_requests=2, jitter=0)
+    )
+    for _ in range(3):
+        asyncio.run(middleware({"type": "http"}, None, None))
+
+    assert calls == ["http"] * 3
+    assert signals == [signal.SIGTERM]
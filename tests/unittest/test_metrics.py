@@ -0,0 +1,60 @@
+"""Unit tests for app.core.metrics module."""
+from app.core.metrics import MetricsRegistry, ServerTiming
+
+
+def test_counter_render():
+    """Test that counters are rendered per label values."""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ("path",))
+    counter.inc("/a")
+    counter.inc("/a", amount=2)
+    counter.inc('/b"')
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{path="/a"} 3' in text
+    assert 'requests_total{path="/b\\""} 1' in text
+
+
+def test_histogram_render():
+    """Test that histogram buckets are cumulative."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0)
+    )
+    histogram.observe(0.05, "a")
+    histogram.observe(0.1, "a")
+    histogram.observe(5.0, "a")
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{stage="a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{stage="a"} 3' in lines
+    assert histogram.count("a") == 3
+
+
+def test_callback_metric():
+    """Test that callback metrics are read at render time."""
+    registry = MetricsRegistry()
+    state = {"depth": 1}
+    registry.callback("depth", "Queue depth", lambda: state["depth"])
+    state["depth"] = 4
+
+    assert "depth 4" in registry.render().splitlines()
+
+
+def test_server_timing_header():
+    """Test the Server-Timing header format."""
+    timing = ServerTiming()
+    timing.add("validate", 0.0015)
+    timing.add("cache", 0.0, "hit")
+    with timing.time("render"):
+        pass
+
+    header = timing.header()
+
+    assert header.startswith('validate;dur=1.50, cache;dur=0.00;desc="hit"')
+    assert set(timing.stages) == {"validate", "cache", "render"}
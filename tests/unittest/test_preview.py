@@ -0,0 +1,58 @@
+"""Unit tests for app.services.preview module."""
+import pytest
+
+from app.core.exceptions import UnknownFormatException
+from app.models.resume import ResumeData
+from app.services.document import build_document
+from app.services.preview import (
+    PREVIEW_FORMATS, get_preview_format, render_html, render_markdown,
+    render_text
+)
+from app.services.style import get_style
+
+
+def _document(resume_data):
+    return build_document(ResumeData(**resume_data), get_style())
+
+
+SECTIONS = ("Professional Summary", "Skills", "Professional Experience",
+            "Education")
+
+
+@pytest.mark.parametrize("name", list(PREVIEW_FORMATS))
+def test_previews_follow_pdf_section_order(resume_data, name):
+    """Test that every preview has the PDF sections in the same order."""
+    text = get_preview_format(name).render(
+        _document(resume_data), get_style()
+    )
+
+    # the text preview writes section titles in upper case
+    positions = [text.lower().find(section.lower()) for section in SECTIONS]
+    assert -1 not in positions
+    assert positions == sorted(positions)
+    assert "Lead AI Consultant - Global AI Solutions" in text
+
+
+def test_previews_escape_values(resume_data):
+    """Test that field values cannot inject markup."""
+    resume_data["name"] = "<script>alert(1)</script> *Doe*"
+    document = _document(resume_data)
+
+    assert "<script>" not in render_html(document, get_style())
+    assert "\\*Doe\\*" in render_markdown(document, get_style())
+    assert render_text(document, get_style()).startswith(resume_data["name"])
+
+
+def test_skipped_sections(resume_data):
+    """Test that optional sections are left out when empty."""
+    resume_data.update(summary=None, education=None)
+    text = render_text(_document(resume_data), get_style())
+
+    assert "PROFESSIONAL SUMMARY" not in text
+    assert "EDUCATION" not in text
+
+
+def test_unknown_preview_format():
+    """Test that an unknown preview format is rejected."""
+    with pytest.raises(UnknownFormatException):
+        get_preview_format("pdf")
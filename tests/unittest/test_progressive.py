@@ -0,0 +1,83 @@
+"""Unit tests for app.services.progressive module."""
+import re
+import zlib
+from io import BytesIO
+
+import pytest
+
+from app.models.resume import ResumeData
+from app.services.document import build_document
+from app.services.fonts import embedded_font_bytes
+from app.services.generator import ResumeGenerator
+from app.services.progressive import ChunkWriter
+from app.services.style import get_style
+from benchmarks.synthetic import make_resume
+
+
+def _streams(pdf):
+    """Return the decompressed streams of a PDF, sorted."""
+    streams = re.findall(rb"\nstream\r?\n(.*?)endstream", pdf, re.S)
+    return sorted(zlib.decompress(stream) for stream in streams)
+
+
+def _check_xref(pdf):
+    """Check that every xref entry points at its object."""
+    start = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", pdf).group(1))
+    assert pdf[start:].startswith(b"xref\n")
+    offsets = re.findall(rb"(\d{10}) 00000 n ", pdf[start:])
+    for number, offset in enumerate(offsets, 1):
+        assert pdf[int(offset):].startswith(b"%d 0 obj\n" % number)
+    return len(offsets)
+
+
+@pytest.mark.parametrize("theme", ["default", "unicode"])
+def test_progressive_pdf_matches_regular(theme):
+    """Test that progressive output is a valid PDF with the same pages."""
+    style = get_style(theme)
+    document = build_document(ResumeData(**make_resume(jobs=12)), style)
+    generator = ResumeGenerator(style=style)
+    regular = generator.generate_pdf_bytes(document)
+    output = BytesIO()
+    generator.generate_pdf(document, output, progressive=True)
+    progressive = output.getvalue()
+
+    assert progressive.startswith(b"%PDF-1.4\n")
+    assert _check_xref(progressive) == _check_xref(regular)
+    assert _streams(progressive) == _streams(regular)
+    assert len(_streams(progressive)) > 2
+    assert generator.font_bytes == embedded_font_bytes(regular)
+
+
+def test_pages_are_written_as_they_are_laid_out():
+    """Test that every page is flushed before the PDF is complete."""
+    chunks = []
+    writer = ChunkWriter(chunks.append, chunk_size=1 << 20)
+    style = get_style()
+    document = build_document(ResumeData(**make_resume(jobs=12)), style)
+
+    ResumeGenerator(style=style).generate_pdf(
+        document, writer, progressive=True
+    )
+    writer.flush()
+
+    pdf = b"".join(chunks)
+    pages = len(re.findall(rb"/Type /Page\b", pdf))
+    # one chunk per page stream, then the rest of the document
+    assert pages > 1 and len(chunks) == pages + 1
+    assert all(b"stream" in chunk for chunk in chunks[:-1])
+    assert writer.bytes_written == len(pdf)
+
+
+def test_chunk_writer():
+    """Test that writes are sent in chunks of at least chunk_size."""
+    chunks = []
+    writer = ChunkWriter(chunks.append, chunk_size=4)
+
+    writer.write(b"ab")
+    assert not chunks
+    writer.write(b"cdef")
+    writer.write(b"g")
+    writer.flush()
+    writer.flush()
+
+    assert chunks == [b"abcdef", b"g"]
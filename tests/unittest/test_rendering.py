@@ -0,0 +1,58 @@
+"""Unit tests for app.services.rendering module."""
+import asyncio
+import time
+
+import pytest
+
+from app.core.exceptions import RenderQueueFullException
+from app.models.resume import ResumeData
+from app.services import rendering
+from app.services.cache import RenderCache
+from app.services.executor import RenderExecutor
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """Thread executor without a queue, and an empty render cache."""
+    monkeypatch.setattr(rendering, "render_cache", RenderCache(1 << 24))
+    executor = RenderExecutor(kind="thread", max_workers=1, max_queue_size=0)
+    yield executor
+    executor.shutdown()
+
+
+def test_render_cached(resume_data, executor):
+    """Test that a resume is rendered once and then served from the cache."""
+    data = ResumeData(**resume_data)
+
+    async def render_twice():
+        first = await rendering.render_cached(executor, data)
+        second = await rendering.render_cached(executor, data)
+        return first, second
+
+    first, second = asyncio.run(render_twice())
+    assert not first.cached
+    assert first.pdf.startswith(b"%PDF-")
+    assert first.result.timings["doc_build"] > 0
+    assert second.cached
+    assert (second.key, second.pdf) == (first.key, first.pdf)
+
+
+def test_render_cached_full_queue(resume_data, executor):
+    """Test that a full render queue is retried only with a retry delay."""
+    data = ResumeData(**resume_data)
+
+    async def render_while_busy(retry_delay):
+        busy = asyncio.create_task(executor.run(time.sleep, 0.2))
+        await asyncio.sleep(0)
+        try:
+            return await rendering.render_cached(
+                executor, data, retry_delay=retry_delay
+            )
+        finally:
+            await busy
+
+    with pytest.raises(RenderQueueFullException):
+        asyncio.run(render_while_busy(None))
+    rendered = asyncio.run(render_while_busy(0.01))
+    assert rendered.pdf.startswith(b"%PDF-")
+    assert rendered.render_seconds >= 0.1
@@ -0,0 +1,95 @@
+"""Unit tests for app.services.streaming module."""
+import asyncio
+import re
+import threading
+
+import pytest
+
+from app.core.exceptions import RenderQueueFullException
+from app.models.resume import ResumeData
+from app.services.document import build_document
+from app.services.executor import RenderExecutor
+from app.services.streaming import RenderStream
+from app.services.style import get_style
+from benchmarks.synthetic import make_resume
+
+
+def _document(jobs=12):
+    return build_document(ResumeData(**make_resume(jobs=jobs)), get_style())
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_stream_yields_pdf(kind):
+    """Test that the chunks of a stream form the rendered PDF."""
+    executor = RenderExecutor(kind=kind, max_workers=1)
+
+    async def scenario():
+        stream = RenderStream(executor, _document(), chunk_size=1024)
+        await stream.start()
+        return stream, [chunk async for chunk in stream]
+
+    try:
+        stream, chunks = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    pdf = b"".join(chunks)
+    assert pdf.startswith(b"%PDF") and pdf.endswith(b"%%EOF\n")
+    assert len(chunks) > 2
+    assert stream.bytes_sent == len(pdf)
+    assert stream.peak_buffered_bytes == max(map(len, chunks))
+    assert stream.result.pdf == b"" and "doc_build" in stream.result.timings
+    assert 0 < stream.first_byte_seconds
+    assert len(re.findall(rb"/Type /Page\b", pdf)) > 1
+
+
+def test_stream_holds_slot_until_done():
+    """Test that the slot is held from start until the stream ends."""
+    executor = RenderExecutor(kind="thread", max_workers=1)
+    events = []
+
+    class Slot:
+        async def __aenter__(self):
+            events.append("enter")
+
+        async def __aexit__(self, *exc):
+            events.append("exit")
+
+    async def scenario():
+        stream = RenderStream(executor, _document(2), slot=Slot())
+        await stream.start()
+        assert events == ["enter"]
+        async for _ in stream:
+            pass
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert events == ["enter", "exit"]
+
+
+def test_stream_raises_errors_at_start():
+    """Test that a render failing before its first chunk raises in start."""
+    executor = RenderExecutor(kind="thread", max_workers=1, max_queue_size=0)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        stream = RenderStream(executor, _document(2))
+        try:
+            with pytest.raises(RenderQueueFullException):
+                await stream.start()
+        finally:
+            release.set()
+            await busy
+
+        broken = RenderStream(executor, _document(2), theme="missing")
+        with pytest.raises(Exception, match="missing"):
+            await broken.start()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
@@ -0,0 +1,41 @@
+"""Unit tests for app.services.style module."""
+import dataclasses
+
+import pytest
+
+from app.core.exceptions import UnknownStyleException
+from app.services.style import THEMES, Style, get_style
+
+
+def test_get_style_is_shared():
+    """Test that equal configurations return the same instance."""
+    assert get_style() is get_style("default")
+    assert get_style("compact") is get_style("compact")
+    assert get_style() is not get_style("compact")
+
+
+def test_get_style_overrides():
+    """Test that overrides take precedence over theme values."""
+    style = get_style("compact", default_font_size=12)
+    assert style.default_font_size == 12
+    assert style.normal.fontSize == 12
+    assert style is get_style("compact", default_font_size=12)
+
+
+def test_style_is_frozen():
+    """Test that shared styles cannot be mutated."""
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        get_style().default_font_size = 20
+
+
+def test_unknown_theme():
+    """Test that unknown themes are rejected."""
+    with pytest.raises(UnknownStyleException):
+        get_style("does-not-exist")
+
+
+def test_themes_build():
+    """Test that every registered theme builds and has its own key."""
+    keys = {get_style(theme).cache_key() for theme in THEMES}
+    assert len(keys) == len(THEMES)
+    assert Style().cache_key() == get_style().cache_key()
@@ -0,0 +1,59 @@
+"""Unit tests for app.services.utils module."""
+import os
+import threading
+
+from app.services.utils import (
+    LocalConnection, atomic_write, content_disposition, percentile,
+    to_file_name,
+)
+
+
+def test_to_file_name():
+    """Test that names are turned into file names."""
+    assert to_file_name("John Doe, Ph.D.") == "john_doe__ph_d_"
+    assert to_file_name("A/B") == "a_b"
+    assert to_file_name("../..\\etc") == "______etc"
+    assert to_file_name("") == "resume"
+
+
+def test_content_disposition():
+    """Test that non-ASCII file names get a UTF-8 filename* parameter."""
+    assert content_disposition("john_doe") == "attachment; filename=john_doe"
+    assert content_disposition("zoë_müller") == (
+        "attachment; filename=zoe_muller; "
+        "filename*=UTF-8''zo%C3%AB_m%C3%BCller"
+    )
+
+
+def test_percentile():
+    """Test percentiles with interpolation."""
+    values = [4, 1, 3, 2, 5]
+    assert percentile(values, 0) == 1
+    assert percentile(values, 50) == 3
+    assert percentile(values, 100) == 5
+    assert percentile(values, 95) == 4.8
+    assert percentile([], 50) == 0.0
+
+
+def test_atomic_write(tmp_path):
+    """Test that a file is replaced without leaving temporary files."""
+    path = tmp_path / "result.pdf"
+    atomic_write(str(path), b"first")
+    atomic_write(str(path), b"second")
+
+    assert path.read_bytes() == b"second"
+    assert os.listdir(tmp_path) == ["result.pdf"]
+
+
+def test_local_connection(tmp_path):
+    """Test that each thread gets its own connection in WAL mode."""
+    connection = LocalConnection(str(tmp_path / "index.sqlite3"))
+    conn = connection()
+    others = []
+    thread = threading.Thread(target=lambda: others.append(connection()))
+    thread.start()
+    thread.join()
+
+    assert connection() is conn
+    assert others[0] is not conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
@@ -0,0 +1,69 @@
+"""Unit tests for app.services.warmup module."""
+import asyncio
+import os
+
+from app.models.resume import ResumeData
+from app.services.document import build_document
+from app.services.executor import RenderExecutor
+from app.services.generator import render_pdf
+from app.services.style import get_style
+from app.services.warmup import (
+    SAMPLE_RESUME, readiness, warm_up, warm_up_worker,
+)
+
+
+def _fail():
+    raise RuntimeError("no fonts")
+
+
+def test_warm_up_marks_ready():
+    """Test that warm-up runs the initializer of every worker."""
+    executor = RenderExecutor(
+        kind="thread", max_workers=2, initializer=warm_up_worker
+    )
+    try:
+        state = asyncio.run(warm_up(executor))
+    finally:
+        executor.shutdown()
+
+    assert state is readiness
+    assert state.ready and state.error is None
+    assert list(state.workers) == [os.getpid()]
+    assert state.workers[os.getpid()] > 0
+    assert state.to_dict()["workers"] == {
+        str(os.getpid()): state.workers[os.getpid()]
+    }
+
+
+def test_failed_warm_up_is_not_ready():
+    """Test that a failing worker start leaves the app not ready."""
+    executor = RenderExecutor(kind="thread", max_workers=1, initializer=_fail)
+    try:
+        state = asyncio.run(warm_up(executor))
+    finally:
+        executor.shutdown()
+
+    assert not state.ready
+    assert state.error
+
+
+def test_process_workers_log(capfd):
+    """Test that spawned render workers write their records."""
+    executor = RenderExecutor(
+        kind="process", max_workers=1, start_method="spawn",
+        initializer=warm_up_worker,
+    )
+    document = build_document(
+        ResumeData.model_validate(SAMPLE_RESUME), get_style()
+    )
+    try:
+        result = asyncio.run(executor.run(render_pdf, document))
+    finally:
+        executor.shutdown()
+
+    assert result.pdf.startswith(b"%PDF")
+    out = capfd.readouterr().out
+    assert "Loaded font family" in out
+    done = [line for line in out.splitlines() if "Done building" in line]
+    # the render memory is part of the render log line
+    assert done and all(", rss " in line for line in done)